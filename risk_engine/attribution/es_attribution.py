@@ -1,6 +1,9 @@
 import numpy as np
 import pandas as pd
 
+from risk_engine.instrumentation import instrumented
+from risk_engine.kernels import rolling_tail_attribution
+
 
 def _tail_mask(port_ret: pd.Series, alpha: float) -> pd.Series:
     """
@@ -10,6 +13,7 @@ def _tail_mask(port_ret: pd.Series, alpha: float) -> pd.Series:
     return port_ret <= q
 
 
+@instrumented()
 def es_attribution_historical(
     asset_returns: pd.DataFrame,
     weights: pd.Series,
@@ -55,20 +59,13 @@ def es_attribution_historical(
     }
 
 
-def rolling_es_attribution_historical(
+def _rolling_es_attribution_loop(
     asset_returns: pd.DataFrame,
     weights: pd.Series,
-    alpha: float = 0.95,
-    window: int = 60,
+    alpha: float,
+    window: int,
 ) -> pd.DataFrame:
-    """
-    Rolling historical ES attribution.
-    Returns a DataFrame indexed by date with:
-      - ES (portfolio)
-      - component ES per asset (one column per asset)
-    """
-    weights = weights.reindex(asset_returns.columns).astype(float)
-
+    """Window-by-window loop; used for missing returns / weights (pandas skips them per window)."""
     rows = []
     idx = []
 
@@ -95,3 +92,31 @@ def rolling_es_attribution_historical(
 
     out = pd.DataFrame(rows, index=pd.Index(idx, name="Date"))
     return out
+
+
+@instrumented()
+def rolling_es_attribution_historical(
+    asset_returns: pd.DataFrame,
+    weights: pd.Series,
+    alpha: float = 0.95,
+    window: int = 60,
+) -> pd.DataFrame:
+    """
+    Rolling historical ES attribution.
+    Returns a DataFrame indexed by date with:
+      - ES (portfolio)
+      - component ES per asset (one column per asset)
+    """
+    weights = weights.reindex(asset_returns.columns).astype(float)
+
+    # Missing returns or weights: the loop's pandas sums skip them
+    R = asset_returns.to_numpy(dtype=float)
+    if np.isnan(R).any() or weights.isna().any():
+        return _rolling_es_attribution_loop(asset_returns, weights, alpha, window)
+
+    es, comp, count = rolling_tail_attribution(R, weights.to_numpy(), window, alpha)
+    keep = count >= 2                   # skip windows with insufficient tail points
+    out = pd.DataFrame(comp[keep], columns=[f"cES_{col}" for col in asset_returns.columns])
+    out.insert(0, "ES", es[keep])
+    out.index = pd.Index(asset_returns.index[window:][keep], name="Date")
+    return out
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import norm
+from scipy.stats import t as student_t
+
+from risk_engine.instrumentation import instrumented
+
+
+def _tail_factors(alphas: np.ndarray, df: float | None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Standardized VaR and ES of the loss for each alpha: (q, e) with
+    VaR = -mu + q * s and ES = -mu + e * s for a portfolio with location mu
+    and scale s. Gaussian for df=None, else Student-t with df degrees of freedom.
+    """
+    if df is None:
+        q = norm.ppf(alphas)
+        return q, norm.pdf(q) / (1 - alphas)
+    if df <= 1:
+        raise ValueError("Student-t ES needs df > 1.")
+    q = student_t.ppf(alphas, df)
+    return q, student_t.pdf(q, df) * (df + q**2) / ((df - 1) * (1 - alphas))
+
+
+@instrumented()
+def parametric_es_attribution(
+    mu,
+    cov,
+    weights,
+    alphas=0.95,
+    df: float | None = None,
+) -> dict:
+    """
+    Closed-form Euler attribution of VaR and ES for an elliptical model of
+    asset returns: Gaussian N(mu, cov) for df=None, else multivariate
+    Student-t with location mu, scale matrix cov and df degrees of freedom
+    (the model simulate_student_t_mc draws from; its covariance is
+    cov * df / (df - 2)).
+
+    Both risk measures are -w'mu + c(alpha) * sqrt(w' cov w), so the marginals
+    are -mu + c(alpha) * cov w / sqrt(w' cov w) and the components
+    (weights * marginals) sum exactly to the total. Batched: weights may be
+    (N,) or (K x N) and alphas a scalar or (A,); one (K x N) @ (N x N) product
+    serves every alpha.
+
+    Returns dict with (leading K / A axes dropped when weights / alphas are
+    1-d / scalar), losses positive:
+      - VaR, ES (K x A)
+      - marginal_VaR, marginal_ES, component_VaR, component_ES (K x A x N)
+      - sigma (K,) portfolio scale sqrt(w' cov w)
+    """
+    mu = np.asarray(mu, dtype=float)
+    cov = np.asarray(cov, dtype=float)
+    W = np.asarray(weights, dtype=float)
+    a = np.asarray(alphas, dtype=float)
+    W2, a1 = np.atleast_2d(W), np.atleast_1d(a)
+    if W2.shape[1] != len(mu) or cov.shape != (len(mu), len(mu)):
+        raise ValueError("weights, mu and cov must have matching asset dimensions")
+
+    q, e = _tail_factors(a1, df)
+    cw = W2 @ cov                                               # (K, N)
+    sigma = np.sqrt(np.einsum("kn,kn->k", cw, W2))
+    if (sigma <= 0).any():
+        raise ValueError("Portfolio scale is zero; weights span no risk under cov.")
+    grad = cw / sigma[:, None]                                  # d sigma / d w
+    m = W2 @ mu                                                 # (K,)
+
+    out = {
+        "VaR": -m[:, None] + sigma[:, None] * q,
+        "ES": -m[:, None] + sigma[:, None] * e,
+        "marginal_VaR": -mu + grad[:, None, :] * q[None, :, None],
+        "marginal_ES": -mu + grad[:, None, :] * e[None, :, None],
+    }
+    out["component_VaR"] = W2[:, None, :] * out["marginal_VaR"]
+    out["component_ES"] = W2[:, None, :] * out["marginal_ES"]
+
+    squeeze = [ax for ax, single in ((0, W.ndim == 1), (1, a.ndim == 0)) if single]
+    for k in out:
+        out[k] = out[k].squeeze(axis=tuple(squeeze)) if squeeze else out[k]
+    out["sigma"] = sigma[0] if W.ndim == 1 else sigma
+    return out
+
+
+def parametric_attribution_table(
+    returns: pd.DataFrame,
+    weights: pd.Series,
+    alpha: float = 0.95,
+    df: float | None = None,
+) -> pd.DataFrame:
+    """
+    Per-asset parametric attribution calibrated to a returns window (sample
+    mean and covariance). For Student-t the scale matrix is the sample
+    covariance * (df - 2) / df, so the model keeps the sample variance.
+    Returns DataFrame indexed by asset with:
+      weight, marginal_VaR, component_VaR, marginal_ES, component_ES
+    """
+    weights = weights.reindex(returns.columns).astype(float)
+    cov = returns.cov().to_numpy()
+    if df is not None:
+        if df <= 2:
+            raise ValueError("Moment matching the Student-t scale needs df > 2.")
+        cov = cov * (df - 2) / df
+    res = parametric_es_attribution(returns.mean().to_numpy(), cov, weights.to_numpy(), alpha, df=df)
+    return pd.DataFrame({
+        "weight": weights,
+        "marginal_VaR": res["marginal_VaR"],
+        "component_VaR": res["component_VaR"],
+        "marginal_ES": res["marginal_ES"],
+        "component_ES": res["component_ES"],
+    }, index=returns.columns).rename_axis("asset")
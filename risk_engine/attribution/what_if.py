@@ -0,0 +1,247 @@
+import numpy as np
+import pandas as pd
+
+from risk_engine.instrumentation import instrumented, stage
+from risk_engine.sim.monte_carlo import var_es_from_losses, var_es_from_weighted_losses
+
+
+def _envelope(losses: np.ndarray, norms: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rows that can be the largest of losses + norms * t for some t >= 0 (the
+    loss / norm Pareto front; usually a few dozen of them).
+    """
+    order = np.argsort(-norms, kind="stable")
+    best = np.maximum.accumulate(losses[order])
+    keep = order[np.r_[True, best[1:] > best[:-1]]]
+    return losses[keep], norms[keep]
+
+
+def _n_top(S: int, alpha: float) -> int:
+    """How many of the largest losses np.quantile(losses, alpha) reads (linear interpolation)."""
+    return S - int(np.floor(alpha * (S - 1)))
+
+
+@instrumented()
+def what_if_state(
+    scenarios,
+    weights,
+    alpha: float = 0.95,
+    probs: np.ndarray | None = None,
+    asset_names: list[str] | None = None,
+    tail_mult: float = 3.0,
+) -> dict:
+    """
+    Snapshot of a portfolio's tail for fast what-if checks.
+
+    scenarios: (S x N) asset (horizon) returns: MC horizon scenarios
+    (paths.sum(axis=1), as in mc_es_attribution), a reduced set with its
+    probs, or historical days (a DataFrame; the tail then matches
+    es_attribution_historical). weights: (N,) array or Series.
+
+    Besides the base VaR / ES / marginal and component ES, the state keeps
+    a candidate set: the worst scenarios at the current weights holding
+    tail_mult * (1 - alpha) of the probability. what_if_es re-ranks only
+    these rows. Every other scenario's new loss is at most its base loss plus
+    its row norm times ||trade||_2, which decides whether it can be affected.
+
+    Returns dict with:
+      - VaR, ES (positive), marginal_ES, component_ES (Series)
+      - tail (indices of scenarios in the base tail)
+      - losses (S,), contrib (S x N) per-scenario, per-asset loss contributions
+      - cand (candidate indices), rest (the others) with rest_norm, and
+        out_loss / out_norm (their loss / norm Pareto front)
+      - scenarios, probs (None if equally likely), weights, alpha, asset_names
+    """
+    if isinstance(scenarios, pd.DataFrame):
+        asset_names = list(scenarios.columns) if asset_names is None else asset_names
+        if isinstance(weights, pd.Series):
+            weights = weights.reindex(scenarios.columns)
+        scenarios = scenarios.to_numpy(dtype=float)
+    X = np.asarray(scenarios, dtype=float)
+    S, N = X.shape
+    names = asset_names if asset_names is not None else [f"asset_{i}" for i in range(N)]
+    w = np.asarray(weights, dtype=float)
+
+    contrib = -(X * w)                                # (S, N), positive = loss
+    losses = contrib.sum(axis=1)
+    if probs is None:
+        var, _ = var_es_from_losses(losses, alpha)
+        p = np.full(S, 1.0 / S)
+    else:
+        p = np.asarray(probs, dtype=float) / np.sum(probs)
+        var, _ = var_es_from_weighted_losses(losses, alpha, p)
+
+    tail = np.flatnonzero(losses >= var)
+    pt = p[tail] / p[tail].sum()
+    comp = pt @ contrib[tail]
+    mES = -(pt @ X[tail])                             # dES / dw_i
+
+    # Candidate set: enough probability (and rows) to hold the tail after moderate trades
+    order = np.argsort(-losses, kind="stable")
+    M = int(np.searchsorted(np.cumsum(p[order]), tail_mult * (1 - alpha))) + 1
+    M = min(S, max(M, 2 * _n_top(S, alpha)))
+    cand, rest = order[:M], order[M:]
+    rest_norm = np.sqrt((X[rest] ** 2).sum(axis=1))
+    out_loss, out_norm = _envelope(losses[rest], rest_norm)
+
+    return {
+        "VaR": float(var),
+        "ES": float(comp.sum()),
+        "marginal_ES": pd.Series(mES, index=names),
+        "component_ES": pd.Series(comp, index=names),
+        "tail": tail,
+        "losses": losses,
+        "contrib": contrib,
+        "cand": cand,
+        "rest": rest,
+        "rest_norm": rest_norm,
+        "out_loss": out_loss,
+        "out_norm": out_norm,
+        "scenarios": X,
+        "probs": None if probs is None else p,
+        "weights": w,
+        "alpha": alpha,
+        "asset_names": names,
+    }
+
+
+def _tail_from_top(Lc: np.ndarray, pc: np.ndarray | None, alpha: float, S: int):
+    """
+    VaR / ES per row of candidate losses Lc (B trades x M scenarios), assuming every loss
+    outside the candidates is below the returned floor lo (checked by the caller).
+    Same conventions as var_es_from_losses / var_es_from_weighted_losses.
+    lo is the smallest order statistic the VaR reads: np.quantile's lower
+    one when equally likely (an outside loss at or above it moves the
+    interpolated VaR), the VaR itself when weighted. Adding rows can only
+    raise these. Returns (VaR, ES, ok, lo); ok is False where the rows do not
+    hold the whole tail probability.
+    """
+    B, M = Lc.shape
+    if pc is None:
+        m = _n_top(S, alpha)
+        if m > M:
+            nan = np.full(B, np.nan)
+            return nan, nan, np.zeros(B, dtype=bool), nan
+        h = alpha * (S - 1)
+        frac = h - np.floor(h)
+        top = -np.partition(-Lc, [m - 2, m - 1] if m >= 2 else [0], axis=1)
+        lo = top[:, m - 1]                             # ascending order statistic floor(h)
+        hi = top[:, m - 2] if m >= 2 else lo
+        var = lo + frac * (hi - lo)
+        tail = Lc >= var[:, None]
+        es = (Lc * tail).sum(axis=1) / tail.sum(axis=1)
+        return var, es, np.ones(B, dtype=bool), lo
+
+    # Weighted inverse CDF, read from the top: the VaR scenario is the last one
+    # whose probability strictly above it stays within 1 - alpha
+    order = np.argsort(-Lc, axis=1, kind="stable")
+    Ls = np.take_along_axis(Lc, order, axis=1)
+    above = np.cumsum(pc[order], axis=1) - pc[order]
+    n_within = (above <= 1 - alpha).sum(axis=1)
+    var = Ls[np.arange(B), n_within - 1]
+    tail = Lc >= var[:, None]
+    es = (Lc * tail) @ pc / (tail @ pc)
+    return var, es, (n_within < M) | (pc.sum() >= 1 - 1e-12), var
+
+
+@instrumented()
+def what_if_es(state: dict, trades, exact: bool = True) -> pd.DataFrame:
+    """
+    VaR / ES after each of B candidate trades, in one batch.
+
+    trades: (B x N) weight changes (array, or DataFrame with asset columns;
+    missing assets count as no change).
+
+    ES_first_order = ES + marginal_ES . trade is available without touching
+    the scenarios (Euler: ES is homogeneous of degree one in the weights).
+    With exact=True, new losses are computed on the candidate rows only,
+    (B x N) @ (N x M), and re-ranked per trade. Outside scenarios whose loss
+    bound reaches the lowest order statistic behind a trade's candidate VaR
+    (the VaR itself when weighted) are the only ones that could move its VaR
+    or enter its tail: those rows are rescored exactly and re-ranked with the
+    candidates. The result equals a full recomputation; small trades usually
+    rescore nothing, and the Pareto front skips them in O(front x B).
+
+    Returns DataFrame (one row per trade) with:
+      - ES_first_order, dES_first_order
+      - VaR, ES, dVaR, dES (exact=True)
+      - rescored (outside scenarios rescored for the trade; 0 = candidates only)
+    """
+    names = state["asset_names"]
+    if isinstance(trades, pd.DataFrame):
+        index = trades.index
+        D = trades.reindex(columns=names, fill_value=0.0).to_numpy(dtype=float)
+    else:
+        D = np.atleast_2d(np.asarray(trades, dtype=float))
+        index = pd.RangeIndex(len(D), name="trade")
+
+    d_first = D @ state["marginal_ES"].to_numpy()
+    out = pd.DataFrame({
+        "ES_first_order": state["ES"] + d_first,
+        "dES_first_order": d_first,
+    }, index=index)
+    if not exact:
+        return out
+
+    X, p, alpha = state["scenarios"], state["probs"], state["alpha"]
+    cand = state["cand"]
+    S = X.shape[0]
+
+    with stage("what_if_candidates"):
+        Lc = state["losses"][cand] - D @ X[cand].T                # (B, M)
+        pc = None if p is None else p[cand]
+        var, es, ok, lo = _tail_from_top(Lc, pc, alpha, S)
+        size = np.sqrt((D ** 2).sum(axis=1))
+        bound = (state["out_loss"][:, None] + state["out_norm"][:, None] * size).max(axis=0, initial=-np.inf)
+        rescored = np.zeros(len(D), dtype=int)
+
+    # Trades whose bound reaches their VaR's lower order statistic: rescore the outside rows that can cross it
+    hit = np.flatnonzero(ok & (lo <= bound))
+    if len(hit):
+        with stage("what_if_rescore"):
+            rest = state["rest"]
+            reach = state["losses"][rest] + size[hit, None] * state["rest_norm"] >= lo[hit, None]
+            n_reach = reach.sum(axis=1)
+            # Trades reaching more rows than the candidate set are cheaper done in full
+            big = n_reach > len(cand)
+            ok[hit[big]] = False
+            hit, reach, n_reach = hit[~big], reach[~big], n_reach[~big]
+            rows = rest[reach.any(axis=0)]
+            L_hit = np.hstack([Lc[hit], state["losses"][rows] - D[hit] @ X[rows].T])
+            p_hit = None if p is None else np.concatenate([pc, p[rows]])
+            var[hit], es[hit], ok[hit], _ = _tail_from_top(L_hit, p_hit, alpha, S)
+            rescored[hit] = n_reach
+
+    # Large trades, or candidates short of the tail probability: full recomputation
+    redo = np.flatnonzero(~ok)
+    if len(redo):
+        with stage("what_if_full"):
+            L = state["losses"] - D[redo] @ X.T                   # (len(redo), S)
+            var[redo], es[redo], _, _ = _tail_from_top(L, p, alpha, S)
+            rescored[redo] = S - len(cand)
+
+    out["VaR"] = var
+    out["ES"] = es
+    out["dVaR"] = var - state["VaR"]
+    out["dES"] = es - state["ES"]
+    out["rescored"] = rescored
+    return out
+
+
+def pair_trades(asset_names: list[str], sizes=(0.01, 0.05)) -> pd.DataFrame:
+    """
+    Every 'sell `from`, buy `to`' switch of each size (sums to zero), indexed
+    by (from, to, size): the usual pre-trade candidate list.
+    """
+    N = len(asset_names)
+    rows, idx = [], []
+    for size in sizes:
+        for i in range(N):
+            for j in range(N):
+                if i != j:
+                    d = np.zeros(N)
+                    d[i], d[j] = -size, size
+                    rows.append(d)
+                    idx.append((asset_names[i], asset_names[j], size))
+    return pd.DataFrame(rows, columns=asset_names,
+                        index=pd.MultiIndex.from_tuples(idx, names=["from", "to", "size"]))
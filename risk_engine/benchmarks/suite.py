@@ -0,0 +1,959 @@
+import importlib
+import inspect
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+
+from risk_engine import kernels, memo
+from risk_engine.benchmarks.synthetic import (
+    synthetic_asset_returns,
+    synthetic_portfolio_returns,
+    synthetic_paths,
+)
+
+
+DEFAULT_PARAMS = {
+    "T": 2000,          # history length (days)
+    "N": 7,             # number of assets
+    "window": 60,       # rolling window
+    "n_sims": 50_000,   # MC scenarios
+    "horizon": 10,      # MC horizon (days)
+    "alpha": 0.95,
+    "T_fit": 250,       # history length for single MLE fits (t-fits are slow)
+    "fit_windows": 20,  # windows refit by MLE in the rolling Student-t cases
+    "n_factors": 5,
+    "seed": 0,
+}
+
+# Modules whose public functions the suite is expected to cover
+COVERED_MODULES = [
+    "risk_engine.models.var_es",
+    "risk_engine.models.factor_model",
+    "risk_engine.models.fhs",
+    "risk_engine.models.covariance",
+    "risk_engine.models.bootstrap_ci",
+    "risk_engine.sim.monte_carlo",
+    "risk_engine.sim.sweep",
+    "risk_engine.sim.dated_mc",
+    "risk_engine.sim.sketch",
+    "risk_engine.sim.reduction",
+    "risk_engine.attribution.es_attribution",
+    "risk_engine.attribution.what_if",
+    "risk_engine.attribution.parametric",
+    "risk_engine.attribution.kernel_es",
+    "risk_engine.validation.backtesting",
+    "risk_engine.stress.window_scan",
+    "risk_engine.stress.scenarios",
+    "risk_engine.parallel",
+    "risk_engine.streaming",
+    "risk_engine.optimization.mean_es",
+    "risk_engine.kernels",
+    "risk_engine.plotting",
+    "risk_engine.history",
+]
+
+# Public functions deliberately left out (constructors / writers, not hot paths)
+UNBENCHMARKED = {
+    "stress.scenarios.scenario_library",
+    "stress.scenarios.save_scenario_library",
+    "stress.scenarios.cached_scenarios_from_csv",
+    "sim.sketch.save_sketches",
+    "sim.sketch.load_sketches",
+    "parallel.chunk_bounds",
+    "sim.reduction.save_reduced_scenarios",
+    "sim.reduction.load_reduced_scenarios",
+    "attribution.what_if.pair_trades",
+    "models.bootstrap_ci.resample_indices",
+    "models.bootstrap_ci.jackknife_indices",
+    "validation.backtesting.kupiec_from_counts",
+    "validation.backtesting.christoffersen_from_counts",
+    "streaming.iter_csv_chunks",
+    "streaming.iter_frame_chunks",
+    "streaming.portfolio_chunks",
+    "streaming.write_stream",
+    "kernels.backend",
+    "kernels.use_backend",
+    "kernels.quantile_index",
+    "kernels.compare_backends",
+    "plotting.load_frame",
+    "plotting.render",
+    "models.covariance.chol_update",
+    "models.covariance.chol_downdate",
+    "models.covariance.iter_covariance",
+    "history.is_enabled",
+    "history.list_runs",
+    "history.compact",
+}
+
+# name -> setup(params) returning a zero-argument callable to time
+CASES = {}
+
+# name -> most timed runs for slow cases (one MLE fit per window), whatever --repeat says
+MAX_REPEAT = {}
+
+
+def case(name: str, max_repeat: int | None = None):
+    """Register a benchmark case. The name is '<module>.<function>'."""
+    def register(setup):
+        CASES[name] = setup
+        if max_repeat is not None:
+            MAX_REPEAT[name] = max_repeat
+        return setup
+    return register
+
+
+def _fit_length(p) -> int:
+    """History length giving p["fit_windows"] rolling windows."""
+    return p["window"] + p["fit_windows"]
+
+
+# -----------------------
+# models
+# -----------------------
+@case("models.var_es.portfolio_returns")
+def _bench_portfolio_returns(p):
+    from risk_engine.models.var_es import portfolio_returns
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = np.ones(p["N"]) / p["N"]
+    return lambda: portfolio_returns(r, w)
+
+
+def _portfolio_metric(fn_name, T_key="T"):
+    def setup(p):
+        mod = importlib.import_module("risk_engine.models.var_es")
+        fn = getattr(mod, fn_name)
+        rp = synthetic_portfolio_returns(p[T_key], seed=p["seed"])
+        return lambda: fn(rp, p["alpha"])
+    return setup
+
+
+for _fn in ["var_gaussian", "es_gaussian", "var_historical", "es_historical"]:
+    case(f"models.var_es.{_fn}")(_portfolio_metric(_fn))
+case("models.var_es.es_student_t")(_portfolio_metric("es_student_t", T_key="T_fit"))
+
+
+@case("models.var_es.fit_student_t")
+def _bench_fit_student_t(p):
+    from risk_engine.models.var_es import fit_student_t
+    x = synthetic_portfolio_returns(p["T_fit"], seed=p["seed"]).values
+    return lambda: fit_student_t(x)
+
+
+@case("models.bootstrap_ci.var_es_ci")
+def _bench_var_es_ci(p):
+    from risk_engine.models.bootstrap_ci import var_es_ci
+    rp = synthetic_portfolio_returns(p["T"], seed=p["seed"])
+    return lambda: var_es_ci(rp, p["alpha"])
+
+
+@case("models.bootstrap_ci.es_attribution_ci")
+def _bench_es_attribution_ci(p):
+    from risk_engine.models.bootstrap_ci import es_attribution_ci
+    df = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = pd.Series(1.0 / p["N"], index=df.columns)
+    return lambda: es_attribution_ci(df, w, p["alpha"])
+
+
+@case("models.bootstrap_ci.rolling_var_es_ci")
+def _bench_rolling_var_es_ci(p):
+    from risk_engine.models.bootstrap_ci import rolling_var_es_ci
+    rp = synthetic_portfolio_returns(p["T"], seed=p["seed"])
+    return lambda: rolling_var_es_ci(rp, p["alpha"], p["window"])
+
+
+@case("models.factor_model.ledoit_wolf_shrinkage")
+def _bench_ledoit_wolf(p):
+    from risk_engine.models.factor_model import ledoit_wolf_shrinkage
+    x = synthetic_asset_returns(p["window"], p["N"], seed=p["seed"]).values
+    x = x - x.mean(axis=0)
+    return lambda: ledoit_wolf_shrinkage(x)
+
+
+@case("models.factor_model.fit_factor_model")
+def _bench_fit_factor_model(p):
+    from risk_engine.models.factor_model import fit_factor_model
+    r = synthetic_asset_returns(p["window"], p["N"], seed=p["seed"])
+    return lambda: fit_factor_model(r, n_factors=p["n_factors"])
+
+
+@case("models.factor_model.factor_model_cov")
+def _bench_factor_model_cov(p):
+    from risk_engine.models.factor_model import fit_factor_model, factor_model_cov
+    fm = fit_factor_model(synthetic_asset_returns(p["window"], p["N"], seed=p["seed"]), p["n_factors"])
+    return lambda: factor_model_cov(fm)
+
+
+def _fhs_case(fn_name, T_key="T", **kwargs):
+    def setup(p):
+        mod = importlib.import_module("risk_engine.models.fhs")
+        fn = getattr(mod, fn_name)
+        rp = synthetic_portfolio_returns(p[T_key], seed=p["seed"])
+        return lambda: fn(rp, p["alpha"], **kwargs)
+    return setup
+
+
+for _fn in ["var_fhs", "es_fhs"]:
+    case(f"models.fhs.{_fn}")(_fhs_case(_fn))
+case("models.fhs.rolling_metrics_fhs")(_fhs_case("rolling_metrics_fhs", model="ewma"))
+
+
+@case("models.fhs.ewma_variance")
+def _bench_ewma_variance(p):
+    from risk_engine.models.fhs import ewma_variance
+    x = synthetic_portfolio_returns(p["T"], seed=p["seed"]).values
+    return lambda: ewma_variance(x)
+
+
+@case("models.fhs.garch11_variance")
+def _bench_garch11_variance(p):
+    from risk_engine.models.fhs import garch11_variance
+    x = synthetic_portfolio_returns(p["T"], seed=p["seed"]).values
+    return lambda: garch11_variance(x, {"omega": 1e-6, "alpha": 0.08, "beta": 0.9}, float(np.var(x)))
+
+
+@case("models.fhs.garch11_fit")
+def _bench_garch11_fit(p):
+    from risk_engine.models.fhs import garch11_fit
+    x = synthetic_portfolio_returns(p["T"], seed=p["seed"]).values
+    return lambda: garch11_fit(x)
+
+
+@case("models.fhs.filtered_variance")
+def _bench_filtered_variance(p):
+    from risk_engine.models.fhs import filtered_variance
+    x = synthetic_portfolio_returns(p["T_fit"], seed=p["seed"]).values
+    return lambda: filtered_variance(x, model="garch")
+
+
+@case("models.covariance.covariance_path")
+def _bench_covariance_path(p):
+    from risk_engine.models.covariance import covariance_path
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    window = max(p["window"], p["N"] + 1)                # needs more rows than assets
+    return lambda: covariance_path(r, "rolling", window=window, cholesky=True)
+
+
+# -----------------------
+# sim
+# -----------------------
+def _calibration(p):
+    r = synthetic_asset_returns(p["window"], p["N"], seed=p["seed"])
+    return r, r.mean(axis=0).values, r.cov().values
+
+
+@case("sim.monte_carlo.portfolio_returns_from_assets")
+def _bench_port_from_assets(p):
+    from risk_engine.sim.monte_carlo import portfolio_returns_from_assets
+    paths = synthetic_paths(p["n_sims"], p["horizon"], p["N"], seed=p["seed"])
+    w = np.ones(p["N"]) / p["N"]
+    return lambda: portfolio_returns_from_assets(paths, w)
+
+
+@case("sim.monte_carlo.var_es_from_losses")
+def _bench_var_es_from_losses(p):
+    from risk_engine.sim.monte_carlo import var_es_from_losses
+    losses = np.random.default_rng(p["seed"]).standard_t(5.0, size=p["n_sims"])
+    return lambda: var_es_from_losses(losses, p["alpha"])
+
+
+@case("sim.monte_carlo.simulate_gaussian_mc")
+def _bench_sim_gaussian(p):
+    from risk_engine.sim.monte_carlo import simulate_gaussian_mc
+    _, mu, cov = _calibration(p)
+    return lambda: simulate_gaussian_mc(mu, cov, p["n_sims"], p["horizon"], np.random.default_rng(p["seed"]))
+
+
+@case("sim.monte_carlo.simulate_student_t_mc")
+def _bench_sim_student_t(p):
+    from risk_engine.sim.monte_carlo import simulate_student_t_mc
+    _, mu, cov = _calibration(p)
+    return lambda: simulate_student_t_mc(mu, cov, 6.0, p["n_sims"], p["horizon"], np.random.default_rng(p["seed"]))
+
+
+@case("sim.monte_carlo.simulate_bootstrap_mc")
+def _bench_sim_bootstrap(p):
+    from risk_engine.sim.monte_carlo import simulate_bootstrap_mc
+    r, _, _ = _calibration(p)
+    return lambda: simulate_bootstrap_mc(r, p["n_sims"], p["horizon"], np.random.default_rng(p["seed"]))
+
+
+@case("sim.monte_carlo.simulate_factor_gaussian_mc")
+def _bench_sim_factor_gaussian(p):
+    from risk_engine.models.factor_model import fit_factor_model
+    from risk_engine.sim.monte_carlo import simulate_factor_gaussian_mc
+    fm = fit_factor_model(synthetic_asset_returns(p["window"], p["N"], seed=p["seed"]), p["n_factors"])
+    return lambda: simulate_factor_gaussian_mc(
+        fm["mu"], fm["loadings"], fm["specific_var"], p["n_sims"], p["horizon"], np.random.default_rng(p["seed"])
+    )
+
+
+@case("sim.monte_carlo.simulate_factor_student_t_mc")
+def _bench_sim_factor_student_t(p):
+    from risk_engine.models.factor_model import fit_factor_model
+    from risk_engine.sim.monte_carlo import simulate_factor_student_t_mc
+    fm = fit_factor_model(synthetic_asset_returns(p["window"], p["N"], seed=p["seed"]), p["n_factors"])
+    return lambda: simulate_factor_student_t_mc(
+        fm["mu"], fm["loadings"], fm["specific_var"], 6.0, p["n_sims"], p["horizon"], np.random.default_rng(p["seed"])
+    )
+
+
+@case("sim.monte_carlo.marginal_inverse_cdf_tables")
+def _bench_marginal_tables(p):
+    from risk_engine.sim.monte_carlo import marginal_inverse_cdf_tables
+    df = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    return lambda: marginal_inverse_cdf_tables(df, marginals="gpd")
+
+
+@case("sim.monte_carlo.fit_t_copula")
+def _bench_fit_t_copula(p):
+    from risk_engine.sim.monte_carlo import fit_t_copula
+    df = synthetic_asset_returns(p["T_fit"], p["N"], seed=p["seed"])
+    return lambda: fit_t_copula(df)
+
+
+@case("sim.monte_carlo.simulate_t_copula_mc")
+def _bench_t_copula(p):
+    from risk_engine.sim.monte_carlo import fit_t_copula, marginal_inverse_cdf_tables, simulate_t_copula_mc
+    df = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    cop = fit_t_copula(df, df=6.0)
+    tables = marginal_inverse_cdf_tables(df)
+    return lambda: simulate_t_copula_mc(
+        cop["corr"], cop["df"], tables, p["n_sims"], p["horizon"], np.random.default_rng(p["seed"])
+    )
+
+
+@case("sim.sweep.common_draws")
+def _bench_common_draws(p):
+    from risk_engine.sim.sweep import common_draws
+    return lambda: common_draws(p["n_sims"], p["horizon"], np.random.default_rng(p["seed"]))
+
+
+@case("sim.sweep.crn_sweep")
+def _bench_crn_sweep(p):
+    from risk_engine.sim.sweep import crn_sweep
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = np.ones(p["N"]) / p["N"]
+    windows = [(str(r.index[i].date()), str(r.index[i + p["window"] - 1].date())) for i in (0, p["T"] // 2)]
+    return lambda: crn_sweep(r, w, windows, horizons=(1, p["horizon"]), n_sims=p["n_sims"], seed=p["seed"])
+
+
+@case("sim.dated_mc.horizon_shocks")
+def _bench_horizon_shocks(p):
+    from risk_engine.sim.dated_mc import horizon_shocks
+    return lambda: horizon_shocks(p["n_sims"], p["horizon"], p["N"], np.random.default_rng(p["seed"]), df=6.0)
+
+
+@case("sim.dated_mc.dated_mc_es")
+def _bench_dated_mc_es(p):
+    from risk_engine.sim.dated_mc import dated_mc_es
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = np.ones(p["N"]) / p["N"]
+    window = max(p["window"], p["N"] + 1)
+    return lambda: dated_mc_es(r, w, p["alpha"], p["horizon"], p["n_sims"], method="rolling", window=window,
+                               start=r.index[-20], seed=p["seed"])
+
+
+@case("sim.monte_carlo.var_es_from_weighted_losses")
+def _bench_var_es_weighted(p):
+    from risk_engine.sim.monte_carlo import var_es_from_weighted_losses
+    rng = np.random.default_rng(p["seed"])
+    losses = rng.standard_t(5.0, size=p["n_sims"])
+    probs = rng.random(p["n_sims"])
+    return lambda: var_es_from_weighted_losses(losses, p["alpha"], probs)
+
+
+def _horizon_scenarios(p):
+    return synthetic_paths(p["n_sims"], p["horizon"], p["N"], seed=p["seed"]).sum(axis=1)
+
+
+@case("sim.reduction.reduce_scenarios")
+def _bench_reduce_scenarios(p):
+    from risk_engine.sim.reduction import reduce_scenarios
+    x = _horizon_scenarios(p)
+    return lambda: reduce_scenarios(x, np.ones(p["N"]) / p["N"])
+
+
+@case("sim.reduction.weighted_component_es")
+def _bench_weighted_component_es(p):
+    from risk_engine.sim.reduction import reduce_scenarios, weighted_component_es
+    w = np.ones(p["N"]) / p["N"]
+    red = reduce_scenarios(_horizon_scenarios(p), w)
+    return lambda: weighted_component_es(red["scenarios"], w, p["alpha"], red["probs"])
+
+
+@case("sim.reduction.reduction_error")
+def _bench_reduction_error(p):
+    from risk_engine.sim.reduction import reduce_scenarios, reduction_error
+    x = _horizon_scenarios(p)
+    w = np.ones(p["N"]) / p["N"]
+    red = reduce_scenarios(x, w)
+    return lambda: reduction_error(x, red, w)
+
+
+@case("sim.sketch.loss_sketch")
+def _bench_loss_sketch(p):
+    from risk_engine.sim.sketch import loss_sketch
+    losses = np.random.default_rng(p["seed"]).standard_t(5.0, size=p["n_sims"])
+    return lambda: loss_sketch(losses)
+
+
+@case("sim.sketch.merge_sketches")
+def _bench_merge_sketches(p):
+    from risk_engine.sim.sketch import loss_sketch, merge_sketches
+    losses = np.random.default_rng(p["seed"]).standard_t(5.0, size=p["n_sims"])
+    parts = [loss_sketch(c) for c in np.array_split(losses, 16)]
+    return lambda: merge_sketches(parts)
+
+
+@case("sim.sketch.sketch_var_es")
+def _bench_sketch_var_es(p):
+    from risk_engine.sim.sketch import loss_sketch, sketch_var_es
+    sk = loss_sketch(np.random.default_rng(p["seed"]).standard_t(5.0, size=p["n_sims"]), tail_k=256)
+    return lambda: sketch_var_es(sk, p["alpha"])
+
+
+@case("run_mc_es_attribution.mc_es_attribution")
+def _bench_mc_es_attribution(p):
+    from risk_engine.run_mc_es_attribution import mc_es_attribution
+    paths = synthetic_paths(p["n_sims"], p["horizon"], p["N"], seed=p["seed"])
+    w = np.ones(p["N"]) / p["N"]
+    names = [f"A{i}" for i in range(p["N"])]
+    return lambda: mc_es_attribution(paths, w, p["alpha"], names)
+
+
+# -----------------------
+# attribution
+# -----------------------
+@case("attribution.es_attribution.es_attribution_historical")
+def _bench_es_attribution(p):
+    from risk_engine.attribution.es_attribution import es_attribution_historical
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = pd.Series(1.0 / p["N"], index=r.columns)
+    return lambda: es_attribution_historical(r, w, alpha=p["alpha"])
+
+
+@case("attribution.es_attribution.rolling_es_attribution_historical")
+def _bench_rolling_es_attribution(p):
+    from risk_engine.attribution.es_attribution import rolling_es_attribution_historical
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = pd.Series(1.0 / p["N"], index=r.columns)
+    return lambda: rolling_es_attribution_historical(r, w, alpha=p["alpha"], window=p["window"])
+
+
+@case("attribution.what_if.what_if_state")
+def _bench_what_if_state(p):
+    from risk_engine.attribution.what_if import what_if_state
+    x = _horizon_scenarios(p)
+    return lambda: what_if_state(x, np.ones(p["N"]) / p["N"], p["alpha"])
+
+
+@case("attribution.what_if.what_if_es")
+def _bench_what_if_es(p):
+    from risk_engine.attribution.what_if import what_if_state, what_if_es, pair_trades
+    names = [f"A{i}" for i in range(p["N"])]
+    state = what_if_state(_horizon_scenarios(p), np.ones(p["N"]) / p["N"], p["alpha"], asset_names=names)
+    trades = pair_trades(names, sizes=(0.01, 0.05))
+    return lambda: what_if_es(state, trades)
+
+
+@case("attribution.parametric.parametric_es_attribution")
+def _bench_parametric_es_attribution(p):
+    from risk_engine.attribution.parametric import parametric_es_attribution
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    W = np.random.default_rng(p["seed"]).dirichlet(np.ones(p["N"]), size=10_000)
+    mu, cov = r.mean().to_numpy(), r.cov().to_numpy()
+    return lambda: parametric_es_attribution(mu, cov, W, [0.95, 0.975, 0.99], df=6.0)
+
+
+@case("attribution.parametric.parametric_attribution_table")
+def _bench_parametric_attribution_table(p):
+    from risk_engine.attribution.parametric import parametric_attribution_table
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = pd.Series(1.0 / p["N"], index=r.columns)
+    return lambda: parametric_attribution_table(r, w, p["alpha"], df=6.0)
+
+
+@case("attribution.kernel_es.kernel_bandwidths")
+def _bench_kernel_bandwidths(p):
+    from risk_engine.attribution.kernel_es import kernel_bandwidths
+    losses = -(_horizon_scenarios(p) @ (np.ones(p["N"]) / p["N"]))[None, :]
+    return lambda: kernel_bandwidths(losses)
+
+
+@case("attribution.kernel_es.kernel_es_attribution")
+def _bench_kernel_es_attribution(p):
+    from risk_engine.attribution.kernel_es import kernel_es_attribution
+    x = _horizon_scenarios(p)
+    return lambda: kernel_es_attribution(x, np.ones(p["N"]) / p["N"], p["alpha"], method="tail")
+
+
+@case("attribution.kernel_es.mc_kernel_es_attribution")
+def _bench_mc_kernel_es_attribution(p):
+    from risk_engine.attribution.kernel_es import mc_kernel_es_attribution
+    paths = synthetic_paths(p["n_sims"], p["horizon"], p["N"], seed=p["seed"])
+    names = [f"A{i}" for i in range(p["N"])]
+    return lambda: mc_kernel_es_attribution(paths, np.ones(p["N"]) / p["N"], p["alpha"], names, method="tail")
+
+
+@case("attribution.kernel_es.rolling_kernel_es_attribution")
+def _bench_rolling_kernel_es_attribution(p):
+    from risk_engine.attribution.kernel_es import rolling_kernel_es_attribution
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = pd.Series(1.0 / p["N"], index=r.columns)
+    return lambda: rolling_kernel_es_attribution(r, w, p["alpha"], p["window"], method="tail")
+
+
+@case("parallel.parallel_rolling")
+def _bench_parallel_rolling(p):
+    from risk_engine.attribution.es_attribution import rolling_es_attribution_historical
+    from risk_engine.parallel import parallel_rolling
+    r = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = pd.Series(1.0 / p["N"], index=r.columns)
+    return lambda: parallel_rolling(
+        rolling_es_attribution_historical, r, p["window"], w, alpha=p["alpha"], workers=os.cpu_count()
+    )
+
+
+# -----------------------
+# optimization
+# -----------------------
+@case("optimization.mean_es.optimize_mean_es")
+def _bench_optimize_mean_es(p):
+    from risk_engine.optimization.mean_es import optimize_mean_es
+    scenarios = synthetic_paths(p["n_sims"], p["horizon"], p["N"], seed=p["seed"]).sum(axis=1)
+    return lambda: optimize_mean_es(scenarios, alpha=p["alpha"], max_weight=0.4)
+
+
+# -----------------------
+# stress
+# -----------------------
+@case("stress.window_scan.scan_stress_windows")
+def _bench_scan_stress_windows(p):
+    from risk_engine.stress.window_scan import scan_stress_windows
+    rp = synthetic_portfolio_returns(p["T"], seed=p["seed"])
+    return lambda: scan_stress_windows(rp, lengths=(21, p["window"], 126), alpha=p["alpha"])
+
+
+@case("stress.window_scan.top_stress_windows")
+def _bench_top_stress_windows(p):
+    from risk_engine.stress.window_scan import scan_stress_windows, top_stress_windows
+    scan = scan_stress_windows(synthetic_portfolio_returns(p["T"], seed=p["seed"]), lengths=(21, p["window"], 126))
+    return lambda: top_stress_windows(scan, k=5)
+
+
+def _synthetic_library(p, n_scenarios=5000, n_days=5):
+    from risk_engine.stress.scenarios import scenario_library
+    rng = np.random.default_rng(p["seed"])
+    shocks = np.clip(rng.normal(0.0, 0.05, size=(n_scenarios, n_days, p["N"])), -0.9, None)
+    return scenario_library([f"S{i}" for i in range(n_scenarios)], [f"A{i}" for i in range(p["N"])], shocks)
+
+
+@case("stress.scenarios.scenario_pnl")
+def _bench_scenario_pnl(p):
+    from risk_engine.stress.scenarios import scenario_pnl
+    lib = _synthetic_library(p)
+    w = pd.DataFrame(np.random.default_rng(p["seed"]).dirichlet(np.ones(p["N"]), size=100), columns=lib["assets"])
+    return lambda: scenario_pnl(lib, w)
+
+
+@case("stress.scenarios.scenario_report")
+def _bench_scenario_report(p):
+    from risk_engine.stress.scenarios import scenario_report
+    lib = _synthetic_library(p)
+    w = pd.Series(1.0 / p["N"], index=lib["assets"])
+    return lambda: scenario_report(lib, w)
+
+
+@case("stress.scenarios.scenarios_from_csv")
+def _bench_scenarios_from_csv(p):
+    import os
+    import tempfile
+    from risk_engine.stress.scenarios import scenarios_from_csv
+    lib = _synthetic_library(p, n_scenarios=1000)
+    s_idx, d_idx, a_idx = np.nonzero(lib["shocks"])
+    path = os.path.join(tempfile.mkdtemp(), "scenarios.csv")
+    pd.DataFrame({
+        "scenario": np.array(lib["names"])[s_idx],
+        "day": d_idx + 1,
+        "asset": np.array(lib["assets"])[a_idx],
+        "shock": lib["shocks"][s_idx, d_idx, a_idx],
+    }).to_csv(path, index=False)
+    return lambda: scenarios_from_csv(path)
+
+
+@case("stress.scenarios.load_scenario_library")
+def _bench_load_scenario_library(p):
+    import os
+    import tempfile
+    from risk_engine.stress.scenarios import save_scenario_library, load_scenario_library
+    path = os.path.join(tempfile.mkdtemp(), "scenarios.npz")
+    save_scenario_library(_synthetic_library(p), path)
+    return lambda: load_scenario_library(path)
+
+
+# -----------------------
+# validation + rolling runners
+# -----------------------
+def _backtest_inputs(p):
+    rp = synthetic_portfolio_returns(p["T"], seed=p["seed"])
+    var = rp.rolling(p["window"]).quantile(1 - p["alpha"]).shift(1).dropna() * -1.0
+    return rp, var
+
+
+@case("validation.backtesting.kupiec_test")
+def _bench_kupiec(p):
+    from risk_engine.validation.backtesting import kupiec_test
+    rp, var = _backtest_inputs(p)
+    return lambda: kupiec_test(rp, var, p["alpha"])
+
+
+@case("validation.backtesting.christoffersen_test")
+def _bench_christoffersen(p):
+    from risk_engine.validation.backtesting import christoffersen_test
+    rp, var = _backtest_inputs(p)
+    return lambda: christoffersen_test(rp, var)
+
+
+@case("validation.backtesting.transition_counts")
+def _bench_transition_counts(p):
+    from risk_engine.validation.backtesting import transition_counts
+    rp, var = _backtest_inputs(p)
+    breaches = (rp < -var.reindex(rp.index)).to_numpy()
+    return lambda: transition_counts(breaches)
+
+
+# -----------------------
+# streaming
+# -----------------------
+STREAM_CHUNK = 256
+
+
+@case("streaming.stream_blocks")
+def _bench_stream_blocks(p):
+    from risk_engine.streaming import iter_frame_chunks, stream_blocks
+    df = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    return lambda: sum(len(b) for b in stream_blocks(iter_frame_chunks(df, STREAM_CHUNK), p["window"]))
+
+
+@case("streaming.stream_rolling")
+def _bench_stream_rolling(p):
+    from risk_engine.attribution.es_attribution import rolling_es_attribution_historical
+    from risk_engine.streaming import iter_frame_chunks, stream_rolling
+    df = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    w = pd.Series(1.0 / p["N"], index=df.columns)
+    return lambda: pd.concat(stream_rolling(
+        rolling_es_attribution_historical, iter_frame_chunks(df, STREAM_CHUNK), p["window"], w, alpha=p["alpha"],
+    ))
+
+
+# The Student-t models refit per window: fit_windows windows, streamed in two chunks
+@case("streaming.stream_rolling_var_es", max_repeat=2)
+def _bench_stream_rolling_var_es(p):
+    from risk_engine.streaming import iter_frame_chunks, stream_rolling_var_es
+    rp = synthetic_portfolio_returns(_fit_length(p), seed=p["seed"])
+    chunk = max(1, p["fit_windows"] // 2)
+    return lambda: pd.concat(stream_rolling_var_es(iter_frame_chunks(rp, chunk), p["alpha"], p["window"]))
+
+
+@case("streaming.stream_backtest", max_repeat=2)
+def _bench_stream_backtest(p):
+    from risk_engine.streaming import iter_frame_chunks, stream_backtest
+    rp = synthetic_portfolio_returns(_fit_length(p), seed=p["seed"])
+    chunk = max(1, p["fit_windows"] // 2)
+    return lambda: stream_backtest(iter_frame_chunks(rp, chunk), p["alpha"], p["window"])
+
+
+# -----------------------
+# kernels (whichever backend is active; see meta["kernels"])
+# -----------------------
+@case("kernels.rolling_mean_std")
+def _bench_rolling_mean_std(p):
+    from risk_engine.kernels import rolling_mean_std
+    x = synthetic_portfolio_returns(p["T"], seed=p["seed"]).to_numpy()
+    return lambda: rolling_mean_std(x, p["window"])
+
+
+@case("kernels.rolling_quantile_tail")
+def _bench_rolling_quantile_tail(p):
+    from risk_engine.kernels import rolling_quantile_tail
+    x = synthetic_portfolio_returns(p["T"], seed=p["seed"]).to_numpy()
+    return lambda: rolling_quantile_tail(x, p["window"], p["alpha"])
+
+
+@case("kernels.breach_transitions")
+def _bench_breach_transitions(p):
+    from risk_engine.kernels import breach_transitions
+    rp, var = _backtest_inputs(p)
+    breaches = (rp < -var.reindex(rp.index)).to_numpy()
+    return lambda: breach_transitions(breaches)
+
+
+@case("kernels.rolling_tail_attribution")
+def _bench_rolling_tail_attribution(p):
+    from risk_engine.kernels import rolling_tail_attribution
+    R = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"]).to_numpy()
+    return lambda: rolling_tail_attribution(R, np.ones(p["N"]) / p["N"], p["window"], p["alpha"])
+
+
+@case("kernels.chol_rank1")
+def _bench_chol_rank1(p):
+    from risk_engine.kernels import chol_rank1
+    R = synthetic_asset_returns(max(p["window"], 2 * p["N"]), p["N"], seed=p["seed"]).to_numpy()
+    L0 = np.linalg.cholesky(np.cov(R.T))
+
+    def run():
+        L = L0.copy()
+        chol_rank1(L, R[-1].copy(), 1.0)
+        return chol_rank1(L, R[-1].copy(), -1.0)
+    return run
+
+
+# -----------------------
+# plotting (decimation only; rendering needs matplotlib)
+# -----------------------
+@case("plotting.lttb_indices")
+def _bench_lttb_indices(p):
+    from risk_engine.plotting import MAX_POINTS, lttb_indices
+    y = synthetic_portfolio_returns(p["T"], seed=p["seed"]).cumsum().to_numpy()
+    return lambda: lttb_indices(y, min(MAX_POINTS, max(3, len(y) // 4)))
+
+
+@case("plotting.decimate")
+def _bench_decimate(p):
+    from risk_engine.plotting import decimate
+    R = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"]).cumsum()
+    return lambda: decimate(R, max(3, p["T"] // 4))
+
+
+# -----------------------
+# history (temporary store)
+# -----------------------
+HISTORY_RUNS = 200
+
+
+@case("history.record_run")
+def _bench_record_run(p):
+    import tempfile
+    from risk_engine.history import record_run
+    root = tempfile.mkdtemp()
+    table = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    return lambda: record_run("bench", {"rolling": table}, params={"alpha": p["alpha"]}, inputs=(), root=root)
+
+
+@case("history.load_history")
+def _bench_load_history(p):
+    import tempfile
+    from risk_engine.history import load_history, record_run
+    root = tempfile.mkdtemp()
+    table = synthetic_asset_returns(p["T"], p["N"], seed=p["seed"])
+    for _ in range(HISTORY_RUNS):
+        record_run("bench", {"rolling": table}, inputs=(), root=root)
+    cols = [table.index.name or "Date", table.columns[0]]
+    return lambda: load_history("rolling", columns=cols, root=root)
+
+
+def _rolling_runner(module, fn_name, per_window_fit=False):
+    def setup(p):
+        fn = getattr(importlib.import_module(f"risk_engine.{module}"), fn_name)
+        rp = synthetic_portfolio_returns(_fit_length(p) if per_window_fit else p["T"], seed=p["seed"])
+        return lambda: fn(rp, p["alpha"], window=p["window"])
+    return setup
+
+
+case("run_backtest.rolling_var")(_rolling_runner("run_backtest", "rolling_var"))
+case("run_backtest.rolling_var_historical")(_rolling_runner("run_backtest", "rolling_var_historical"))
+case("run_backtest.rolling_var_student_t", max_repeat=2)(
+    _rolling_runner("run_backtest", "rolling_var_student_t", per_window_fit=True)
+)
+case("run_rolling_es.rolling_metrics_gaussian")(_rolling_runner("run_rolling_es", "rolling_metrics_gaussian"))
+case("run_rolling_es.rolling_metrics_historical")(_rolling_runner("run_rolling_es", "rolling_metrics_historical"))
+case("run_rolling_es.rolling_metrics_student_t", max_repeat=2)(
+    _rolling_runner("run_rolling_es", "rolling_metrics_student_t", per_window_fit=True)
+)
+
+
+# -----------------------
+# CLI startup
+# -----------------------
+HEAVY_MODULES = ["numpy", "pandas", "scipy", "matplotlib"]
+
+
+def cli_startup(repeat: int = 5) -> dict:
+    """
+    Wall time of a fresh `python -m risk_engine --help` (best of `repeat`), plus
+    which heavy dependencies the CLI module drags in at import time. Both should
+    stay near zero: subcommands import their dependencies lazily.
+    """
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, "-m", "risk_engine", "--help"], check=True, capture_output=True)
+        times.append(time.perf_counter() - t0)
+
+    probe = (
+        "import sys, risk_engine.cli; "
+        f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", probe], check=True, capture_output=True, text=True)
+    heavy = [m for m in out.stdout.strip().split(",") if m]
+
+    return {"min_s": min(times), "median_s": statistics.median(times), "heavy_imports": heavy}
+
+
+# -----------------------
+# Runner
+# -----------------------
+def uncovered_functions() -> list[str]:
+    """
+    Public functions in COVERED_MODULES without a registered case, so new
+    hot paths don't silently go unbenchmarked.
+    """
+    missing = []
+    for mod_name in COVERED_MODULES:
+        mod = importlib.import_module(mod_name)
+        short = mod_name.replace("risk_engine.", "")
+        for name, obj in inspect.getmembers(mod, inspect.isfunction):
+            if name.startswith("_") or obj.__module__ != mod_name:
+                continue
+            if f"{short}.{name}" not in CASES and f"{short}.{name}" not in UNBENCHMARKED:
+                missing.append(f"{short}.{name}")
+    return missing
+
+
+def time_case(fn, repeat: int = 5) -> dict:
+    """
+    Wall time over `repeat` runs (after one warm-up call), then peak traced
+    allocation from a separate run so tracemalloc doesn't skew the timings.
+    """
+    fn()  # warm-up: imports, caches, first-touch allocations
+
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "peak_bytes": int(peak),
+        "repeat": repeat,
+    }
+
+
+def run_suite(params: dict | None = None, repeat: int = 5, only: str | None = None, verbose: bool = True) -> dict:
+    """
+    Run every registered case (or those whose name contains `only`); cases
+    in MAX_REPEAT are timed at most that many times.
+    Returns a JSON-serialisable dict with run metadata and per-case results.
+    """
+    p = dict(DEFAULT_PARAMS)
+    p.update(params or {})
+
+    # Time the computation itself, not memoized repeats
+    memo_was_on = memo.is_enabled()
+    memo.disable()
+
+    results = {}
+    try:
+        for name, setup in CASES.items():
+            if only and only not in name:
+                continue
+            fn = setup(p)
+            results[name] = time_case(fn, repeat=min(repeat, MAX_REPEAT.get(name, repeat)))
+            if verbose:
+                r = results[name]
+                print(f"{name:65s} {r['median_s'] * 1e3:10.3f} ms  {r['peak_bytes'] / 2**20:9.2f} MiB")
+    finally:
+        if memo_was_on:
+            memo.enable()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "kernels": kernels.backend(),
+            "machine": platform.machine(),
+            "params": p,
+        },
+        "results": results,
+    }
+
+
+def save_results(results: dict, path: str) -> None:
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(
+    base: dict,
+    new: dict,
+    threshold: float = 0.10,
+    min_ms: float = 1.0,
+    min_mib: float = 1.0,
+) -> pd.DataFrame:
+    """
+    Compare two result files case by case.
+
+    A case is flagged 'REGRESSION' when its median time or peak memory grows by
+    more than `threshold` (relative) and by more than min_ms / min_mib
+    (absolute, so timer noise on microsecond cases is not flagged), 'faster'
+    when time shrinks by as much, otherwise 'ok'. Cases present in only one
+    file are skipped.
+    """
+    rows = []
+    for name, b in base["results"].items():
+        n = new["results"].get(name)
+        if n is None:
+            continue
+
+        time_ratio = n["median_s"] / b["median_s"] if b["median_s"] > 0 else float("nan")
+        mem_ratio = n["peak_bytes"] / b["peak_bytes"] if b["peak_bytes"] > 0 else float("nan")
+
+        time_diff_ms = (n["median_s"] - b["median_s"]) * 1e3
+        mem_diff_mib = (n["peak_bytes"] - b["peak_bytes"]) / 2**20
+
+        slower = time_ratio > 1 + threshold and time_diff_ms > min_ms
+        heavier = mem_ratio > 1 + threshold and mem_diff_mib > min_mib
+        if slower or heavier:
+            flag = "REGRESSION"
+        elif time_ratio < 1 - threshold and -time_diff_ms > min_ms:
+            flag = "faster"
+        else:
+            flag = "ok"
+
+        rows.append({
+            "case": name,
+            "base_ms": b["median_s"] * 1e3,
+            "new_ms": n["median_s"] * 1e3,
+            "time_ratio": time_ratio,
+            "base_MiB": b["peak_bytes"] / 2**20,
+            "new_MiB": n["peak_bytes"] / 2**20,
+            "mem_ratio": mem_ratio,
+            "flag": flag,
+        })
+
+    return pd.DataFrame(rows).set_index("case") if rows else pd.DataFrame()
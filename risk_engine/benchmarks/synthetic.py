@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+
+def synthetic_asset_returns(
+    T: int,
+    N: int,
+    seed: int = 0,
+    df: float = 5.0,
+    n_factors: int = 3,
+    start: str = "2000-01-03",
+) -> pd.DataFrame:
+    """
+    Fat-tailed daily asset returns with a factor structure, shaped like returns.csv.
+
+    r_t = B f_t + e_t with Student-t factors and noise, so tails, cross-correlation
+    and a business-day DatetimeIndex all look like the real input.
+    Returns DataFrame (T x N) with columns A0..A{N-1}.
+    """
+    rng = np.random.default_rng(seed)
+    k = max(1, min(n_factors, N))
+
+    loadings = rng.normal(0.0, 0.008, size=(N, k))
+    vols = rng.uniform(0.004, 0.03, size=N)
+
+    f = rng.standard_t(df, size=(T, k))
+    e = rng.standard_t(df, size=(T, N)) * vols
+    x = f @ loadings.T + e
+
+    idx = pd.bdate_range(start=start, periods=T, name="Date")
+    cols = [f"A{i}" for i in range(N)]
+    return pd.DataFrame(x, index=idx, columns=cols)
+
+
+def synthetic_portfolio_returns(T: int, seed: int = 0, df: float = 5.0) -> pd.Series:
+    """
+    Portfolio return series shaped like portfolio_returns.csv.
+    """
+    rng = np.random.default_rng(seed)
+    x = rng.standard_t(df, size=T) * 0.01
+    idx = pd.bdate_range(start="2000-01-03", periods=T, name="Date")
+    return pd.Series(x, index=idx, name="portfolio_return")
+
+
+def synthetic_paths(n_sims: int, horizon: int, N: int, seed: int = 0) -> np.ndarray:
+    """
+    Simulated daily asset returns of shape (n_sims, horizon, N), as produced
+    by the sim.monte_carlo simulators.
+    """
+    rng = np.random.default_rng(seed)
+    vols = rng.uniform(0.004, 0.03, size=N)
+    return rng.standard_t(5.0, size=(n_sims, horizon, N)) * vols
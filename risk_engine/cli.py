@@ -0,0 +1,91 @@
+import argparse
+import importlib
+import os
+import sys
+
+
+# Subcommand -> (module, help). Modules are imported only when their subcommand
+# runs, so `--help` never pays for NumPy / pandas / SciPy / matplotlib.
+COMMANDS = {
+    "report": ("risk_engine.run_var_report", "static VaR / ES report (writes portfolio_returns.csv)"),
+    "backtest": ("risk_engine.run_backtest", "rolling VaR backtests (Kupiec + Christoffersen)"),
+    "rolling": ("risk_engine.run_rolling_es", "rolling VaR / ES (Gaussian, historical, Student-t)"),
+    "attribution": ("risk_engine.run_es_attribution", "historical ES attribution, static and rolling"),
+    "replay": ("risk_engine.run_stress_replay", "historical stress window replay + attribution"),
+    "scan": ("risk_engine.run_stress_scan", "search full history for the worst stress windows"),
+    "scenarios": ("risk_engine.run_scenarios", "apply a library of hypothetical shocks to portfolios"),
+    "mc-stress": ("risk_engine.run_mc_stress", "Monte Carlo stress simulation"),
+    "mc-attribution": ("risk_engine.run_mc_es_attribution", "Monte Carlo ES attribution"),
+    "mc-sweep": ("risk_engine.run_mc_sweep", "MC sensitivity sweep over df / horizon / alpha / window"),
+    "mc-optimize": ("risk_engine.run_mc_optimize", "minimum-ES weights on simulated scenarios (Rockafellar-Uryasev LP)"),
+    "stream": ("risk_engine.run_streaming", "out-of-core rolling VaR / ES, attribution and backtests (chunked returns.csv)"),
+    "what-if": ("risk_engine.run_mc_what_if", "pre-trade what-if ES for a batch of candidate trades"),
+    "mc-es-series": ("risk_engine.run_mc_es_series", "daily forward-looking MC ES on rolling / EWMA covariance"),
+}
+
+PLOTS = {
+    "rolling-es": "risk_engine.visualize_rolling_es",
+    "rolling-component-es": "risk_engine.visualize_rolling_component_es",
+    "mc-es-share": "risk_engine.visualize_mc_es_share",
+    "stress-equity": "risk_engine.visualize_stress_equity_vs_es",
+}
+
+# Subcommands with their own argument parsers: remaining args are passed through
+PASSTHROUGH = {
+    "pipeline": ("risk_engine.run_pipeline", "run the stage DAG with cached intermediates"),
+    "bench": ("risk_engine.run_benchmarks", "benchmark suite (run / compare / startup)"),
+    "history": ("risk_engine.run_history", "query past runs' outputs (runs / show / compact)"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="risk-engine",
+        description="Stress-aware portfolio risk engine. Runs in the directory holding returns.csv.",
+    )
+    sub = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    for name, (_, help_text) in COMMANDS.items():
+        sub.add_parser(name, help=help_text)
+
+    plot_p = sub.add_parser("plot", help="render a figure into docs/ (skipped when its inputs are unchanged)")
+    plot_p.add_argument("figure", choices=list(PLOTS) + ["all"])
+    plot_p.add_argument("--force", action="store_true", help="re-render even if the cached PNG is up to date")
+
+    for name, (_, help_text) in PASSTHROUGH.items():
+        p = sub.add_parser(name, help=help_text, add_help=False)
+        p.add_argument("args", nargs=argparse.REMAINDER)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+
+    # Hand passthrough commands their raw arguments (including their own --help)
+    if argv and argv[0] in PASSTHROUGH:
+        module = importlib.import_module(PASSTHROUGH[argv[0]][0])
+        return module.main(argv[1:]) or 0
+
+    args = build_parser().parse_args(argv)
+
+    if args.command == "plot":
+        if args.figure != "all":
+            importlib.import_module(PLOTS[args.figure]).main(force=args.force)
+            return 0
+        # Dashboard refresh: every figure whose inputs exist, re-rendering only what changed
+        for name, mod_name in PLOTS.items():
+            module = importlib.import_module(mod_name)
+            missing = [p for p in module.INPUTS if not os.path.exists(p)]
+            if missing:
+                print(f"Skipped {name}: missing {', '.join(missing)}")
+                continue
+            module.main(force=args.force, show=False)
+        return 0
+
+    importlib.import_module(COMMANDS[args.command][0]).main()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,363 @@
+import hashlib
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.instrumentation import instrumented
+
+
+# Every runner appends its output tables here; RISK_ENGINE_HISTORY=0 turns
+# recording off, RISK_ENGINE_HISTORY_DIR moves the store.
+#
+# Layout (no file is ever rewritten in place):
+#   runs.jsonl                          one line per run: id, time, runner, params, input hashes,
+#                                       row count per table
+#   <table>/<YYYY-MM>/<run_id>.npz      one compressed file per run, one member per column
+#   <table>/<YYYY-MM>/part-<first>--<last>-<tag>.npz
+#                                       merged runs, plus __runs__ / __rows__ (run ids and their
+#                                       row counts)
+#   <table>/<YYYY-MM>/manifest.json     {part file: [run ids]}: the part files queries read
+# A run's line in runs.jsonl is written last, so queries never see a partial run. Every
+# COMPACT_EVERY per-run files, record_run merges the partition's finished ones into a new part
+# file under the partition's .lock: part file first, then the manifest (both via os.replace),
+# then the merged per-run files are removed. Files still being written (*.tmp.npz) are never
+# touched, and a query that finds a file gone re-reads the manifest.
+_ENABLED = os.environ.get("RISK_ENGINE_HISTORY", "") != "0"
+HISTORY_DIR = Path(os.environ.get("RISK_ENGINE_HISTORY_DIR", ".risk_history"))
+
+COMPACT_EVERY = 32          # per-run files in a partition before record_run merges them
+_LOCK_STALE_S = 600         # compact() breaks a partition lock older than this (a crashed merge)
+_RUNS, _ROWS = "__runs__", "__rows__"
+_MANIFEST, _LOCK = "manifest.json", ".lock"
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def _root(root) -> Path:
+    return HISTORY_DIR if root is None else Path(root)
+
+
+def _file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _columns(df: pd.DataFrame) -> dict:
+    """
+    Flat {column: array} of a table; a named / non-default index becomes
+    leading columns (an unnamed date index is stored as Date).
+    """
+    if isinstance(df.index, pd.DatetimeIndex) and df.index.name is None:
+        df = df.rename_axis("Date")
+    if not isinstance(df.index, pd.RangeIndex) or any(n is not None for n in df.index.names):
+        df = df.reset_index()
+    out = {}
+    for col in df.columns:
+        s = df[col]
+        if s.dtype.kind in "biufcmM":
+            out[str(col)] = s.to_numpy()
+        else:
+            out[str(col)] = s.astype(str).to_numpy(dtype=str)     # fixed-width unicode, no pickles
+    return out
+
+
+def _tmp(path: Path) -> Path:
+    return path.with_name(f"{path.stem}-{uuid.uuid4().hex[:6]}.tmp{path.suffix}")
+
+
+def _write_npz(path: Path, arrays: dict) -> None:
+    tmp = _tmp(path)
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def _loose(part: Path) -> list[Path]:
+    """A partition's finished per-run files."""
+    return sorted(p for p in part.glob("*.npz") if not p.name.startswith("part-") and ".tmp" not in p.name)
+
+
+def _manifest(part: Path) -> dict:
+    """{part file: [run ids]} of a partition (stores from before the manifest: read off the part files)."""
+    try:
+        with open(part / _MANIFEST) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        out = {}
+        for path in sorted(part.glob("part-*.npz")):
+            if ".tmp" not in path.name:
+                with np.load(path) as f:
+                    out[path.name] = f[_RUNS].tolist()
+        return out
+
+
+@contextmanager
+def _partition_lock(part: Path, wait: bool):
+    """
+    Yields whether this process holds the partition's merge lock (an O_EXCL
+    lock file). wait=False gives up at once; wait=True polls, and breaks a
+    lock left by a merge that died more than _LOCK_STALE_S ago.
+    """
+    path = part / _LOCK
+    while True:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            if not wait:
+                yield False
+                return
+            try:
+                if time.time() - path.stat().st_mtime > _LOCK_STALE_S:
+                    path.unlink()
+                    continue
+            except FileNotFoundError:
+                continue
+            time.sleep(0.05)
+    try:
+        yield True
+    finally:
+        os.close(fd)
+        path.unlink()
+
+
+# -----------------------
+# Writing
+# -----------------------
+@instrumented()
+def record_run(
+    runner: str,
+    tables: dict,
+    params: dict | None = None,
+    inputs=("returns.csv",),
+    root=None,
+) -> str | None:
+    """
+    Append one run's output tables {name: DataFrame} to the store, tagged
+    with a run id, UTC timestamp, the runner's parameters and the sha256 of
+    each input file that exists. Returns the run id (None when recording is
+    disabled).
+    """
+    if not _ENABLED:
+        return None
+    root = _root(root)
+    now = datetime.now(timezone.utc)
+    run_id = f"{now:%Y%m%dT%H%M%S%f}-{uuid.uuid4().hex[:6]}"
+    month = f"{now:%Y-%m}"
+
+    for name, df in tables.items():
+        part = root / name / month
+        part.mkdir(parents=True, exist_ok=True)
+        _write_npz(part / f"{run_id}.npz", _columns(df))
+
+    meta = {
+        "run_id": run_id,
+        "timestamp": now.isoformat(),
+        "runner": runner,
+        "params": params or {},
+        "inputs": {str(p): _file_hash(p) for p in inputs if os.path.exists(p)},
+        "tables": {name: len(df) for name, df in tables.items()},
+    }
+    with open(root / "runs.jsonl", "a") as f:
+        f.write(json.dumps(meta, default=str) + "\n")
+
+    for name in tables:
+        part = root / name / month
+        if len(_loose(part)) >= COMPACT_EVERY:
+            _compact_partition(part, full=False)
+    return run_id
+
+
+def _compact_partition(part: Path, full: bool) -> int:
+    """
+    Merge a partition's per-run files (full=True: and its part files) into
+    one new part file per column layout. Skipped when another process is
+    merging the partition, unless full. Returns the number of per-run files
+    merged.
+    """
+    with _partition_lock(part, wait=full) as held:
+        if not held:
+            return 0
+        manifest = _manifest(part)
+        covered = {rid for rids in manifest.values() for rid in rids}
+        loose = [p for p in _loose(part) if p.stem not in covered]
+        blocks = []
+        for path in loose:
+            with np.load(path) as f:
+                arrays = {k: f[k] for k in f.files}
+            n = len(next(iter(arrays.values()))) if arrays else 0
+            blocks.append({_RUNS: np.array([path.stem]), _ROWS: np.array([n]), **arrays})
+        if full:
+            for name in manifest:
+                with np.load(part / name) as f:
+                    blocks.append({k: f[k] for k in f.files})
+            if len(manifest) + len(loose) <= 1:
+                blocks = []                       # already a single file
+        if not blocks:
+            return 0
+
+        groups = {}
+        for b in blocks:
+            groups.setdefault(tuple(b), []).append(b)
+        new = {}
+        for cols, group in groups.items():
+            merged = {c: np.concatenate([b[c] for b in group]) for c in cols}
+            rids = merged[_RUNS].tolist()
+            name = f"part-{min(rids)}--{max(rids)}-{uuid.uuid4().hex[:6]}.npz"
+            _write_npz(part / name, merged)
+            new[name] = rids
+
+        # Publish, then remove what the new manifest no longer points to
+        tmp = _tmp(part / _MANIFEST)
+        with open(tmp, "w") as f:
+            json.dump(new if full else {**manifest, **new}, f)
+        os.replace(tmp, part / _MANIFEST)
+        gone = covered | {p.stem for p in loose}
+        stale = [p for p in _loose(part) if p.stem in gone]
+        if full:
+            stale += [p for p in part.glob("part-*.npz") if ".tmp" not in p.name and p.name not in new]
+        for path in stale:
+            try:
+                path.unlink()
+            except OSError:                       # e.g. still open by a reader on Windows
+                pass
+    return len(loose)
+
+
+def compact(table: str | None = None, root=None) -> int:
+    """
+    Merge every partition (of one table, or all) into a single part file per
+    column layout. record_run already merges per-run files every
+    COMPACT_EVERY runs; this also folds those part files together. Safe to
+    run next to writers and readers. Returns the number of per-run files
+    merged.
+    """
+    root = _root(root)
+    tables = [root / table] if table else [p for p in root.iterdir() if p.is_dir()]
+    return sum(_compact_partition(part, full=True) for t in tables for part in t.iterdir() if part.is_dir())
+
+
+# -----------------------
+# Queries
+# -----------------------
+def list_runs(
+    runner: str | None = None,
+    since=None,
+    until=None,
+    params: dict | None = None,
+    table: str | None = None,
+    root=None,
+) -> pd.DataFrame:
+    """
+    Runs in the store, oldest first, filtered by runner, time range
+    [since, until] (anything pd.Timestamp accepts; naive means UTC), exact
+    parameter values and whether a table was written.
+    Returns DataFrame with: run_id, timestamp, runner, params, inputs, tables
+    """
+    path = _root(root) / "runs.jsonl"
+    cols = ["run_id", "timestamp", "runner", "params", "inputs", "tables"]
+    if not path.exists():
+        return pd.DataFrame(columns=cols)
+    with open(path) as f:
+        runs = [json.loads(line) for line in f if line.strip()]
+    if runner is not None:
+        runs = [r for r in runs if r["runner"] == runner]
+    if table is not None:
+        runs = [r for r in runs if table in r["tables"]]
+    if params:
+        runs = [r for r in runs if all(r["params"].get(k) == v for k, v in params.items())]
+    out = pd.DataFrame(runs, columns=cols)
+    out["timestamp"] = pd.to_datetime(out["timestamp"], utc=True, format="ISO8601")
+    if since is not None:
+        out = out[out["timestamp"] >= _utc(since)]
+    if until is not None:
+        out = out[out["timestamp"] <= _utc(until)]
+    return out.reset_index(drop=True)
+
+
+def _utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+def _load_partition(part: Path, wanted: set, n_rows: dict, columns) -> list[pd.DataFrame]:
+    """The wanted runs of one partition: from the manifest's part files, then per-run files."""
+    frames, seen = [], set()
+    for name, rids in _manifest(part).items():
+        hits = wanted.intersection(rids) - seen
+        if not hits:
+            continue
+        with np.load(part / name) as f:
+            rids, rows = f[_RUNS], f[_ROWS]
+            keep = np.array([r in hits for r in rids.tolist()], dtype=bool)
+            mask = np.repeat(keep, rows)
+            cols = [c for c in f.files if c not in (_RUNS, _ROWS) and (columns is None or c in columns)]
+            frames.append(pd.DataFrame({"run_id": np.repeat(rids[keep], rows[keep]), **{c: f[c][mask] for c in cols}}))
+        seen |= hits
+    for rid in sorted(wanted - seen):
+        with np.load(part / f"{rid}.npz") as f:
+            cols = [c for c in f.files if columns is None or c in columns]
+            frames.append(pd.DataFrame({"run_id": np.full(n_rows[rid], rid), **{c: f[c] for c in cols}}))
+    return frames
+
+
+@instrumented()
+def load_history(
+    table: str,
+    columns: list[str] | None = None,
+    runner: str | None = None,
+    since=None,
+    until=None,
+    params: dict | None = None,
+    runs: list[str] | None = None,
+    root=None,
+) -> pd.DataFrame:
+    """
+    One table across runs, stacked: run_id and timestamp first, then the
+    table's columns (its index included, e.g. Date or model). Runs are
+    selected on runs.jsonl first (filters as in list_runs, or explicit run
+    ids). Each month's manifest then names the part files holding them, and
+    only the requested columns are decompressed. Columns missing from older
+    runs come back as NaN.
+    """
+    root = _root(root)
+    sel = list_runs(runner=runner, since=since, until=until, params=params, table=table, root=root)
+    if runs is not None:
+        sel = sel[sel["run_id"].isin(runs)]
+    if sel.empty:
+        return pd.DataFrame(columns=["run_id", "timestamp"] + list(columns or []))
+    n_rows = {rid: t[table] for rid, t in zip(sel["run_id"], sel["tables"])}
+    by_month = {}
+    for rid, ts in zip(sel["run_id"], sel["timestamp"]):
+        by_month.setdefault(ts.strftime("%Y-%m"), set()).add(rid)
+
+    frames = []
+    for month, wanted in sorted(by_month.items()):
+        part = root / table / month
+        if not part.is_dir():
+            continue
+        for attempt in range(3):
+            try:
+                frames += _load_partition(part, wanted, n_rows, columns)
+                break
+            except FileNotFoundError:              # merged away meanwhile: re-read the manifest
+                if attempt == 2:
+                    raise
+
+    out = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=["run_id"])
+    stamps = dict(zip(sel["run_id"], sel["timestamp"]))
+    out.insert(1, "timestamp", out["run_id"].map(stamps))
+    if columns is not None:
+        out = out.reindex(columns=["run_id", "timestamp"] + [c for c in columns if c not in ("run_id", "timestamp")])
+    return out.sort_values(["timestamp", "run_id"], kind="stable").reset_index(drop=True)
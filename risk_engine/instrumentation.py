@@ -0,0 +1,175 @@
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+
+import pandas as pd
+
+
+# Opt-in via environment (RISK_ENGINE_PROFILE=1, RISK_ENGINE_PROFILE_MEMORY=1)
+# or programmatically with enable(). When disabled, stage() hands back a shared
+# no-op context manager and instrumented() wrappers cost one flag check.
+_ENABLED = os.environ.get("RISK_ENGINE_PROFILE", "") not in ("", "0")
+_MEMORY = os.environ.get("RISK_ENGINE_PROFILE_MEMORY", "") not in ("", "0")
+
+_NOOP = nullcontext()
+_LOCAL = threading.local()   # per-thread stack of open frames (innermost last)
+_LOCK = threading.Lock()
+_STATS = {}                  # stage path -> aggregated stats
+
+
+def _stack() -> list:
+    stack = getattr(_LOCAL, "stack", None)
+    if stack is None:
+        stack = _LOCAL.stack = []
+    return stack
+
+
+def enable(memory: bool = False) -> None:
+    """Start recording stages. memory=True also tracks peak allocated bytes (slower)."""
+    global _ENABLED, _MEMORY
+    _ENABLED = True
+    _MEMORY = memory
+    if _MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable() -> None:
+    global _ENABLED
+    _ENABLED = False
+    if _MEMORY and tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def reset() -> None:
+    """Drop everything recorded so far."""
+    _stack().clear()
+    with _LOCK:
+        _STATS.clear()
+
+
+class _Stage:
+    __slots__ = ("name", "path", "wall0", "cpu0", "mem0", "peak_seen")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        stack = _stack()
+        parent = stack[-1] if stack else None
+        self.path = f"{parent.path}/{self.name}" if parent else self.name
+
+        if _MEMORY and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # Hand the parent its peak so far before resetting for this stage
+            if parent is not None:
+                parent.peak_seen = max(parent.peak_seen, peak)
+            tracemalloc.reset_peak()
+            self.mem0 = current
+        else:
+            self.mem0 = None
+        self.peak_seen = 0
+
+        stack.append(self)
+        self.cpu0 = time.process_time()
+        self.wall0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self.wall0
+        cpu = time.process_time() - self.cpu0
+        stack = _stack()
+        stack.pop()
+
+        # tracemalloc is process-wide: with concurrent stages, peaks are upper bounds
+        peak_bytes = 0
+        if self.mem0 is not None and tracemalloc.is_tracing():
+            peak = max(self.peak_seen, tracemalloc.get_traced_memory()[1])
+            peak_bytes = max(0, peak - self.mem0)
+            if stack:
+                stack[-1].peak_seen = max(stack[-1].peak_seen, peak)
+
+        with _LOCK:
+            s = _STATS.get(self.path)
+            if s is None:
+                s = _STATS[self.path] = {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_bytes": 0}
+            s["calls"] += 1
+            s["wall_s"] += wall
+            s["cpu_s"] += cpu
+            s["peak_bytes"] = max(s["peak_bytes"], peak_bytes)
+        return False
+
+
+def stage(name: str):
+    """
+    Context manager timing a named stage:
+
+        with stage("simulate_gaussian"):
+            ...
+
+    Nested stages are recorded under their full path ("run_mc_stress/simulate_gaussian").
+    """
+    if not _ENABLED:
+        return _NOOP
+    return _Stage(name)
+
+
+def instrumented(name: str | None = None):
+    """Decorator recording every call of the function as a stage (default name: function name)."""
+    def decorate(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+            with _Stage(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def summary() -> pd.DataFrame:
+    """Aggregated stats per stage path, in first-seen order."""
+    if not _STATS:
+        return pd.DataFrame(columns=["calls", "wall_s", "cpu_s", "peak_MiB"])
+    df = pd.DataFrame.from_dict(_STATS, orient="index")
+    df.index.name = "stage"
+    df["peak_MiB"] = df.pop("peak_bytes") / 2**20
+    return df
+
+
+def save_trace(path: str, meta: dict | None = None) -> None:
+    """Write the recorded stages as structured JSON."""
+    trace = {
+        "meta": {"memory_tracked": _MEMORY, **(meta or {})},
+        "stages": [{"stage": k, **v} for k, v in _STATS.items()],
+    }
+    with open(path, "w") as f:
+        json.dump(trace, f, indent=2)
+
+
+def finish_profile(run_name: str) -> None:
+    """
+    End-of-run hook for the runners: if profiling is on, print the summary
+    table and save profile_<run_name>.json. Does nothing when disabled.
+    """
+    if not _ENABLED:
+        return
+    with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 160):
+        print(f"\n=== Stage profile: {run_name} ===")
+        print(summary().round(6))
+    out = f"profile_{run_name}.json"
+    save_trace(out, meta={"run": run_name})
+    print(f"Saved: {out}")
+
+
+if _ENABLED and _MEMORY:
+    tracemalloc.start()
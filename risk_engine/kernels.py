@@ -0,0 +1,337 @@
+import os
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+try:
+    import numba
+except ImportError:          # optional: the NumPy kernels below are the fallback
+    numba = None
+
+
+# Every kernel has a NumPy version and, when Numba is installed, a compiled
+# one. Both add up each window in the same order (oldest row first) and
+# interpolate quantiles exactly as np.quantile does, so the two backends give
+# identical results, not just results within rounding. RISK_ENGINE_JIT=0 (or
+# use_backend("numpy")) forces the NumPy kernels.
+_BACKEND = "numba" if numba is not None and os.environ.get("RISK_ENGINE_JIT", "") != "0" else "numpy"
+
+# Windows evaluated per NumPy block (bounds the (windows x window) copies)
+_CHUNK_ELEMS = 4_000_000
+
+
+def backend() -> str:
+    return _BACKEND
+
+
+def use_backend(name: str) -> None:
+    """Select "numba" (needs numba installed) or "numpy"."""
+    global _BACKEND
+    if name not in ("numba", "numpy"):
+        raise ValueError("backend must be 'numba' or 'numpy'")
+    if name == "numba" and numba is None:
+        raise RuntimeError("numba is not installed; `pip install numba` to use the JIT backend")
+    _BACKEND = name
+
+
+def quantile_index(n: int, q: float) -> tuple[int, int, float]:
+    """
+    (lower index, upper index, weight) of np.quantile's linear interpolation
+    for quantile q of n sorted values.
+    """
+    h = (n - 1) * q
+    k = int(np.floor(h))
+    return k, min(k + 1, n - 1), h - k
+
+
+def _lerp(a, b, g: float):
+    """np.quantile's interpolation (from the nearer end, for the same rounding)."""
+    d = b - a
+    return b - d * (1 - g) if g >= 0.5 else a + d * g
+
+
+def _blocks(n_out: int, window: int):
+    step = max(1, _CHUNK_ELEMS // max(window, 1))
+    for a in range(0, n_out, step):
+        yield a, min(a + step, n_out)
+
+
+# -----------------------
+# NumPy kernels
+# -----------------------
+def _rolling_mean_std_np(x, window):
+    W = sliding_window_view(x, window)[:-1]
+    s = np.zeros(len(W))
+    for j in range(window):
+        s += W[:, j]
+    m = s / window
+    ss = np.zeros(len(W))
+    for j in range(window):
+        d = W[:, j] - m
+        ss += d * d
+    return m, np.sqrt(ss / (window - 1))
+
+
+def _rolling_quantile_tail_np(x, window, k, k1, g):
+    W = sliding_window_view(x, window)[:-1]
+    n_out = len(W)
+    var, es = np.empty(n_out), np.empty(n_out)
+    for a, b in _blocks(n_out, window):
+        w = W[a:b]
+        part = np.partition(w, [k, k1], axis=1)
+        q = _lerp(part[:, k], part[:, k1], g)
+        s, c = np.zeros(b - a), np.zeros(b - a, dtype=np.int64)
+        for j in range(window):
+            tail = w[:, j] <= q
+            s += np.where(tail, w[:, j], 0.0)
+            c += tail
+        var[a:b], es[a:b] = -q, -(s / c)
+    return var, es
+
+
+def _transitions_np(b, prev):
+    if prev >= 0:
+        b = np.concatenate([[prev == 1], b])
+    before, after = b[:-1], b[1:]
+    n01 = np.count_nonzero(after > before)
+    n10 = np.count_nonzero(before > after)
+    n11 = np.count_nonzero(before & after)
+    return np.array([len(before) - n01 - n10 - n11, n01, n10, n11], dtype=np.int64)
+
+
+def _rolling_tail_attribution_np(R, rp, w, window, k, k1, g):
+    P = sliding_window_view(rp, window)[:-1]
+    A = sliding_window_view(R, window, axis=0)[:-1]              # (n_out, N, window)
+    n_out, n_assets = len(P), R.shape[1]
+    es, comp = np.empty(n_out), np.empty((n_out, n_assets))
+    count = np.empty(n_out, dtype=np.int64)
+    for a, b in _blocks(n_out, window * (n_assets + 1)):
+        p = P[a:b]
+        part = np.partition(p, [k, k1], axis=1)
+        q = _lerp(part[:, k], part[:, k1], g)
+        s, c = np.zeros(b - a), np.zeros(b - a, dtype=np.int64)
+        acc = np.zeros((b - a, n_assets))
+        for j in range(window):
+            tail = p[:, j] <= q
+            s += np.where(tail, p[:, j], 0.0)
+            acc += np.where(tail[:, None], A[a:b, :, j], 0.0)
+            c += tail
+        es[a:b] = -(s / c)
+        comp[a:b] = w * -(acc / c[:, None])
+        count[a:b] = c
+    return es, comp, count
+
+
+def _chol_rank1_np(L, x, sign):
+    n = len(x)
+    for k in range(n):
+        r2 = L[k, k] * L[k, k] + sign * x[k] * x[k]
+        if r2 <= 0:
+            return False
+        r = np.sqrt(r2)
+        c, s = r / L[k, k], x[k] / L[k, k]
+        L[k, k] = r
+        L[k + 1:, k] = (L[k + 1:, k] + sign * s * x[k + 1:]) / c
+        x[k + 1:] = c * x[k + 1:] - s * L[k + 1:, k]
+    return True
+
+
+# -----------------------
+# Numba kernels (same operations, same order)
+# -----------------------
+if numba is not None:
+    @numba.njit(cache=True)
+    def _rolling_mean_std_nb(x, window):
+        n_out = len(x) - window
+        mean, std = np.empty(n_out), np.empty(n_out)
+        for t in range(n_out):
+            s = 0.0
+            for j in range(window):
+                s += x[t + j]
+            m = s / window
+            ss = 0.0
+            for j in range(window):
+                d = x[t + j] - m
+                ss += d * d
+            mean[t], std[t] = m, np.sqrt(ss / (window - 1))
+        return mean, std
+
+    @numba.njit(cache=True)
+    def _quantile_sorted_nb(buf, k, k1, g):
+        a, b = buf[k], buf[k1]
+        d = b - a
+        return b - d * (1 - g) if g >= 0.5 else a + d * g
+
+    @numba.njit(cache=True)
+    def _rolling_quantile_tail_nb(x, window, k, k1, g):
+        n_out = len(x) - window
+        var, es = np.empty(n_out), np.empty(n_out)
+        buf = np.empty(window)
+        for t in range(n_out):
+            buf[:] = x[t : t + window]
+            buf.sort()
+            q = _quantile_sorted_nb(buf, k, k1, g)
+            s, c = 0.0, 0
+            for j in range(window):
+                if x[t + j] <= q:
+                    s += x[t + j]
+                    c += 1
+            var[t], es[t] = -q, -(s / c)
+        return var, es
+
+    @numba.njit(cache=True)
+    def _transitions_nb(b, prev):
+        counts = np.zeros(4, dtype=np.int64)
+        last = prev
+        for i in range(len(b)):
+            cur = 1 if b[i] else 0
+            if last >= 0:
+                counts[2 * last + cur] += 1
+            last = cur
+        return counts
+
+    @numba.njit(cache=True)
+    def _rolling_tail_attribution_nb(R, rp, w, window, k, k1, g):
+        n_out, n_assets = len(rp) - window, R.shape[1]
+        es, comp = np.empty(n_out), np.empty((n_out, n_assets))
+        count = np.empty(n_out, dtype=np.int64)
+        buf, acc = np.empty(window), np.empty(n_assets)
+        for t in range(n_out):
+            buf[:] = rp[t : t + window]
+            buf.sort()
+            q = _quantile_sorted_nb(buf, k, k1, g)
+            s, c = 0.0, 0
+            acc[:] = 0.0
+            for j in range(window):
+                if rp[t + j] <= q:
+                    s += rp[t + j]
+                    c += 1
+                    for i in range(n_assets):
+                        acc[i] += R[t + j, i]
+            es[t], count[t] = -(s / c), c
+            for i in range(n_assets):
+                comp[t, i] = w[i] * -(acc[i] / c)
+        return es, comp, count
+
+
+    @numba.njit(cache=True)
+    def _chol_rank1_nb(L, x, sign):
+        n = len(x)
+        for k in range(n):
+            r2 = L[k, k] * L[k, k] + sign * x[k] * x[k]
+            if r2 <= 0:
+                return False
+            r = np.sqrt(r2)
+            c, s = r / L[k, k], x[k] / L[k, k]
+            L[k, k] = r
+            for j in range(k + 1, n):
+                L[j, k] = (L[j, k] + sign * s * x[j]) / c
+                x[j] = c * x[j] - s * L[j, k]
+        return True
+
+
+def _pick(name):
+    return globals()[f"{name}_{'nb' if _BACKEND == 'numba' else 'np'}"]
+
+
+# -----------------------
+# Public kernels
+# -----------------------
+def rolling_mean_std(x: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Mean and std (ddof=1) of x[t - window : t] for t = window .. len(x) - 1,
+    two-pass per window. x must be free of NaN.
+    """
+    x = np.ascontiguousarray(x, dtype=float)
+    if len(x) <= window:
+        return np.empty(0), np.empty(0)
+    return _pick("_rolling_mean_std")(x, window)
+
+
+def rolling_quantile_tail(x: np.ndarray, window: int, alpha: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Historical VaR and ES (positive losses) of x[t - window : t] for
+    t = window .. len(x) - 1: np.quantile's (1 - alpha) quantile, bit for bit,
+    and the mean of the returns at or below it. x must be free of NaN.
+    """
+    x = np.ascontiguousarray(x, dtype=float)
+    if len(x) <= window:
+        return np.empty(0), np.empty(0)
+    return _pick("_rolling_quantile_tail")(x, window, *quantile_index(window, 1 - alpha))
+
+
+def breach_transitions(breaches: np.ndarray, prev: bool | None = None) -> np.ndarray:
+    """
+    [n00, n01, n10, n11] day-to-day breach transitions. prev is the flag of
+    the day before breaches[0] (None: no such day).
+    """
+    b = np.ascontiguousarray(breaches, dtype=bool)
+    return _pick("_transitions")(b, -1 if prev is None else int(bool(prev)))
+
+
+def rolling_tail_attribution(
+    R: np.ndarray,
+    w: np.ndarray,
+    window: int,
+    alpha: float,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Historical ES and component ES of the portfolio R @ w on every window
+    R[t - window : t], t = window .. len(R) - 1 (tail: portfolio return at
+    or below its (1 - alpha) quantile). Portfolio returns are summed asset by
+    asset, so both backends see the same values. R must be free of NaN.
+    Returns (ES (n_out,), component ES (n_out x N), tail count (n_out,)).
+    """
+    R = np.ascontiguousarray(R, dtype=float)
+    w = np.ascontiguousarray(w, dtype=float)
+    n_assets = R.shape[1]
+    if len(R) <= window:
+        return np.empty(0), np.empty((0, n_assets)), np.empty(0, dtype=np.int64)
+    rp = np.zeros(len(R))
+    for i in range(n_assets):
+        rp += R[:, i] * w[i]
+    return _pick("_rolling_tail_attribution")(R, rp, w, window, *quantile_index(window, 1 - alpha))
+
+
+def chol_rank1(L: np.ndarray, x: np.ndarray, sign: float = 1.0) -> np.ndarray:
+    """
+    In place: L (lower, C-contiguous float) becomes the Cholesky factor of
+    L L' + sign * x x', sign = +1 (update) or -1 (downdate). O(N^2); x is
+    overwritten. Raises ValueError when a downdate loses positive
+    definiteness (L is then partly modified). Returns L.
+    """
+    if not _pick("_chol_rank1")(L, x, float(sign)):
+        raise ValueError("Cholesky downdate lost positive definiteness.")
+    return L
+
+
+def compare_backends(T: int = 2000, N: int = 7, window: int = 60, alpha: float = 0.95, seed: int = 0) -> dict:
+    """
+    Run every kernel on both backends on synthetic returns. Returns
+    {kernel: True if the outputs are identical}. Needs numba.
+    """
+    if numba is None:
+        raise RuntimeError("numba is not installed; only the NumPy backend is available")
+    rng = np.random.default_rng(seed)
+    R = rng.standard_t(4, size=(T, N)) * 0.01
+    w = np.full(N, 1.0 / N)
+    x = R @ w
+    calls = {
+        "rolling_mean_std": lambda: rolling_mean_std(x, window),
+        "rolling_quantile_tail": lambda: rolling_quantile_tail(x, window, alpha),
+        "breach_transitions": lambda: breach_transitions(x < np.quantile(x, 1 - alpha), prev=True),
+        "rolling_tail_attribution": lambda: rolling_tail_attribution(R, w, window, alpha),
+        "chol_rank1": lambda: (chol_rank1(np.linalg.cholesky(np.cov(R.T)), R[-1].copy()),),
+    }
+    current = _BACKEND
+    out = {}
+    try:
+        for name, call in calls.items():
+            use_backend("numpy")
+            a = call()
+            use_backend("numba")
+            b = call()
+            out[name] = all(np.array_equal(u, v) for u, v in zip(a, b))
+    finally:
+        use_backend(current)
+    return out
@@ -0,0 +1,188 @@
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# On by default; RISK_ENGINE_MEMO=0 or disable() turns every memoized function
+# back into a plain call. RISK_ENGINE_MEMO_DIR (or enable_disk()) adds a
+# persistent tier shared across runs and processes.
+_ENABLED = os.environ.get("RISK_ENGINE_MEMO", "") != "0"
+_DISK = Path(os.environ["RISK_ENGINE_MEMO_DIR"]) if os.environ.get("RISK_ENGINE_MEMO_DIR") else None
+
+_LOCK = threading.Lock()
+_CACHES = {}                 # function label -> _LRU
+
+
+def enable() -> None:
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable() -> None:
+    global _ENABLED
+    _ENABLED = False
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def enable_disk(path=".risk_cache/memo") -> None:
+    """Also persist results as pickles under `path` (one sub-directory per function)."""
+    global _DISK
+    _DISK = Path(path)
+
+
+def disable_disk() -> None:
+    global _DISK
+    _DISK = None
+
+
+def clear() -> None:
+    """Empty the in-memory tier (the disk tier is left alone)."""
+    with _LOCK:
+        for c in _CACHES.values():
+            c.data.clear()
+            c.hits = c.misses = c.disk_hits = 0
+
+
+def cache_info() -> pd.DataFrame:
+    """Hits / misses / entries per memoized function."""
+    with _LOCK:
+        rows = [
+            {"function": label, "hits": c.hits, "disk_hits": c.disk_hits, "misses": c.misses,
+             "entries": len(c.data), "maxsize": c.maxsize}
+            for label, c in _CACHES.items()
+        ]
+    return pd.DataFrame(rows, columns=["function", "hits", "disk_hits", "misses", "entries", "maxsize"])
+
+
+class _LRU:
+    __slots__ = ("data", "maxsize", "hits", "disk_hits", "misses")
+
+    def __init__(self, maxsize: int):
+        self.data = OrderedDict()
+        self.maxsize = maxsize
+        self.hits = self.disk_hits = self.misses = 0
+
+
+# -----------------------
+# Keys
+# -----------------------
+def _update(h, obj) -> None:
+    """
+    Feed one argument into the hash. Arrays (and the values of Series /
+    DataFrames, labels ignored) go in as raw buffers with dtype and shape;
+    scalars and small containers by repr.
+    """
+    if isinstance(obj, (pd.Series, pd.DataFrame)):
+        obj = obj.to_numpy()
+    if isinstance(obj, np.ndarray):
+        a = np.ascontiguousarray(obj)
+        h.update(f"nd|{a.dtype.str}|{a.shape}|".encode())
+        h.update(pickle.dumps(a) if a.dtype.hasobject else a.data)
+    elif isinstance(obj, (list, tuple)):
+        h.update(f"{type(obj).__name__}|{len(obj)}|".encode())
+        for item in obj:
+            _update(h, item)
+    else:
+        h.update(f"{type(obj).__name__}|{obj!r}|".encode())
+
+
+def content_key(*args, **kwargs) -> str:
+    """Hex key from the contents of the arguments (blake2b, 128-bit)."""
+    h = hashlib.blake2b(digest_size=16)
+    for a in args:
+        _update(h, a)
+    for k in sorted(kwargs):
+        h.update(f"{k}=".encode())
+        _update(h, kwargs[k])
+    return h.hexdigest()
+
+
+def _code_version(fn) -> str:
+    """Source hash, so disk entries written by older code are never reused."""
+    try:
+        src = inspect.getsource(fn)
+    except (OSError, TypeError):
+        src = fn.__qualname__
+    return hashlib.blake2b(src.encode(), digest_size=8).hexdigest()
+
+
+def _bound(sig, args, kwargs) -> dict:
+    # Fast path for the common all-positional call
+    if not kwargs and len(args) == len(sig.parameters):
+        return dict(zip(sig.parameters, args))
+    b = sig.bind(*args, **kwargs)
+    b.apply_defaults()
+    return b.arguments
+
+
+# -----------------------
+# Decorator
+# -----------------------
+def memoize(maxsize: int = 4096, name: str | None = None):
+    """
+    Cache a pure function's results by argument content.
+
+    Arguments are bound to the signature first (defaults applied), so
+    f(x, 0.95) and f(x, alpha=0.95) share an entry. Only use on functions
+    whose result depends on argument values alone (not on Series labels) and
+    returns immutable values (floats, tuples).
+    """
+    def decorate(fn):
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+        sig = inspect.signature(fn)
+        cache = _CACHES.setdefault(label, _LRU(maxsize))
+        version = []
+
+        def disk_path(key):
+            if not version:
+                version.append(_code_version(fn))
+            return _DISK / label / f"{version[0]}-{key}.pkl"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _ENABLED:
+                return fn(*args, **kwargs)
+
+            key = content_key(**_bound(sig, args, kwargs))
+
+            with _LOCK:
+                if key in cache.data:
+                    cache.data.move_to_end(key)
+                    cache.hits += 1
+                    return cache.data[key]
+
+            path = disk_path(key) if _DISK is not None else None
+            if path is not None and path.exists():
+                with open(path, "rb") as f:
+                    value = pickle.load(f)
+                hit = "disk_hits"
+            else:
+                value = fn(*args, **kwargs)
+                hit = "misses"
+                if path is not None:
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    tmp = path.with_suffix(f".{os.getpid()}-{threading.get_ident()}.tmp")
+                    with open(tmp, "wb") as f:
+                        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp, path)
+
+            with _LOCK:
+                setattr(cache, hit, getattr(cache, hit) + 1)
+                cache.data[key] = value
+                if len(cache.data) > cache.maxsize:
+                    cache.data.popitem(last=False)
+            return value
+
+        return wrapper
+    return decorate
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.stats import norm
+
+from risk_engine.instrumentation import instrumented
+
+
+# -----------------------
+# Kernels
+# -----------------------
+def _var_es_rows(x: np.ndarray, alpha: float) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    var_historical / es_historical on every row of x (B x n returns): same
+    linear-interpolated quantile and '<= q' tail, one np.partition for all rows.
+    Returns (VaR, ES, tail mask), VaR / ES positive.
+    """
+    n = x.shape[-1]
+    h = (n - 1) * (1 - alpha)
+    k = int(np.floor(h))
+    frac = h - k
+    k1 = min(k + 1, n - 1)
+
+    part = np.partition(x, [k, k1], axis=-1)
+    q = part[..., k] + frac * (part[..., k1] - part[..., k])
+    mask = x <= q[..., None]
+    es = -(x * mask).sum(axis=-1) / mask.sum(axis=-1)
+    return -q, es, mask
+
+
+def resample_indices(n: int, n_boot: int, rng: np.random.Generator, block_len: int = 1) -> np.ndarray:
+    """
+    One (n_boot x n) matrix of bootstrap row indices. block_len > 1 draws
+    circular moving blocks of that length, which keeps short-range
+    dependence (volatility clusters) inside each resample.
+    """
+    if block_len <= 1:
+        return rng.integers(0, n, size=(n_boot, n))
+    n_blocks = -(-n // block_len)
+    starts = rng.integers(0, n, size=(n_boot, n_blocks, 1))
+    return ((starts + np.arange(block_len)) % n).reshape(n_boot, -1)[:, :n]
+
+
+def jackknife_indices(n: int) -> np.ndarray:
+    """(n x n-1) leave-one-out row indices."""
+    return np.arange(1, n)[None, :] - (np.arange(1, n)[None, :] <= np.arange(n)[:, None])
+
+
+def _summarize(point: np.ndarray, boot: np.ndarray, jack: np.ndarray, conf: float) -> dict:
+    """
+    Percentile bootstrap interval and standard error, and the jackknife
+    standard error with its normal interval, per column of boot / jack.
+    """
+    lo, hi = np.quantile(boot, [(1 - conf) / 2, (1 + conf) / 2], axis=0)
+    n = jack.shape[0]
+    jack_se = np.sqrt((n - 1) / n * ((jack - jack.mean(axis=0)) ** 2).sum(axis=0))
+    z = norm.ppf((1 + conf) / 2)
+    return {
+        "estimate": point,
+        "boot_lo": lo,
+        "boot_hi": hi,
+        "boot_se": boot.std(axis=0, ddof=1),
+        "jack_lo": point - z * jack_se,
+        "jack_hi": point + z * jack_se,
+        "jack_se": jack_se,
+    }
+
+
+# -----------------------
+# Static
+# -----------------------
+@instrumented()
+def var_es_ci(
+    rp: pd.Series,
+    alpha: float = 0.95,
+    n_boot: int = 2000,
+    conf: float = 0.90,
+    block_len: int = 1,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """
+    Bootstrap and jackknife confidence intervals for var_historical /
+    es_historical.
+
+    All n_boot resamples (and the n leave-one-out samples) are built as one
+    index matrix and evaluated by one batched partition, no Python loop.
+    Percentile intervals (boot_*) are the ones to quote; the jackknife is a
+    quick delta-style check and is unreliable for VaR, which is not smooth in
+    the data.
+
+    Returns DataFrame indexed by ["VaR", "ES"] with:
+      estimate, boot_lo, boot_hi, boot_se, jack_lo, jack_hi, jack_se
+    """
+    x = rp.dropna().to_numpy(dtype=float)
+    rng = np.random.default_rng(seed)
+
+    var0, es0, _ = _var_es_rows(x[None, :], alpha)
+    bv, be, _ = _var_es_rows(x[resample_indices(len(x), n_boot, rng, block_len)], alpha)
+    jv, je, _ = _var_es_rows(x[jackknife_indices(len(x))], alpha)
+
+    out = _summarize(
+        np.array([var0[0], es0[0]]),
+        np.column_stack([bv, be]),
+        np.column_stack([jv, je]),
+        conf,
+    )
+    return pd.DataFrame(out, index=pd.Index(["VaR", "ES"], name="metric"))
+
+
+def _attribution_rows(R: np.ndarray, w: np.ndarray, idx: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    VaR, ES and component ES for every row of an index matrix (B x m), as
+    columns [VaR, ES, cES_1..cES_N]. The tail of each resample becomes
+    per-day counts (bincount), so component ES is one (B x T) @ (T x N)
+    product instead of gathering B x m x N returns.
+    """
+    B, m = idx.shape
+    T = R.shape[0]
+    rp = R @ w
+    var, es, mask = _var_es_rows(rp[idx], alpha)
+    rows = np.broadcast_to(np.arange(B)[:, None] * T, idx.shape)
+    counts = np.bincount((rows + idx)[mask], minlength=B * T).reshape(B, T)
+    comp = -(counts @ R) * w / mask.sum(axis=1)[:, None]
+    return np.column_stack([var, es, comp])
+
+
+@instrumented()
+def es_attribution_ci(
+    asset_returns: pd.DataFrame,
+    weights: pd.Series,
+    alpha: float = 0.95,
+    n_boot: int = 2000,
+    conf: float = 0.90,
+    block_len: int = 1,
+    seed: int = 0,
+    chunk: int = 500,
+) -> pd.DataFrame:
+    """
+    Bootstrap and jackknife confidence intervals for es_attribution_historical:
+    portfolio VaR, ES and every component ES. Each resample re-ranks the
+    days, so the tail (and the attribution) is recomputed, not just reweighted.
+
+    Returns DataFrame indexed by ["VaR", "ES", "cES_<asset>", ...] with:
+      estimate, boot_lo, boot_hi, boot_se, jack_lo, jack_hi, jack_se
+    """
+    weights = weights.reindex(asset_returns.columns).astype(float)
+    R = asset_returns.to_numpy(dtype=float)
+    w = weights.to_numpy()
+    T = R.shape[0]
+    rng = np.random.default_rng(seed)
+
+    point = _attribution_rows(R, w, np.arange(T)[None, :], alpha)[0]
+    idx = resample_indices(T, n_boot, rng, block_len)
+    boot = np.vstack([_attribution_rows(R, w, idx[a : a + chunk], alpha) for a in range(0, n_boot, chunk)])
+    jack_idx = jackknife_indices(T)
+    jack = np.vstack([_attribution_rows(R, w, jack_idx[a : a + chunk], alpha) for a in range(0, T, chunk)])
+
+    names = ["VaR", "ES"] + [f"cES_{c}" for c in asset_returns.columns]
+    return pd.DataFrame(_summarize(point, boot, jack, conf), index=pd.Index(names, name="metric"))
+
+
+# -----------------------
+# Rolling
+# -----------------------
+@instrumented()
+def rolling_var_es_ci(
+    r: pd.Series,
+    alpha: float,
+    window: int,
+    n_boot: int = 500,
+    conf: float = 0.90,
+    seed: int = 0,
+    chunk_elems: int = 4_000_000,
+) -> pd.DataFrame:
+    """
+    Rolling historical VaR / ES with bootstrap bands and jackknife standard
+    errors, on the same windows as rolling_metrics_historical (value at t
+    uses rows t - window .. t - 1).
+
+    One (n_boot x window) index matrix is shared by every window (common
+    random numbers, so the bands move with the data rather than with
+    resampling noise); windows are evaluated in chunks of
+    (windows x n_boot x window) with one partition per chunk.
+
+    Returns DataFrame indexed by date with:
+      VaR, VaR_lo, VaR_hi, ES, ES_lo, ES_hi, ES_boot_se, ES_jack_se
+    """
+    r = r.dropna()
+    x = r.to_numpy(dtype=float)
+    windows = sliding_window_view(x, window)[:-1]                 # row j -> date index j + window
+    rng = np.random.default_rng(seed)
+    idx = resample_indices(window, n_boot, rng)
+    jidx = jackknife_indices(window)
+    qs = [(1 - conf) / 2, (1 + conf) / 2]
+
+    n_win = len(windows)
+    cols = {k: np.empty(n_win) for k in ("VaR", "VaR_lo", "VaR_hi", "ES", "ES_lo", "ES_hi", "ES_boot_se", "ES_jack_se")}
+    step = max(1, chunk_elems // (n_boot * window))
+    for a in range(0, n_win, step):
+        w = windows[a : a + step]
+        sl = slice(a, a + len(w))
+        cols["VaR"][sl], cols["ES"][sl], _ = _var_es_rows(w, alpha)
+
+        bv, be, _ = _var_es_rows(w[:, idx], alpha)                # (chunk, n_boot)
+        cols["VaR_lo"][sl], cols["VaR_hi"][sl] = np.quantile(bv, qs, axis=1)
+        cols["ES_lo"][sl], cols["ES_hi"][sl] = np.quantile(be, qs, axis=1)
+        cols["ES_boot_se"][sl] = be.std(axis=1, ddof=1)
+
+        _, je, _ = _var_es_rows(w[:, jidx], alpha)                # (chunk, window)
+        cols["ES_jack_se"][sl] = np.sqrt((window - 1) / window * ((je - je.mean(axis=1, keepdims=True)) ** 2).sum(axis=1))
+
+    return pd.DataFrame(cols, index=pd.Index(r.index[window:], name="Date"))
@@ -0,0 +1,183 @@
+import numpy as np
+import pandas as pd
+
+from risk_engine import kernels
+from risk_engine.instrumentation import instrumented
+
+
+# -----------------------
+# Rank-one Cholesky updates
+# -----------------------
+def chol_update(L: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    In place: L becomes the lower Cholesky factor of L L' + x x'. O(N^2).
+    x is overwritten. Returns L.
+    """
+    return kernels.chol_rank1(L, x, 1.0)
+
+
+def chol_downdate(L: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """
+    In place: L becomes the lower Cholesky factor of L L' - x x'. O(N^2).
+    x is overwritten. Raises ValueError if the result is not positive definite.
+    Returns L.
+    """
+    return kernels.chol_rank1(L, x, -1.0)
+
+
+def _cholesky(a: np.ndarray, what: str) -> np.ndarray:
+    try:
+        return np.linalg.cholesky(a)
+    except np.linalg.LinAlgError:
+        raise ValueError(f"{what} is not positive definite (need more rows than assets, no constant asset).")
+
+
+# -----------------------
+# Covariance paths
+# -----------------------
+def iter_covariance(
+    R: np.ndarray,
+    method: str = "rolling",
+    window: int = 250,
+    lam: float = 0.94,
+    n_init: int = 20,
+    cholesky: bool = False,
+    rank_one: bool | None = None,
+    refresh: int = 500,
+):
+    """
+    Yields (t, mu, M) for every row t the model is defined at, with mu and M
+    using rows before t only (t = len(R) is the forecast for the next day):
+      - "rolling": sample mean and covariance (ddof=1) of R[t - window : t],
+        from t = window. Each step adds the newest row and removes the oldest
+        (Welford), O(N^2) instead of O(window * N^2).
+      - "ewma": RiskMetrics, zero mean, S[t+1] = lam * S[t] + (1 - lam) r_t r_t',
+        seeded with the mean of r r' over the first n_init rows (as
+        ewma_variance, whose values are the diagonal), from t = n_init.
+
+    cholesky=True yields the lower Cholesky factor of the covariance instead.
+    With rank_one the factor itself is carried forward by rank-one updates /
+    downdates, O(N^2) per step (refactored every `refresh` rolling steps to
+    bound rounding drift); otherwise the covariance is carried forward and
+    factored each step, O(N^3) but in LAPACK. rank_one=None picks rank-one
+    updates when the compiled kernels are active (interpreted, the LAPACK
+    factorization is faster up to several hundred assets).
+    M is a fresh array each step. R must be free of NaN.
+    """
+    R = np.asarray(R, dtype=float)
+    T, n = R.shape
+    if np.isnan(R).any():
+        raise ValueError("Returns contain NaN; drop or fill them first.")
+    if rank_one is None:
+        rank_one = kernels.backend() == "numba"
+    rank_one = cholesky and rank_one
+
+    if method == "rolling":
+        if not n < window <= T:
+            raise ValueError("Need n_assets < window <= number of rows.")
+        mu = R[:window].mean(axis=0)
+        d = R[:window] - mu
+        m2 = d.T @ d                                          # scatter matrix, cov * (window - 1)
+        L = _cholesky(m2, "Window covariance") if rank_one else None
+        scale = 1.0 / (window - 1)
+        k_in = window / (window + 1)                          # scatter change: adding a row +k_in d d',
+        k_out = (window + 1) / window                         # then removing one -k_out d d' (d = row - mean)
+        for t in range(window, T + 1):
+            if rank_one:
+                yield t, mu.copy(), L * np.sqrt(scale)
+            elif cholesky:
+                yield t, mu.copy(), _cholesky(m2 * scale, "Window covariance")
+            else:
+                yield t, mu.copy(), m2 * scale
+            if t == T:
+                break
+            old, new = R[t - window], R[t]
+            if rank_one and (t - window + 1) % refresh == 0:
+                mu = R[t - window + 1 : t + 1].mean(axis=0)
+                d = R[t - window + 1 : t + 1] - mu
+                L = _cholesky(d.T @ d, "Window covariance")
+                continue
+            # add the newest row (window -> window + 1), then remove the oldest,
+            # so the factor never passes through a rank-deficient window
+            d = new - mu
+            mu = mu + d / (window + 1)
+            if rank_one:
+                chol_update(L, np.sqrt(k_in) * d)
+            else:
+                m2 += np.outer(d, new - mu)
+            d = old - mu
+            mu = mu - d / window
+            if rank_one:
+                chol_downdate(L, np.sqrt(k_out) * d)
+            else:
+                m2 -= np.outer(d, old - mu)
+        return
+
+    if method == "ewma":
+        if not n < n_init <= T:
+            raise ValueError("Need n_assets < n_init <= number of rows.")
+        S = R[:n_init].T @ R[:n_init] / n_init
+        L = _cholesky(S, "EWMA seed covariance") if rank_one else None
+        zero = np.zeros(n)
+        for t in range(T + 1):
+            if t >= n_init:
+                if rank_one:
+                    yield t, zero.copy(), L.copy()
+                elif cholesky:
+                    yield t, zero.copy(), _cholesky(S, "EWMA covariance")
+                else:
+                    yield t, zero.copy(), S.copy()
+            if t == T:
+                break
+            if rank_one:
+                L *= np.sqrt(lam)
+                chol_update(L, np.sqrt(1 - lam) * R[t])
+            else:
+                S = lam * S + (1 - lam) * np.outer(R[t], R[t])
+        return
+
+    raise ValueError(f"Unknown covariance method: {method}. Use 'rolling' or 'ewma'.")
+
+
+@instrumented()
+def covariance_path(
+    asset_returns: pd.DataFrame,
+    method: str = "rolling",
+    window: int = 250,
+    lam: float = 0.94,
+    n_init: int = 20,
+    cholesky: bool = False,
+    start=None,
+    every: int = 1,
+    rank_one: bool | None = None,
+) -> dict:
+    """
+    Date-indexed covariances (or Cholesky factors) from iter_covariance: the
+    entry dated t uses returns before t only, like the rolling_metrics_*
+    series. Every row is still folded in; start (first date kept) and every
+    (keep one date in `every`) only thin what is stored. rank_one as in
+    iter_covariance.
+    Returns dict with:
+      - dates (DatetimeIndex), assets (list)
+      - mu (D x N)
+      - cov or chol (D x N x N)
+    """
+    R = asset_returns.to_numpy(dtype=float)
+    first = 0 if start is None else int(asset_returns.index.searchsorted(pd.Timestamp(start)))
+    rows, mus, mats = [], [], []
+    kept = 0
+    for t, mu, m in iter_covariance(R, method, window, lam, n_init, cholesky, rank_one):
+        if t >= len(R) or t < first:
+            continue
+        if kept % every == 0:
+            rows.append(t)
+            mus.append(mu)
+            mats.append(m)
+        kept += 1
+    n = R.shape[1]
+    return {
+        "dates": asset_returns.index[rows],
+        "assets": list(asset_returns.columns),
+        "mu": np.array(mus).reshape(-1, n),
+        "chol" if cholesky else "cov": np.array(mats).reshape(-1, n, n),
+    }
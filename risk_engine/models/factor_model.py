@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from risk_engine.instrumentation import instrumented
+
+
+def ledoit_wolf_shrinkage(x: np.ndarray) -> float:
+    """
+    Ledoit-Wolf (2004) optimal shrinkage intensity towards the scaled identity m*I.
+
+    x: (T x N) demeaned returns
+    Works on the T x T Gram matrix, so cost is O(T^2 N) and the N x N sample
+    covariance is never formed. Returns delta in [0, 1].
+    """
+    t_obs, n_assets = x.shape
+    gram = x @ x.T                                   # (T, T)
+
+    # Sample covariance S = X'X / T, expressed through the Gram matrix
+    tr_s = np.trace(gram) / t_obs
+    tr_s2 = float((gram ** 2).sum()) / t_obs**2
+    m = tr_s / n_assets
+
+    # Normalised Frobenius distances (||A||^2 = tr(AA') / N)
+    d2 = tr_s2 / n_assets - m**2
+    b2_bar = (float((np.diag(gram) ** 2).sum()) - t_obs * tr_s2) / (n_assets * t_obs**2)
+    b2 = min(b2_bar, d2)
+
+    if d2 <= 0:
+        return 1.0
+    return float(b2 / d2)
+
+
+@instrumented()
+def fit_factor_model(
+    returns: pd.DataFrame,
+    n_factors: int = 5,
+    shrinkage: str | None = "ledoit-wolf",
+    min_specific_var: float = 1e-12,
+) -> dict:
+    """
+    Statistical (PCA) factor model:  Sigma = B B' + diag(D)
+
+    The leading eigenvectors of the (optionally Ledoit-Wolf shrunk) sample
+    covariance give the loadings, scaled so the factors have identity covariance.
+    Specific variance is the diagonal the factors leave unexplained, floored at
+    min_specific_var, so Sigma is positive-definite even when T < N.
+
+    Returns dict with:
+      - mu (ndarray, N)
+      - loadings (ndarray, N x k)
+      - specific_var (ndarray, N)
+      - explained (float, share of total variance captured by the k factors)
+      - shrinkage (float, intensity actually applied)
+      - asset_names (list)
+    """
+    x = returns.dropna().values
+    t_obs, n_assets = x.shape
+    if t_obs < 2:
+        raise ValueError("Need at least 2 observations to fit a factor model.")
+
+    k = int(min(n_factors, t_obs - 1, n_assets))
+    if k < 1:
+        raise ValueError("n_factors must be at least 1.")
+
+    mu = x.mean(axis=0)
+    xc = x - mu
+
+    # Thin SVD: O(T N min(T, N)); eigenvalues of S = X'X / (T - 1) are s^2 / (T - 1)
+    _, s, vt = np.linalg.svd(xc, full_matrices=False)
+    eig = s**2 / (t_obs - 1)
+    diag_s = (xc**2).sum(axis=0) / (t_obs - 1)
+
+    if shrinkage == "ledoit-wolf":
+        delta = ledoit_wolf_shrinkage(xc)
+    elif shrinkage is None:
+        delta = 0.0
+    else:
+        raise ValueError(f"Unknown shrinkage: {shrinkage}")
+
+    # Shrinking towards m*I keeps the eigenvectors and moves eigenvalues towards m
+    m = diag_s.mean()
+    eig_k = (1.0 - delta) * eig[:k] + delta * m
+    diag_shrunk = (1.0 - delta) * diag_s + delta * m
+
+    loadings = vt[:k].T * np.sqrt(eig_k)             # (N, k)
+    specific_var = np.maximum(diag_shrunk - (loadings**2).sum(axis=1), min_specific_var)
+
+    return {
+        "mu": mu,
+        "loadings": loadings,
+        "specific_var": specific_var,
+        "explained": float(eig_k.sum() / diag_shrunk.sum()),
+        "shrinkage": float(delta),
+        "asset_names": list(returns.columns),
+    }
+
+
+def factor_model_cov(model: dict) -> np.ndarray:
+    """
+    Dense covariance B B' + diag(D) implied by a fitted factor model.
+    Only intended for small universes (reporting, checks); the simulators
+    never need it.
+    """
+    b = model["loadings"]
+    return b @ b.T + np.diag(model["specific_var"])
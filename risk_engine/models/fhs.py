@@ -0,0 +1,208 @@
+import bisect
+
+import numpy as np
+import pandas as pd
+from scipy.optimize import minimize
+from scipy.signal import lfilter
+
+from risk_engine.instrumentation import instrumented, stage
+
+
+# -----------------------
+# Volatility filters
+# -----------------------
+# Both return one-step-ahead variance forecasts s2 of length T + 1:
+# s2[t] uses r[:t] only, s2[T] is the forecast for the next (unseen) day.
+# The recursions are linear in r^2, so they run as a single lfilter pass.
+
+def ewma_variance(r: np.ndarray, lam: float = 0.94, n_init: int = 20) -> np.ndarray:
+    """
+    RiskMetrics EWMA: s2[t+1] = lam * s2[t] + (1 - lam) * r[t]^2.
+    Seeded with the mean square of the first n_init returns.
+    """
+    r = np.asarray(r, dtype=float)
+    s0 = float(np.mean(r[:n_init] ** 2))
+    tail, _ = lfilter([1.0 - lam], [1.0, -lam], r**2, zi=[lam * s0])
+    return np.concatenate([[s0], tail])
+
+
+def garch11_variance(r: np.ndarray, params: dict, s0: float) -> np.ndarray:
+    """GARCH(1,1): s2[t+1] = omega + a * r[t]^2 + b * s2[t], starting from s2[0] = s0."""
+    r = np.asarray(r, dtype=float)
+    omega, a, b = params["omega"], params["alpha"], params["beta"]
+    tail, _ = lfilter([1.0], [1.0, -b], omega + a * r**2, zi=[b * s0])
+    return np.concatenate([[s0], tail])
+
+
+def _garch_nll(theta, r2, var_target):
+    a, b = theta
+    if a + b >= 0.999:
+        return 1e10
+    params = {"omega": var_target * (1.0 - a - b), "alpha": a, "beta": b}
+    s2 = garch11_variance(np.sqrt(r2), params, var_target)[:-1]
+    return 0.5 * float(np.sum(np.log(s2) + r2 / s2))
+
+
+@instrumented()
+def garch11_fit(r: np.ndarray, start=(0.06, 0.92)) -> dict:
+    """
+    Gaussian quasi-MLE of GARCH(1,1) with variance targeting
+    (omega = sample variance * (1 - a - b)), so only (a, b) are optimized.
+
+    Returns dict with: omega, alpha, beta, persistence, converged.
+    Non-converged fits keep the starting values.
+    """
+    r = np.asarray(r, dtype=float)
+    r2 = r**2
+    var_target = float(np.mean(r2))
+
+    res = minimize(
+        _garch_nll, x0=np.asarray(start), args=(r2, var_target),
+        method="L-BFGS-B", bounds=[(1e-6, 0.5), (0.0, 0.998)],
+    )
+    a, b = res.x if res.success and res.x.sum() < 0.999 else start
+    return {
+        "omega": float(var_target * (1.0 - a - b)),
+        "alpha": float(a),
+        "beta": float(b),
+        "persistence": float(a + b),
+        "converged": bool(res.success),
+    }
+
+
+def filtered_variance(
+    r: np.ndarray,
+    model: str = "ewma",
+    lam: float = 0.94,
+    refit_every: int = 21,
+    min_fit: int = 60,
+    fit_window: int = 1000,
+) -> np.ndarray:
+    """
+    One-step-ahead variance forecasts (length T + 1) without look-ahead.
+
+    "ewma": fixed lam. "garch": parameters are re-estimated every refit_every
+    days on the last fit_window returns (EWMA until min_fit returns exist),
+    and the recursion carries on from the current variance with the new
+    parameters. The refit sample is bounded, so the cost per day does not
+    grow with the history.
+    """
+    r = np.asarray(r, dtype=float)
+    s2 = ewma_variance(r, lam)
+    if model == "ewma":
+        return s2
+    if model != "garch":
+        raise ValueError(f"Unknown volatility model: {model}. Use 'ewma' or 'garch'.")
+
+    for start in range(min_fit, len(r), refit_every):
+        with stage("garch_refit"):
+            params = garch11_fit(r[max(0, start - fit_window):start])
+        end = min(start + refit_every, len(r))
+        s2[start:end + 1] = garch11_variance(r[start:end], params, s2[start])
+    return s2
+
+
+# -----------------------
+# Filtered historical simulation
+# -----------------------
+def _fhs_inputs(rp: pd.Series, model: str, lam: float):
+    x = rp.dropna()
+    sigma = np.sqrt(filtered_variance(x.values, model=model, lam=lam))
+    z = x.values / sigma[:-1]                          # devolatilised residuals
+    return x, sigma, z
+
+
+def var_fhs(rp: pd.Series, alpha: float, model: str = "ewma", lam: float = 0.94) -> float:
+    """
+    Next-day VaR: historical quantile of the filtered residuals, rescaled to
+    the current volatility forecast. Positive number (loss).
+    """
+    _, sigma, z = _fhs_inputs(rp, model, lam)
+    return float(-sigma[-1] * np.quantile(z, 1 - alpha))
+
+
+def es_fhs(rp: pd.Series, alpha: float, model: str = "ewma", lam: float = 0.94) -> float:
+    """Next-day ES on the same rescaled residuals (mean of the '<= VaR quantile' tail)."""
+    _, sigma, z = _fhs_inputs(rp, model, lam)
+    q = np.quantile(z, 1 - alpha)
+    return float(-sigma[-1] * z[z <= q].mean())
+
+
+def _fenwick_add(cnt: list, tot: list, i: int, v: float) -> None:
+    """Add value v at 0-based rank i to the count and sum trees."""
+    i += 1
+    while i < len(cnt):
+        cnt[i] += 1
+        tot[i] += v
+        i += i & -i
+
+
+def _fenwick_prefix(cnt: list, tot: list, i: int) -> tuple[int, float]:
+    """Count and sum of the values at ranks < i."""
+    c, s = 0, 0.0
+    while i > 0:
+        c += cnt[i]
+        s += tot[i]
+        i -= i & -i
+    return c, s
+
+
+def _fenwick_kth(cnt: list, k: int) -> int:
+    """0-based rank of the k-th smallest (0-based) value inserted so far."""
+    pos, step = 0, 1 << (len(cnt) - 1).bit_length()
+    while step:
+        nxt = pos + step
+        if nxt < len(cnt) and cnt[nxt] <= k:
+            pos = nxt
+            k -= cnt[nxt]
+        step >>= 1
+    return pos
+
+
+@instrumented()
+def rolling_metrics_fhs(
+    r: pd.Series,
+    alpha: float,
+    burn_in: int = 60,
+    model: str = "ewma",
+    lam: float = 0.94,
+) -> pd.DataFrame:
+    """
+    Rolling FHS VaR/ES, laid out like the other rolling_metrics_*: the value at
+    date i uses returns before i only, so the series feeds the backtests as is.
+
+    The residual sample is the full history seen so far (no window). Residuals
+    are ranked once up front; each day then costs one variance update plus
+    O(log T) Fenwick-tree steps over those ranks (insert the new residual,
+    read the two order statistics around the quantile and the tail's count
+    and sum), so the whole series is O(T log T).
+    """
+    x, sigma, z = _fhs_inputs(r, model, lam)
+    p = 1 - alpha
+
+    # Fenwick trees (count, sum) indexed by each residual's rank in the full sample
+    order = np.argsort(z, kind="stable")
+    ranks = np.empty(len(z), dtype=int)
+    ranks[order] = np.arange(len(z))
+    vals, ranks, zl = z[order].tolist(), ranks.tolist(), z.tolist()
+    cnt, tot = [0] * (len(z) + 1), [0.0] * (len(z) + 1)
+    for j in range(burn_in):
+        _fenwick_add(cnt, tot, ranks[j], zl[j])
+
+    dates, var_list, es_list = [], [], []
+
+    for i in range(burn_in, len(x)):
+        h = (i - 1) * p                                      # i residuals seen so far
+        lo = int(h)
+        hi = min(lo + 1, i - 1)
+        z_lo, z_hi = vals[_fenwick_kth(cnt, lo)], vals[_fenwick_kth(cnt, hi)]
+        q = z_lo + (h - lo) * (z_hi - z_lo)                  # np.quantile, linear
+        c, tail = _fenwick_prefix(cnt, tot, bisect.bisect_right(vals, q))
+
+        var_list.append(float(-sigma[i] * q))
+        es_list.append(float(-sigma[i] * tail / c))
+        dates.append(x.index[i])
+
+        _fenwick_add(cnt, tot, ranks[i], zl[i])
+
+    return pd.DataFrame({"VaR": var_list, "ES": es_list}, index=dates)
@@ -3,6 +3,9 @@ import pandas as pd
 from scipy.stats import norm
 from scipy.stats import t as student_t
 
+from risk_engine.instrumentation import instrumented, stage
+from risk_engine.memo import memoize
+
 def portfolio_returns(returns: pd.DataFrame, weights: np.ndarray) -> pd.Series:
     """
     Compute portfolio returns r_p(t) = sum_i w_i * r_i(t)
@@ -21,32 +24,40 @@ def portfolio_returns(returns: pd.DataFrame, weights: np.ndarray) -> pd.Series:
 # -----------------------
 # Parametric (Gaussian)
 # -----------------------
+@memoize()
+def _mean_std(rp: pd.Series) -> tuple[float, float]:
+    """Sample mean and std (ddof=1), shared by the Gaussian VaR and ES."""
+    return rp.mean(), rp.std(ddof=1)
+
+
+@memoize()
 def var_gaussian(rp: pd.Series, alpha: float) -> float:
     """
     VaR at level alpha (e.g. 0.99) as a positive number (loss).
     Uses Normal(mu, sigma)
     """
-    mu = rp.mean()
-    sigma = rp.std(ddof=1)
+    mu, sigma = _mean_std(rp)
     q = norm.ppf(1 - alpha, loc=mu, scale=sigma) #left tail quantile
     return(float(-q))
 
+@memoize()
 def es_gaussian(rp: pd.Series, alpha:float) -> float:
     """
     ES at level alpha as a postivie number (loss)
     For Normal, ES has closed form
     """
-    mu = rp.mean()
-    sigma = rp.std(ddof=1)
+    mu, sigma = _mean_std(rp)
     z = norm.ppf(1 - alpha)
     es = -(mu - sigma * norm.pdf(z) / (1 - alpha))
     return float(es)
 
 # Historical
+@memoize()
 def var_historical(rp: pd.Series, alpha: float) -> float:
     q = np.quantile(rp.dropna().values, 1 - alpha)
     return float(-q)
 
+@memoize()
 def es_historical(rp: pd.Series, alpha: float) -> float:
     """
     ES = average of losses beyond VaR threshold (left tail)
@@ -56,13 +67,26 @@ def es_historical(rp: pd.Series, alpha: float) -> float:
     tail = x[x <= q]
     return float(-tail.mean())
 
+@memoize()
+def fit_student_t(x: np.ndarray) -> tuple[float, float, float]:
+    """
+    MLE Student-t fit (df, loc, scale). Memoized on the sample's content, so a
+    window fitted once is never refitted (e.g. for VaR and then ES).
+    """
+    with stage("t_fit"):
+        df, loc, scale = student_t.fit(x)
+    return float(df), float(loc), float(scale)
+
+
+@instrumented()
+@memoize()
 def es_student_t(rp: pd.Series, alpha: float) -> float:
     """
     Parametric ES under Student-t fitted by MLE.
     Returns ES as a positive loss number.
     """
     x = rp.dropna().values
-    df, loc, scale = student_t.fit(x)
+    df, loc, scale = fit_student_t(x)
 
     # Guardrails
     if df <= 2 or scale <= 0 or not np.isfinite([df, loc, scale]).all():
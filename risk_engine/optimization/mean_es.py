@@ -0,0 +1,165 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linprog
+
+from risk_engine.instrumentation import instrumented, stage
+from risk_engine.sim.monte_carlo import var_es_from_losses, var_es_from_weighted_losses
+
+
+def _solve_ru_lp(R, p, mu, alpha, target_return, lb, ub):
+    """
+    Rockafellar-Uryasev LP on the scenario rows R (K x N) with probabilities p:
+
+        min  zeta + sum_k p_k u_k / (1 - alpha)
+        s.t. u_k >= -R_k w - zeta,  u >= 0,  sum w = 1,  mu w >= target,  lb <= w <= ub
+
+    solved through its dual, which has N + 1 rows instead of K:
+
+        max  lam + eta * target + a'lb - b'ub
+        s.t. R'q + lam 1 + eta mu + a - b = 0,  sum q = 1,
+             0 <= q_k <= p_k / (1 - alpha),  eta, a, b >= 0
+
+    (q is the tail-scenario weighting of the ES dual representation). The
+    columns are sparse apart from R'; w and zeta are read back from the row
+    marginals. Returns (w, zeta, ES objective).
+    """
+    K, N = R.shape
+    blocks = [sp.csr_matrix(R.T), sp.csr_matrix(np.ones((N, 1)))]
+    cost = [np.zeros(K), [-1.0]]
+    bounds = [(0.0, c) for c in p / (1.0 - alpha)] + [(None, None)]
+
+    if target_return is not None:
+        blocks.append(sp.csr_matrix(mu[:, None]))
+        cost.append([-target_return])
+        bounds.append((0.0, None))
+
+    # Multipliers of the finite weight bounds only
+    eye = sp.identity(N, format="csr")
+    lo, hi = np.isfinite(lb), np.isfinite(ub)
+    blocks += [eye[:, lo], -eye[:, hi]]
+    cost += [-lb[lo], ub[hi]]
+    bounds += [(0.0, None)] * int(lo.sum() + hi.sum())
+
+    A = sp.hstack(blocks, format="csr")
+    sum_q = sp.csr_matrix((np.ones(K), (np.zeros(K, dtype=int), np.arange(K))), shape=(1, A.shape[1]))
+    A_eq = sp.vstack([A, sum_q], format="csr")
+    b_eq = np.concatenate([np.zeros(N), [1.0]])
+
+    res = linprog(np.concatenate(cost), A_eq=A_eq, b_eq=b_eq, bounds=bounds, method="highs-ds")
+    if res.status != 0:
+        raise ValueError(f"Mean-ES LP failed: {res.message}")
+    y = res.eqlin.marginals
+    return -y[:N], float(-y[N]), float(-res.fun)
+
+
+@instrumented()
+def optimize_mean_es(
+    scenario_returns: np.ndarray,
+    alpha: float = 0.95,
+    target_return: float | None = None,
+    min_weight=0.0,
+    max_weight=1.0,
+    probs: np.ndarray | None = None,
+    w0: np.ndarray | None = None,
+    n_sub: int = 2000,
+    tail_mult: float = 1.5,
+    seed: int = 0,
+    max_iter: int = 20,
+    asset_names: list[str] | None = None,
+) -> dict:
+    """
+    Minimum-ES long/short-bounded portfolio on S scenarios of N asset returns
+    (horizon returns; for MC paths use paths.sum(axis=1), the same linear
+    P&L as mc_es_attribution).
+
+    Only scenarios beyond VaR carry a positive u_k, so the LP is solved on an
+    active subset and grown by constraint generation:
+      1. warm start: w0 if given, else the optimum on a random subsample of
+         n_sub scenarios;
+      2. active set: the worst scenarios at the warm-start weights, holding
+         tail_mult * (1 - alpha) of the probability;
+      3. solve, add the inactive scenarios whose loss at the new weights
+         exceeds zeta (worst first, at most n_tail per round), repeat. When
+         nothing is added the subset solution is optimal for all S
+         scenarios (dropped rows only relax the LP).
+    Passing a previous solution as w0 (e.g. day-over-day) skips step 1 and
+    usually converges in one solve.
+
+    min_weight / max_weight: scalars or per-asset arrays. target_return:
+    minimum expected scenario return (None = unconstrained).
+
+    Returns dict with:
+      - weights (Series)
+      - VaR, ES (positive, on all scenarios; var_es_from_losses conventions, or
+        var_es_from_weighted_losses when probs is given)
+      - objective (Rockafellar-Uryasev ES at the optimum)
+      - expected_return
+      - component_ES (Series, sums to ES), share (Series)
+      - iterations, active_scenarios
+    """
+    R = np.asarray(scenario_returns, dtype=float)
+    S, N = R.shape
+    names = asset_names if asset_names is not None else [f"asset_{i}" for i in range(N)]
+    p = np.full(S, 1.0 / S) if probs is None else np.asarray(probs, dtype=float) / np.sum(probs)
+    mu = p @ R
+
+    lb = np.broadcast_to(np.asarray(min_weight, dtype=float), (N,))
+    ub = np.broadcast_to(np.asarray(max_weight, dtype=float), (N,))
+
+    if w0 is not None:
+        w = np.asarray(w0, dtype=float)
+    elif S > n_sub:
+        # Equally likely draws: without replacement, or by probability if weighted
+        rng = np.random.default_rng(seed)
+        sub = rng.choice(S, size=n_sub, replace=False) if probs is None else rng.choice(S, size=n_sub, p=p)
+        with stage("lp_subsample"):
+            w, _, _ = _solve_ru_lp(R[sub], np.full(n_sub, 1.0 / n_sub), mu, alpha, target_return, lb, ub)
+    else:
+        w = np.ones(N) / N
+
+    # Worst scenarios at the warm start until they hold tail_mult * (1 - alpha) probability
+    order = np.argsort(R @ w, kind="stable")
+    n_tail = min(S, int(np.searchsorted(np.cumsum(p[order]), tail_mult * (1 - alpha))) + 1)
+    active = np.zeros(S, dtype=bool)
+    active[order[:n_tail]] = True
+
+    for it in range(1, max_iter + 1):
+        idx = np.flatnonzero(active)
+        with stage("lp_solve"):
+            w, zeta, objective = _solve_ru_lp(R[idx], p[idx], mu, alpha, target_return, lb, ub)
+
+        # Add the worst violated scenarios, at most one tail's worth per round
+        loss = -(R @ w)
+        violated = np.flatnonzero(~active & (loss > zeta + 1e-12))
+        if len(violated) == 0:
+            break
+        if len(violated) > n_tail:
+            violated = violated[np.argpartition(-loss[violated], n_tail - 1)[:n_tail]]
+        active[violated] = True
+    else:
+        raise ValueError(f"Mean-ES constraint generation did not converge in {max_iter} iterations.")
+
+    # Report on the full scenario set
+    contrib = R * w                                   # (S, N) return contributions
+    losses = -contrib.sum(axis=1)
+    if probs is None:
+        var, _ = var_es_from_losses(losses, alpha)
+    else:
+        var, _ = var_es_from_weighted_losses(losses, alpha, p)
+    tail = losses >= var
+    pt = p[tail] / p[tail].sum()
+    es = float(pt @ losses[tail])
+    comp = pd.Series(-(pt @ contrib[tail]), index=names)
+
+    return {
+        "weights": pd.Series(w, index=names),
+        "VaR": var,
+        "ES": es,
+        "objective": objective,
+        "expected_return": float(mu @ w),
+        "component_ES": comp.sort_values(ascending=False),
+        "share": (comp / es).sort_values(ascending=False),
+        "iterations": it,
+        "active_scenarios": int(active.sum()),
+    }
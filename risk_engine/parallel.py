@@ -0,0 +1,107 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+
+# Per-worker view of the shared returns block, set once by _attach
+_SHARED = {}
+
+
+def _attach(shm_name, shape, dtype, index, columns, name):
+    """Worker initializer: map the shared block once and keep a zero-copy view."""
+    # Pool workers share the parent's resource tracker, so attaching here does
+    # not add a second owner: the parent's unlink releases the block.
+    shm = shared_memory.SharedMemory(name=shm_name)
+
+    _SHARED["shm"] = shm
+    _SHARED["values"] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _SHARED["index"] = index
+    _SHARED["columns"] = columns
+    _SHARED["name"] = name
+
+
+def _shared_slice(a: int, b: int):
+    """Rows a:b of the shared data as a pandas object backed by shared memory."""
+    values = _SHARED["values"][a:b]
+    index = _SHARED["index"][a:b]
+    if values.ndim == 1:
+        return pd.Series(values, index=index, name=_SHARED["name"], copy=False)
+    return pd.DataFrame(values, index=index, columns=_SHARED["columns"], copy=False)
+
+
+def _run_chunk(fn, a, b, window, args, kwargs):
+    return fn(_shared_slice(a, b), *args, window=window, **kwargs)
+
+
+def chunk_bounds(n_rows: int, window: int, n_chunks: int) -> list[tuple[int, int]]:
+    """
+    Input row ranges for each chunk. Outputs start at row `window`; a chunk
+    producing outputs for rows [s, e) reads rows [s - window, e), so
+    consecutive chunks overlap by `window` rows and together cover every output
+    exactly once.
+    """
+    n_out = n_rows - window
+    if n_out <= 0:
+        return []
+    n_chunks = max(1, min(n_chunks, n_out))
+    cuts = np.linspace(window, n_rows, n_chunks + 1).round().astype(int)
+    return [(int(s - window), int(e)) for s, e in zip(cuts[:-1], cuts[1:])]
+
+
+def parallel_rolling(
+    fn,
+    data,
+    window: int,
+    *args,
+    workers: int | None = None,
+    n_chunks: int | None = None,
+    **kwargs,
+):
+    """
+    Run a windowed rolling function fn(data, *args, window=window, **kwargs)
+    across processes and stitch the results in date order.
+
+    fn must be a module-level function whose output at row t depends only on
+    rows t - window .. t - 1 (rolling_metrics_*, rolling_var_*,
+    rolling_es_attribution_historical). Expanding-history models such as
+    rolling_metrics_fhs do not qualify.
+
+    The values are copied once into multiprocessing.shared_memory; workers map
+    the block at start-up and wrap zero-copy row slices in a Series /
+    DataFrame, so only chunk bounds and small results cross process
+    boundaries. workers=1 (or a single chunk) calls fn directly.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    n_chunks = 4 * workers if n_chunks is None else n_chunks
+    bounds = chunk_bounds(len(data), window, n_chunks)
+
+    if workers <= 1 or len(bounds) <= 1:
+        return fn(data, *args, window=window, **kwargs)
+
+    if data.isna().to_numpy().any():
+        raise ValueError("parallel_rolling needs data without missing values; drop them first.")
+
+    values = np.ascontiguousarray(data.to_numpy(dtype=float))
+    columns = None if isinstance(data, pd.Series) else data.columns
+    name = data.name if isinstance(data, pd.Series) else None
+
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+        del values
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_attach,
+            initargs=(shm.name, data.shape, np.float64, data.index, columns, name),
+        ) as pool:
+            futures = [pool.submit(_run_chunk, fn, a, b, window, args, kwargs) for a, b in bounds]
+            parts = [f.result() for f in futures]
+    finally:
+        shm.close()
+        shm.unlink()
+
+    return pd.concat(parts)
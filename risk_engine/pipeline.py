@@ -0,0 +1,412 @@
+import hashlib
+import json
+import os
+import pickle
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+from risk_engine.instrumentation import stage
+
+
+DEFAULT_CONFIG = {
+    "returns_path": "returns.csv",
+    "alpha": 0.95,
+    "alphas": [0.95, 0.99],
+    "window": 60,
+    "stress_start": "2025-04-01",
+    "stress_end": "2025-07-01",
+    "horizon": 10,
+    "n_sims": 50_000,
+    "seed": 42,
+    "df_t": 6.0,
+    "n_factors": None,
+    "copula_marginals": "empirical",
+}
+
+
+# -----------------------
+# Stage functions
+# -----------------------
+# Each takes its dependencies' values positionally, then its config params as
+# keywords. They live at module level so a process pool can pickle them.
+
+def _load_asset_returns(returns_path):
+    asset_rets = pd.read_csv(returns_path, parse_dates=[0], index_col=0)
+    asset_rets.index.name = "Date"
+    return asset_rets
+
+
+def _equal_weights(asset_rets):
+    n = asset_rets.shape[1]
+    return pd.Series(1.0 / n, index=asset_rets.columns)
+
+
+def _portfolio_returns(asset_rets, weights):
+    from risk_engine.models.var_es import portfolio_returns
+    return portfolio_returns(asset_rets, weights.values)
+
+
+def _var_report(rp, alphas):
+    from risk_engine.run_var_report import var_es_report
+    return var_es_report(rp, alphas)
+
+
+def _backtest(rp, alpha, window):
+    from risk_engine.run_backtest import backtest_report
+    return backtest_report(rp, alpha, window)
+
+
+def _rolling_es(rp, alpha, window):
+    from risk_engine.run_rolling_es import rolling_var_es
+    return rolling_var_es(rp, alpha, window)
+
+
+def _es_attribution(asset_rets, weights, alpha, window):
+    from risk_engine.attribution.es_attribution import (
+        es_attribution_historical,
+        rolling_es_attribution_historical,
+    )
+    from risk_engine.run_es_attribution import attribution_table
+
+    res = es_attribution_historical(asset_rets, weights, alpha=alpha)
+    return {
+        "static": attribution_table(weights, res),
+        "rolling": rolling_es_attribution_historical(asset_rets, weights, alpha=alpha, window=window),
+    }
+
+
+def _stress_replay(asset_rets, weights, alpha, stress_start, stress_end):
+    from risk_engine.run_stress_replay import stress_replay
+    return stress_replay(asset_rets, weights, alpha, stress_start, stress_end)
+
+
+def _stress_assets(asset_rets, stress_start, stress_end):
+    stress_assets = asset_rets.loc[stress_start:stress_end].dropna()
+    if stress_assets.empty:
+        raise ValueError("No data in stress window. Check dates or returns.csv range.")
+    return stress_assets
+
+
+def _mc_paths(stress_assets, n_sims, horizon, seed, df_t, n_factors, copula_marginals):
+    from risk_engine.run_mc_stress import simulate_stress_models
+    return simulate_stress_models(
+        stress_assets, n_sims, horizon, seed, df_t=df_t, n_factors=n_factors, copula_marginals=copula_marginals,
+    )
+
+
+def _mc_stress(paths, weights, alpha):
+    from risk_engine.run_mc_stress import mc_stress_summary
+    summary, sketches = mc_stress_summary(paths, weights.values, alpha)
+    return {"summary": summary, "sketches": sketches}
+
+
+def _mc_es_attribution(paths, weights, alpha):
+    from risk_engine.run_mc_es_attribution import mc_es_attribution_table
+    out, _ = mc_es_attribution_table(paths, weights.values, alpha, list(weights.index))
+    return out
+
+
+# -----------------------
+# Output writers (same files as the run_* scripts)
+# -----------------------
+def _write_var_report(report, out_dir):
+    report.to_csv(out_dir / "var_es_report.csv")
+
+
+def _write_portfolio_returns(rp, out_dir):
+    rp.to_csv(out_dir / "portfolio_returns.csv")
+
+
+def _write_rolling_es(out, out_dir):
+    out.to_csv(out_dir / "rolling_var_es.csv")
+
+
+def _write_backtest(table, out_dir):
+    table.to_csv(out_dir / "backtest_report.csv")
+
+
+def _write_es_attribution(res, out_dir):
+    res["static"].to_csv(out_dir / "es_attribution_static.csv")
+    res["rolling"].to_csv(out_dir / "es_attribution_rolling.csv")
+
+
+def _write_stress_replay(res, out_dir):
+    res["summary"].to_csv(out_dir / "stress_replay_summary.csv")
+    res["attribution_table"].to_csv(out_dir / "stress_replay_attribution.csv")
+    res["equity"].to_csv(out_dir / "stress_replay_equity_curve.csv", header=["equity"])
+    res["stress_returns"].to_csv(out_dir / "stress_replay_portfolio_returns.csv", header=["portfolio_return"])
+
+
+def _write_mc_stress(res, out_dir):
+    res["summary"].to_csv(out_dir / "mc_stress_summary.csv", index=False)
+    from risk_engine.sim.sketch import save_sketches
+    save_sketches(res["sketches"], out_dir / "mc_stress_sketches.npz")
+
+
+def _write_mc_es_attribution(out, out_dir):
+    out.to_csv(out_dir / "mc_stress_es_attribution.csv", index=False)
+
+
+# name -> deps, config params, function, whether to persist to the disk cache, output writer
+STAGES = {
+    "asset_returns": {"deps": [], "params": ["returns_path"], "fn": _load_asset_returns},
+    "weights": {"deps": ["asset_returns"], "params": [], "fn": _equal_weights},
+    "portfolio_returns": {
+        "deps": ["asset_returns", "weights"], "params": [], "fn": _portfolio_returns,
+        "write": _write_portfolio_returns,
+    },
+    "var_report": {
+        "deps": ["portfolio_returns"], "params": ["alphas"], "fn": _var_report,
+        "write": _write_var_report,
+    },
+    "backtest": {
+        "deps": ["portfolio_returns"], "params": ["alpha", "window"], "fn": _backtest,
+        "write": _write_backtest,
+    },
+    "rolling_es": {
+        "deps": ["portfolio_returns"], "params": ["alpha", "window"], "fn": _rolling_es,
+        "write": _write_rolling_es,
+    },
+    "es_attribution": {
+        "deps": ["asset_returns", "weights"], "params": ["alpha", "window"], "fn": _es_attribution,
+        "write": _write_es_attribution,
+    },
+    "stress_replay": {
+        "deps": ["asset_returns", "weights"], "params": ["alpha", "stress_start", "stress_end"],
+        "fn": _stress_replay, "write": _write_stress_replay,
+    },
+    "stress_assets": {"deps": ["asset_returns"], "params": ["stress_start", "stress_end"], "fn": _stress_assets},
+    # Simulated paths are large and cheap to regenerate from the seed: keep in memory only
+    "mc_paths": {
+        "deps": ["stress_assets"], "params": ["n_sims", "horizon", "seed", "df_t", "n_factors", "copula_marginals"],
+        "fn": _mc_paths, "cache": False,
+    },
+    "mc_stress": {
+        "deps": ["mc_paths", "weights"], "params": ["alpha"], "fn": _mc_stress,
+        "write": _write_mc_stress,
+    },
+    "mc_es_attribution": {
+        "deps": ["mc_paths", "weights"], "params": ["alpha"], "fn": _mc_es_attribution,
+        "write": _write_mc_es_attribution,
+    },
+}
+
+# Stages with outputs, i.e. what `run_pipeline` builds by default
+TARGETS = [name for name, spec in STAGES.items() if "write" in spec]
+
+
+def output_tables(values: dict) -> dict:
+    """
+    The built outputs among {stage: value} as {table: DataFrame}, named like
+    the CSVs the writers produce (what history.record_run stores).
+    """
+    out = {}
+    if "var_report" in values:
+        out["var_es_report"] = values["var_report"]
+    if "portfolio_returns" in values:
+        out["portfolio_returns"] = values["portfolio_returns"].to_frame()
+    if "backtest" in values:
+        out["backtest_report"] = values["backtest"]
+    if "rolling_es" in values:
+        out["rolling_var_es"] = values["rolling_es"]
+    if "es_attribution" in values:
+        out["es_attribution_static"] = values["es_attribution"]["static"]
+        out["es_attribution_rolling"] = values["es_attribution"]["rolling"]
+    if "stress_replay" in values:
+        out["stress_replay_summary"] = values["stress_replay"]["summary"]
+        out["stress_replay_attribution"] = values["stress_replay"]["attribution_table"]
+        out["stress_replay_equity_curve"] = values["stress_replay"]["equity"].rename("equity").to_frame()
+    if "mc_stress" in values:
+        out["mc_stress_summary"] = values["mc_stress"]["summary"]
+    if "mc_es_attribution" in values:
+        out["mc_stress_es_attribution"] = values["mc_es_attribution"]
+    return out
+
+
+# -----------------------
+# Hashing
+# -----------------------
+def _file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _code_fingerprint() -> str:
+    """Hash of the package sources, so editing any model invalidates the cache."""
+    h = hashlib.sha256()
+    root = Path(__file__).resolve().parent
+    for path in sorted(root.rglob("*.py")):
+        h.update(str(path.relative_to(root)).encode())
+        h.update(path.read_bytes())
+    return h.hexdigest()
+
+
+def stage_keys(config: dict, stages: list[str]) -> dict:
+    """
+    Content key per stage: hash of the stage name, its parameters and its
+    dependencies' keys (Merkle-style). The raw input file enters through its
+    content hash, so intermediates never need to be hashed themselves.
+    """
+    code = _code_fingerprint()
+    keys = {}
+
+    def key(name):
+        if name in keys:
+            return keys[name]
+        spec = STAGES[name]
+        params = {p: config[p] for p in spec["params"]}
+        if name == "asset_returns":
+            params["file_sha256"] = _file_hash(config["returns_path"])
+        payload = json.dumps(
+            {"stage": name, "code": code, "params": params, "deps": [key(d) for d in spec["deps"]]},
+            sort_keys=True,
+            default=str,
+        )
+        keys[name] = hashlib.sha256(payload.encode()).hexdigest()
+        return keys[name]
+
+    for name in stages:
+        key(name)
+    return keys
+
+
+# -----------------------
+# Execution
+# -----------------------
+def _closure(targets: list[str]) -> list[str]:
+    """Targets plus all their dependencies, in dependency order."""
+    order, seen = [], set()
+
+    def visit(name):
+        if name in seen:
+            return
+        if name not in STAGES:
+            raise ValueError(f"Unknown stage: {name}. Known: {list(STAGES)}")
+        seen.add(name)
+        for d in STAGES[name]["deps"]:
+            visit(d)
+        order.append(name)
+
+    for t in targets:
+        visit(t)
+    return order
+
+
+def _cache_path(cache_dir: Path, name: str, key: str) -> Path:
+    return cache_dir / f"{name}-{key[:20]}.pkl"
+
+
+def _run_stage(name: str, dep_values: list, params: dict):
+    with stage(name):
+        return STAGES[name]["fn"](*dep_values, **params)
+
+
+def run_pipeline(
+    targets: list[str] | None = None,
+    config: dict | None = None,
+    cache_dir: str | None = ".risk_cache",
+    out_dir: str | None = ".",
+    workers: int = 4,
+    processes: bool = False,
+    verbose: bool = True,
+) -> dict:
+    """
+    Build the requested stages (default: every stage with outputs).
+
+    Each intermediate is computed at most once and passed along in memory.
+    With a cache_dir, results are stored on disk under their content key and a
+    stage only reruns when its inputs, parameters or the package code changed;
+    the dependencies of a cache hit are not even loaded. Independent branches
+    (e.g. MC vs rolling vs replay) run concurrently on `workers` threads, or
+    processes with processes=True (useful for the GIL-bound t-fit loops).
+
+    Returns {"values": {stage: value}, "ran": [...], "cached": [...]}.
+    """
+    cfg = dict(DEFAULT_CONFIG)
+    cfg.update(config or {})
+    targets = list(targets or TARGETS)
+
+    order = _closure(targets)
+    keys = stage_keys(cfg, order)
+
+    cache = Path(cache_dir) if cache_dir else None
+    if cache is not None:
+        cache.mkdir(parents=True, exist_ok=True)
+
+    def cached(name):
+        return (
+            cache is not None
+            and STAGES[name].get("cache", True)
+            and _cache_path(cache, name, keys[name]).exists()
+        )
+
+    # Walk down from the targets: a cache hit cuts off its whole upstream
+    to_run, to_load = [], set()
+
+    def plan(name):
+        if name in to_run or name in to_load:
+            return
+        if cached(name):
+            to_load.add(name)
+            return
+        for d in STAGES[name]["deps"]:
+            plan(d)
+        to_run.append(name)
+
+    for t in targets:
+        plan(t)
+
+    values = {}
+    for name in to_load:
+        with open(_cache_path(cache, name, keys[name]), "rb") as f:
+            values[name] = pickle.load(f)
+
+    pool_cls = ProcessPoolExecutor if processes else ThreadPoolExecutor
+    pending = {}
+    remaining = [n for n in order if n in to_run]
+
+    with pool_cls(max_workers=max(1, workers)) as pool:
+        while remaining or pending:
+            for name in list(remaining):
+                deps = STAGES[name]["deps"]
+                if all(d in values for d in deps):
+                    params = {p: cfg[p] for p in STAGES[name]["params"]}
+                    fut = pool.submit(_run_stage, name, [values[d] for d in deps], params)
+                    pending[fut] = name
+                    remaining.remove(name)
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                name = pending.pop(fut)
+                values[name] = fut.result()
+                if verbose:
+                    print(f"  ran     {name}")
+                if cache is not None and STAGES[name].get("cache", True):
+                    path = _cache_path(cache, name, keys[name])
+                    tmp = path.with_suffix(".tmp")
+                    with open(tmp, "wb") as f:
+                        pickle.dump(values[name], f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp, path)
+
+    if verbose:
+        for name in sorted(to_load):
+            print(f"  cached  {name}")
+
+    if out_dir is not None:
+        out = Path(out_dir)
+        out.mkdir(parents=True, exist_ok=True)
+        for name in targets:
+            writer = STAGES[name].get("write")
+            if writer is not None:
+                writer(values[name], out)
+
+    return {
+        "values": {t: values[t] for t in targets},
+        "ran": [n for n in order if n in to_run],
+        "cached": sorted(to_load),
+    }
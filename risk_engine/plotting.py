@@ -0,0 +1,157 @@
+import hashlib
+import inspect
+import json
+import os
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# Binary copies of the CSV outputs and the render manifest live here
+CACHE_DIR = Path(os.environ.get("RISK_ENGINE_PLOT_CACHE", ".risk_cache/plots"))
+
+# Points kept per series: ~ the pixel width of a 12 in figure at 200 dpi
+MAX_POINTS = 2400
+
+
+# -----------------------
+# Decimation
+# -----------------------
+def lttb_indices(y: np.ndarray, n_out: int, x: np.ndarray | None = None) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: indices of n_out points of (x, y) that
+    keep its visual shape (peaks, troughs, jumps). First and last points are
+    always kept; each bucket in between keeps the point forming the largest
+    triangle with the previous pick and the next bucket's mean. One
+    vectorized step per bucket. y must be free of NaN.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)        # n_out - 2 buckets, then the last point
+    nxt = np.r_[edges[2:], n]                                    # end of the bucket after bucket b
+    cx, cy = np.r_[0.0, np.cumsum(x)], np.r_[0.0, np.cumsum(y)]
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for b in range(n_out - 2):
+        lo, hi, end = edges[b], edges[b + 1], nxt[b]
+        mx = (cx[end] - cx[hi]) / (end - hi)
+        my = (cy[end] - cy[hi]) / (end - hi)
+        area = np.abs((x[a] - mx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (my - y[a]))
+        a = lo + int(np.argmax(area))
+        out[b + 1] = a
+    return out
+
+
+def decimate(data, max_points: int = MAX_POINTS):
+    """
+    Rows of a Series / DataFrame to plot: the union of every column's LTTB
+    picks, so all columns keep their shape and share one x axis (stackplot,
+    fill_between). Shorter data is returned as is.
+    """
+    if len(data) <= max_points:
+        return data
+    frame = data.to_frame() if isinstance(data, pd.Series) else data
+    idx = frame.index
+    x = idx.asi8.astype(float) if isinstance(idx, pd.DatetimeIndex) else np.arange(len(idx), dtype=float)
+    keep = set()
+    for col in frame.columns:
+        y = frame[col].astype(float).ffill().bfill().fillna(0.0).to_numpy()
+        keep.update(lttb_indices(y, max_points, x).tolist())
+    return data.iloc[np.sort(np.fromiter(keep, dtype=int))]
+
+
+# -----------------------
+# Inputs
+# -----------------------
+def load_frame(path, **read_csv_kwargs) -> pd.DataFrame:
+    """
+    pd.read_csv(path, **read_csv_kwargs) through a binary (pickle) copy under
+    CACHE_DIR, keyed by the file's path, size and modification time: a CSV
+    is parsed once per change, later reads load the binary copy.
+    """
+    path = Path(path)
+    st = path.stat()
+    tag = hashlib.sha256(str(path.resolve()).encode()).hexdigest()[:12]
+    stamp = hashlib.sha256(
+        f"{st.st_size}:{st.st_mtime_ns}:{sorted(read_csv_kwargs.items())!r}".encode()
+    ).hexdigest()[:12]
+    cached = CACHE_DIR / f"{path.stem}-{tag}-{stamp}.pkl"
+    if cached.exists():
+        return pd.read_pickle(cached)
+
+    df = pd.read_csv(path, **read_csv_kwargs)
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    for stale in CACHE_DIR.glob(f"{path.stem}-{tag}-*.pkl"):
+        stale.unlink()
+    df.to_pickle(cached)
+    return df
+
+
+# -----------------------
+# Render cache
+# -----------------------
+def _manifest_path() -> Path:
+    return CACHE_DIR / "renders.json"
+
+
+def _load_manifest() -> dict:
+    try:
+        return json.loads(_manifest_path().read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {"files": {}, "renders": {}}
+
+
+def _content_hash(path: Path, manifest: dict) -> str:
+    """sha256 of a file, reused from the manifest while its size and mtime are unchanged."""
+    if not path.exists():
+        return "missing"
+    st = path.stat()
+    key = str(path.resolve())
+    seen = manifest["files"].get(key)
+    if seen and seen[0] == st.st_size and seen[1] == st.st_mtime_ns:
+        return seen[2]
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    manifest["files"][key] = [st.st_size, st.st_mtime_ns, h.hexdigest()]
+    return h.hexdigest()
+
+
+def render(name: str, inputs: list, draw, params: dict | None = None, out_dir="docs", force: bool = False):
+    """
+    Save draw()'s figure as <out_dir>/<name>.png unless nothing it depends on
+    has changed: the content of every input file (missing ones count as
+    "missing"), params, and the source of draw's module. Returns the new
+    Figure, or None when the saved PNG is already up to date.
+    """
+    manifest = _load_manifest()
+    h = hashlib.sha256(name.encode())
+    h.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    h.update(inspect.getsource(inspect.getmodule(draw)).encode())
+    for p in inputs:
+        h.update(_content_hash(Path(p), manifest).encode())
+    key = h.hexdigest()
+
+    png = Path(out_dir) / f"{name}.png"
+    if not force and png.exists() and manifest["renders"].get(name) == key:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        _manifest_path().write_text(json.dumps(manifest))
+        print(f"Up to date: {png}")
+        return None
+
+    fig = draw(**(params or {}))
+    png.parent.mkdir(parents=True, exist_ok=True)
+    fig.savefig(png, dpi=200, bbox_inches="tight")
+    manifest["renders"][name] = key
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    _manifest_path().write_text(json.dumps(manifest))
+    print(f"Saved: {png}")
+    return fig
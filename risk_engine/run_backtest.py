@@ -1,34 +1,44 @@
 import numpy as np
 import pandas as pd
-
-from risk_engine.models.var_es import var_gaussian
+from scipy.stats import norm, t
+
+from risk_engine.history import record_run
+from risk_engine.instrumentation import instrumented, stage, finish_profile
+from risk_engine.kernels import rolling_mean_std, rolling_quantile_tail
+from risk_engine.models.var_es import var_gaussian, var_historical, fit_student_t
+from risk_engine.models.fhs import rolling_metrics_fhs
+from risk_engine.parallel import parallel_rolling
 from risk_engine.validation.backtesting import kupiec_test, christoffersen_test
-from scipy.stats import t
 
-def rolling_var(returns: pd.Series, alpha: float, window: int=250):
+def _rolling_var_loop(returns: pd.Series, alpha: float, window: int, var_fn):
+    """Window-by-window loop; used for series with missing values (each window drops its own)."""
     var_vals = []
     dates = []
 
     for t in range(window, len(returns)):
         window_returns = returns.iloc[t - window:t]
-        var_t = var_gaussian(window_returns, alpha)
-        var_vals.append(var_t)
+        var_vals.append(var_fn(window_returns, alpha))
         dates.append(returns.index[t])
 
     return pd.Series(var_vals, index=dates)
 
-def rolling_var_historical(returns: pd.Series, alpha: float, window: int = 250):
-    var_vals = []
-    dates = []
-
-    for t in range(window, len(returns)):
-        window_returns = returns.iloc[t - window:t]
-        q = np.quantile(window_returns.dropna().values, 1 - alpha)  # left tail
-        var_vals.append(float(-q))  # positive loss number
-        dates.append(returns.index[t])
+@instrumented()
+def rolling_var(returns: pd.Series, alpha: float, window: int=250):
+    x = returns.to_numpy(dtype=float)
+    if np.isnan(x).any():
+        return _rolling_var_loop(returns, alpha, window, var_gaussian)
+    mu, sigma = rolling_mean_std(x, window)
+    return pd.Series(-norm.ppf(1 - alpha, loc=mu, scale=sigma), index=returns.index[window:].rename(None))
 
-    return pd.Series(var_vals, index=dates)
+@instrumented()
+def rolling_var_historical(returns: pd.Series, alpha: float, window: int = 250):
+    x = returns.to_numpy(dtype=float)
+    if np.isnan(x).any():
+        return _rolling_var_loop(returns, alpha, window, var_historical)
+    var, _ = rolling_quantile_tail(x, window, alpha)   # positive loss number
+    return pd.Series(var, index=returns.index[window:].rename(None))
 
+@instrumented()
 def rolling_var_student_t(returns: pd.Series, alpha: float, window: int = 60):
     """
     Rolling student-t parametric VaR.
@@ -48,7 +58,7 @@ def rolling_var_student_t(returns: pd.Series, alpha: float, window: int = 60):
         # This can occasionally fail or produce weird params for small windows,
         # so we do basic safeguards
         try:
-            df, loc, scale = t.fit(w) #MLE fit
+            df, loc, scale = fit_student_t(w) #MLE fit
 
             #Safeguards:
             if df <= 2 or scale <= 0 or not np.isfinite([df, loc, scale]).all():
@@ -67,34 +77,70 @@ def rolling_var_student_t(returns: pd.Series, alpha: float, window: int = 60):
     return pd.Series(var_vals, index=dates, name=f"VaR_t_{alpha}")
 
 
+def backtest_report(returns: pd.Series, alpha: float, window: int, workers: int = 1) -> pd.DataFrame:
+    """
+    Rolling Gaussian / historical / Student-t VaR and EWMA / GARCH filtered
+    historical simulation (first forecast after the same `window` days), each
+    backtested with the Kupiec and Christoffersen tests. One row per model.
+    workers > 1 spreads the windowed models over a shared-memory process pool.
+    """
+    var_g = parallel_rolling(rolling_var, returns, window, alpha, workers=workers)
+    var_h = parallel_rolling(rolling_var_historical, returns, window, alpha, workers=workers)
+    var_t = parallel_rolling(rolling_var_student_t, returns, window, alpha, workers=workers)
+    var_fe = rolling_metrics_fhs(returns, alpha, burn_in=window, model="ewma")["VaR"]
+    var_fg = rolling_metrics_fhs(returns, alpha, burn_in=window, model="garch")["VaR"]
+
+    rows = []
+    models = [
+        ("Gaussian", var_g), ("Historical", var_h), ("Student-t", var_t),
+        ("FHS-EWMA", var_fe), ("FHS-GARCH", var_fg),
+    ]
+    for label, var_series in models:
+        aligned_r, aligned_v = returns.align(var_series, join="inner")
+        breaches = aligned_r < -aligned_v
+
+        kupiec_lr, kupiec_p = kupiec_test(returns, var_series, alpha)
+        christ_lr, christ_p = christoffersen_test(returns, var_series)
+
+        rows.append({
+            "model": label,
+            "aligned_obs": len(aligned_r),
+            "breaches": int(breaches.sum()),
+            "expected": (1 - alpha) * len(aligned_r),
+            "kupiec_LR": kupiec_lr,
+            "kupiec_p": kupiec_p,
+            "christoffersen_LR": christ_lr,
+            "christoffersen_p": christ_p,
+        })
+
+    return pd.DataFrame(rows).set_index("model")
+
 
 def main():
-    returns = pd.read_csv(
-        "portfolio_returns.csv",
-        parse_dates=["Date"],
-        index_col="Date"
-    )["portfolio_return"]
+    with stage("load_csv"):
+        returns = pd.read_csv(
+            "portfolio_returns.csv",
+            parse_dates=["Date"],
+            index_col="Date"
+        )["portfolio_return"]
 
     alpha = 0.95
     window = 60  # IMPORTANT: you only have ~104 obs, so 250 won't work well
+    workers = 1  # >1: run the rolling loops on a shared-memory process pool
 
-    var_g = rolling_var(returns, alpha, window=window)
-    var_h = rolling_var_historical(returns, alpha, window=window)
-    var_t = rolling_var_student_t(returns, alpha, window=window)
-
-    for label, var_series in [("Gaussian", var_g), ("Historical", var_h), ("Student-t", var_t)]:
-        aligned_r, aligned_v = returns.align(var_series, join="inner")
-        breaches = aligned_r < -aligned_v
+    table = backtest_report(returns, alpha, window, workers=workers)
 
+    for label, row in table.iterrows():
         print(f"\n=== VaR Backtesting ({label}, alpha={alpha}, window={window}) ===")
-        print("Aligned obs:", len(aligned_r))
-        print("Breaches:", int(breaches.sum()), "Expected:", (1-alpha)*len(aligned_r))
+        print("Aligned obs:", int(row["aligned_obs"]))
+        print("Breaches:", int(row["breaches"]), "Expected:", row["expected"])
+        print(f"Kupiec LR: {row['kupiec_LR']}, p-value: {row['kupiec_p']}")
+        print(f"Christoffersen LR: {row['christoffersen_LR']}, p-value: {row['christoffersen_p']}")
 
-        kupiec_lr, kupiec_p = kupiec_test(returns, var_series, alpha)
-        christ_lr, christ_p = christoffersen_test(returns, var_series)
+    record_run("run_backtest", {"backtest_report": table},
+               params={"alpha": alpha, "window": window}, inputs=("portfolio_returns.csv",))
 
-        print(f"Kupiec LR: {kupiec_lr}, p-value: {kupiec_p}")
-        print(f"Christoffersen LR: {christ_lr}, p-value: {christ_p}")
+    finish_profile("run_backtest")
 
 
 if __name__ == "__main__":
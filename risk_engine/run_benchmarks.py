@@ -0,0 +1,100 @@
+import argparse
+import sys
+
+import pandas as pd
+
+from risk_engine.benchmarks.suite import (
+    DEFAULT_PARAMS,
+    run_suite,
+    save_results,
+    load_results,
+    compare_results,
+    uncovered_functions,
+    cli_startup,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the risk engine hot paths on synthetic data.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_p = sub.add_parser("run", help="time every benchmark case and save results as JSON")
+    run_p.add_argument("--out", default="bench_results.json")
+    run_p.add_argument("--repeat", type=int, default=5)
+    run_p.add_argument("--only", default=None, help="substring filter on case names")
+    for key, val in DEFAULT_PARAMS.items():
+        run_p.add_argument(f"--{key}", type=type(val), default=val)
+
+    cmp_p = sub.add_parser("compare", help="flag regressions between two result files")
+    cmp_p.add_argument("base")
+    cmp_p.add_argument("new")
+    cmp_p.add_argument("--threshold", type=float, default=0.10)
+    cmp_p.add_argument("--min-ms", type=float, default=1.0, help="ignore time changes smaller than this")
+    cmp_p.add_argument("--min-mib", type=float, default=1.0, help="ignore memory changes smaller than this")
+
+    start_p = sub.add_parser("startup", help="check `python -m risk_engine --help` against a time budget")
+    start_p.add_argument("--budget", type=float, default=0.25, help="seconds (best of --repeat)")
+    start_p.add_argument("--repeat", type=int, default=5)
+
+    kern_p = sub.add_parser("kernels", help="check the Numba kernels give the same results as the NumPy ones")
+    kern_p.add_argument("--T", type=int, default=DEFAULT_PARAMS["T"])
+    kern_p.add_argument("--window", type=int, default=DEFAULT_PARAMS["window"])
+
+    args = parser.parse_args(argv)
+
+    if args.command == "kernels":
+        from risk_engine import kernels
+        if kernels.numba is None:
+            print("numba is not installed: only the NumPy kernels are in use, nothing to compare.")
+            return 0
+        checks = kernels.compare_backends(T=args.T, window=args.window)
+        for name, same in checks.items():
+            print(f"{name:<28} {'identical' if same else 'MISMATCH'}")
+        return 0 if all(checks.values()) else 1
+
+    if args.command == "startup":
+        res = cli_startup(repeat=args.repeat)
+        print(f"CLI --help startup: best {res['min_s'] * 1e3:.1f} ms, median {res['median_s'] * 1e3:.1f} ms "
+              f"(budget {args.budget * 1e3:.0f} ms)")
+        if res["heavy_imports"]:
+            print(f"FAIL: heavy modules imported at CLI import time: {', '.join(res['heavy_imports'])}")
+            return 1
+        if res["min_s"] > args.budget:
+            print("FAIL: over budget")
+            return 1
+        print("OK")
+        return 0
+
+    if args.command == "run":
+        missing = uncovered_functions()
+        if missing:
+            print("WARNING: public functions without a benchmark case:")
+            for name in missing:
+                print(f"  {name}")
+
+        params = {key: getattr(args, key) for key in DEFAULT_PARAMS}
+        print(f"\n=== Benchmarks ({', '.join(f'{k}={v}' for k, v in params.items())}) ===")
+        results = run_suite(params, repeat=args.repeat, only=args.only)
+        save_results(results, args.out)
+        print(f"\nSaved: {args.out}")
+        return 0
+
+    base, new = load_results(args.base), load_results(args.new)
+    if base["meta"]["params"] != new["meta"]["params"]:
+        print("WARNING: result files were produced with different parameters; ratios are not like-for-like.")
+
+    table = compare_results(base, new, threshold=args.threshold, min_ms=args.min_ms, min_mib=args.min_mib)
+    if table.empty:
+        print("No common cases to compare.")
+        return 0
+
+    with pd.option_context("display.max_rows", None, "display.max_columns", None, "display.width", 160):
+        print(table.round(3))
+
+    regressions = table.index[table["flag"] == "REGRESSION"].tolist()
+    print(f"\n{len(regressions)} regression(s) at threshold {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,28 @@ from risk_engine.attribution.es_attribution import (
     es_attribution_historical,
     rolling_es_attribution_historical,
 )
+from risk_engine.attribution.kernel_es import rolling_kernel_es_attribution
+from risk_engine.attribution.parametric import parametric_attribution_table
+from risk_engine.history import record_run
+from risk_engine.instrumentation import stage, finish_profile
+from risk_engine.models.bootstrap_ci import es_attribution_ci
+from risk_engine.parallel import parallel_rolling
+
+
+def attribution_table(weights: pd.Series, res: dict) -> pd.DataFrame:
+    """Per-asset weight / marginal ES / component ES table from an attribution result."""
+    return pd.DataFrame({
+        "weight": weights,
+        "marginal_ES": res["marginal_ES"],
+        "component_ES": res["component_ES"],
+    })
 
 
 def main():
     # Use your existing returns matrix (asset returns, not portfolio returns)
     # If your file is returns.csv with Date column, we read it like this:
-    asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
+    with stage("load_csv"):
+        asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
     asset_rets.index.name = "Date"
 
     # Equal weights for now (same as before)
@@ -18,6 +34,10 @@ def main():
 
     alpha = 0.95
     window = 60
+    workers = 1   # >1: run the rolling loop on a shared-memory process pool
+    n_boot = 2000  # bootstrap resamples for the static confidence intervals
+    df_t = 6.0     # Student-t df for the parametric attribution
+    kernel_method = "tail"   # smoothed rolling attribution: "kernel" or "tail" (tail-weighted fit)
 
     # --- Static attribution (whole sample) ---
     res = es_attribution_historical(asset_rets, weights, alpha=alpha)
@@ -31,22 +51,52 @@ def main():
     print("\nSum component ES:", round(float(comp.sum()), 6))
 
     # Save static table
-    static = pd.DataFrame({
-        "weight": weights,
-        "marginal_ES": res["marginal_ES"],
-        "component_ES": res["component_ES"],
-    })
+    static = attribution_table(weights, res)
     static.to_csv("es_attribution_static.csv")
 
+    # Closed-form Gaussian / Student-t attribution on the same sample
+    parametric = pd.concat({
+        "Gaussian": parametric_attribution_table(asset_rets, weights, alpha),
+        f"StudentT_df{df_t:g}": parametric_attribution_table(asset_rets, weights, alpha, df=df_t),
+    }, names=["model"])
+    parametric.to_csv("es_attribution_parametric.csv")
+    print("\nComponent ES: historical vs parametric")
+    print(pd.concat({"Historical": res["component_ES"],
+                     **{m: parametric.loc[m, "component_ES"] for m in parametric.index.unique("model")}},
+                    axis=1).round(6))
+
+    # Bootstrap / jackknife uncertainty of the static numbers
+    ci = es_attribution_ci(asset_rets, weights, alpha=alpha, n_boot=n_boot)
+    ci.to_csv("es_attribution_ci.csv")
+    print(f"\n90% confidence intervals ({n_boot} bootstrap resamples, jackknife SE):")
+    print(ci[["estimate", "boot_lo", "boot_hi", "jack_se"]].round(6))
+
     # --- Rolling attribution ---
-    roll = rolling_es_attribution_historical(asset_rets, weights, alpha=alpha, window=window)
+    roll = parallel_rolling(
+        rolling_es_attribution_historical, asset_rets, window, weights, alpha=alpha, workers=workers
+    )
     roll.to_csv("es_attribution_rolling.csv")
+    roll_kernel = rolling_kernel_es_attribution(asset_rets, weights, alpha, window, method=kernel_method)
+    roll_kernel.to_csv("es_attribution_rolling_kernel.csv")
 
     print("\nSaved: es_attribution_static.csv")
+    print("Saved: es_attribution_parametric.csv")
+    print("Saved: es_attribution_ci.csv")
     print("Saved: es_attribution_rolling.csv")
+    print("Saved: es_attribution_rolling_kernel.csv")
     print("\nLast rows of rolling attribution:")
     print(roll.tail())
 
+    record_run("run_es_attribution", {
+        "es_attribution_static": static,
+        "es_attribution_parametric": parametric,
+        "es_attribution_ci": ci,
+        "es_attribution_rolling": roll,
+        "es_attribution_rolling_kernel": roll_kernel,
+    }, params={"alpha": alpha, "window": window, "n_boot": n_boot, "df_t": df_t, "kernel_method": kernel_method})
+
+    finish_profile("run_es_attribution")
+
 
 if __name__ == "__main__":
     main()
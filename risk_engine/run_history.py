@@ -0,0 +1,67 @@
+import argparse
+import json
+import sys
+
+import pandas as pd
+
+from risk_engine.history import HISTORY_DIR, compact, list_runs, load_history
+
+
+def _where(items) -> dict:
+    """["alpha=0.95", "stress_start=2025-04-01"] -> {"alpha": 0.95, "stress_start": "2025-04-01"}"""
+    out = {}
+    for item in items or []:
+        key, _, raw = item.partition("=")
+        try:
+            out[key] = json.loads(raw)
+        except json.JSONDecodeError:
+            out[key] = raw
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=f"Query the run-history store ({HISTORY_DIR}).")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    runs_p = sub.add_parser("runs", help="list recorded runs")
+    show_p = sub.add_parser("show", help="one output table across runs")
+    show_p.add_argument("table", help="output name, e.g. var_es_report, mc_stress_summary")
+    show_p.add_argument("--columns", default=None, help="comma-separated columns to read (default: all)")
+    show_p.add_argument("--out", default=None, help="write the result to this CSV instead of printing")
+    for p in (runs_p, show_p):
+        p.add_argument("--runner", default=None)
+        p.add_argument("--since", default=None, help="UTC date / time")
+        p.add_argument("--until", default=None, help="UTC date / time")
+        p.add_argument("--where", nargs="*", default=None, help="param=value filters, e.g. alpha=0.99")
+        p.add_argument("--last", type=int, default=None, help="only the last N matching runs")
+    comp_p = sub.add_parser("compact", help="fold each month into one part file (safe while runners write)")
+    comp_p.add_argument("--table", default=None)
+
+    args = parser.parse_args(argv)
+
+    if args.command == "compact":
+        print(f"Merged {compact(args.table)} files")
+        return 0
+
+    runs = list_runs(runner=args.runner, since=args.since, until=args.until, params=_where(args.where),
+                     table=getattr(args, "table", None))
+    if args.last is not None:
+        runs = runs.tail(args.last)
+
+    with pd.option_context("display.max_rows", 200, "display.max_columns", None, "display.width", 160):
+        if args.command == "runs":
+            print(runs[["run_id", "timestamp", "runner", "params"]].to_string(index=False))
+            return 0
+
+        columns = args.columns.split(",") if args.columns else None
+        out = load_history(args.table, columns=columns, runs=list(runs["run_id"]))
+        if args.out:
+            out.to_csv(args.out, index=False)
+            print(f"Saved: {args.out} ({len(out)} rows from {out['run_id'].nunique()} runs)")
+        else:
+            print(out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
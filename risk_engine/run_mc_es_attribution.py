@@ -1,14 +1,16 @@
 import numpy as np
 import pandas as pd
 
-from risk_engine.sim.monte_carlo import (
-    simulate_gaussian_mc,
-    simulate_student_t_mc,
-    simulate_bootstrap_mc,
-    var_es_from_losses,
-)
+from risk_engine.attribution.kernel_es import mc_kernel_es_attribution
+from risk_engine.attribution.parametric import parametric_es_attribution
+from risk_engine.history import record_run
+from risk_engine.instrumentation import instrumented, stage, finish_profile
+from risk_engine.run_mc_stress import simulate_stress_models
+from risk_engine.sim.monte_carlo import var_es_from_losses
+from risk_engine.sim.reduction import reduce_scenarios, reduction_error, save_reduced_scenarios
 
 
+@instrumented()
 def mc_es_attribution(asset_paths: np.ndarray, weights: np.ndarray, alpha: float, asset_names: list[str]):
     """
     asset_paths: (n_sims, horizon, n_assets) simulated daily asset returns
@@ -42,6 +44,38 @@ def mc_es_attribution(asset_paths: np.ndarray, weights: np.ndarray, alpha: float
     return var, es, comp_es, share
 
 
+def mc_es_attribution_table(
+    paths: list[tuple[str, np.ndarray]],
+    w: np.ndarray,
+    alpha: float,
+    asset_names: list[str],
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run mc_es_attribution for each simulated model.
+    Returns (tidy per-asset rows, headline VaR/ES per model).
+    """
+    results = []
+    headline = []
+
+    for model_name, sim in paths:
+        var, es, comp_es, share = mc_es_attribution(sim, w, alpha, asset_names)
+        headline.append({"model": model_name, "VaR": var, "ES": es})
+
+        # Save tidy rows
+        for a in asset_names:
+            results.append({
+                "model": model_name,
+                "alpha": alpha,
+                "horizon_days": sim.shape[1],
+                "asset": a,
+                "weight": float(w[asset_names.index(a)]),
+                "component_ES": float(comp_es.get(a, 0.0)),
+                "share_of_ES": float(share.get(a, 0.0)),
+            })
+
+    return pd.DataFrame(results), pd.DataFrame(headline).set_index("model")
+
+
 def main():
     # ---- Settings (match your MC stress run) ----
     alpha = 0.95
@@ -55,8 +89,21 @@ def main():
     # Student-t df (same as before)
     df_t = 6.0
 
+    # Covariance model: None -> full sample covariance (fine for a handful of assets).
+    # Set to k for a k-factor PCA + Ledoit-Wolf model (large universes, short windows).
+    n_factors = None
+
+    # Tail-preserving reduction for downstream work: keep every scenario beyond
+    # keep_alpha, compress the body into n_body weighted representatives
+    keep_alpha = 0.95
+    n_body = 200
+
+    # Smoothed attribution at every horizon 1..h: "kernel" or "tail" (tail-weighted fit)
+    kernel_method = "tail"
+
     # ---- Load stress window returns to calibrate ----
-    asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
+    with stage("load_csv"):
+        asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
     asset_rets.index.name = "Date"
 
     stress_assets = asset_rets.loc[stress_start:stress_end].dropna()
@@ -69,49 +116,69 @@ def main():
     n_assets = stress_assets.shape[1]
     w = np.ones(n_assets) / n_assets
 
-    # Stress-calibrated mean/cov
-    mu = stress_assets.mean(axis=0).values
-    cov = stress_assets.cov().values
-
-    rng = np.random.default_rng(seed)
-
-    # ---- Simulate paths ----
-    paths_g = simulate_gaussian_mc(mu, cov, n_sims=n_sims, horizon=horizon, rng=rng)
-    paths_t = simulate_student_t_mc(mu, cov, df=df_t, n_sims=n_sims, horizon=horizon, rng=rng)
-    paths_b = simulate_bootstrap_mc(stress_assets, n_sims=n_sims, horizon=horizon, rng=rng)
-
-    results = []
+    # ---- Simulate paths (same draws as run_mc_stress) ----
+    paths = simulate_stress_models(stress_assets, n_sims, horizon, seed, df_t=df_t, n_factors=n_factors)
 
-    for model_name, paths in [
-        ("Gaussian_MC", paths_g),
-        (f"StudentT_MC_df{df_t:g}", paths_t),
-        ("Bootstrap_MC", paths_b),
-    ]:
-        var, es, comp_es, share = mc_es_attribution(paths, w, alpha, asset_names)
+    out, headline = mc_es_attribution_table(paths, w, alpha, asset_names)
 
+    for model_name, row in headline.iterrows():
+        comp_es = (
+            out.loc[out["model"] == model_name]
+               .set_index("asset")["component_ES"]
+               .sort_values(ascending=False)
+               .rename_axis(None)
+               .rename(None)
+        )
         print(f"\n=== MC ES Attribution: {model_name} (alpha={alpha}, horizon={horizon}d) ===")
-        print(f"VaR: {var:.6f} | ES: {es:.6f}")
+        print(f"VaR: {row['VaR']:.6f} | ES: {row['ES']:.6f}")
         print("\nTop contributors (component ES):")
         print(comp_es.head(10).round(6))
 
-        # Save tidy rows
-        for a in asset_names:
-            results.append({
-                "model": model_name,
-                "alpha": alpha,
-                "horizon_days": horizon,
-                "asset": a,
-                "weight": float(w[asset_names.index(a)]),
-                "component_ES": float(comp_es.get(a, 0.0)),
-                "share_of_ES": float(share.get(a, 0.0)),
-            })
-
-    out = pd.DataFrame(results)
     out.to_csv("mc_stress_es_attribution.csv", index=False)
 
+    term = pd.concat(
+        {model_name: mc_kernel_es_attribution(sim, w, alpha, asset_names, method=kernel_method)
+         for model_name, sim in paths},
+        names=["model"],
+    )
+    term.to_csv("mc_es_attribution_by_horizon.csv")
+
+    # ---- Closed-form check: Gaussian horizon P&L is N(h * mu, h * cov) exactly ----
+    if n_factors is None:
+        ref = parametric_es_attribution(
+            horizon * stress_assets.mean().values, horizon * stress_assets.cov().values, w, alpha
+        )
+        mc = out.loc[out["model"] == "Gaussian_MC"].set_index("asset")["component_ES"].reindex(asset_names)
+        print(f"\nGaussian_MC vs closed form: ES {headline.loc['Gaussian_MC', 'ES']:.6f} vs {ref['ES']:.6f}, "
+              f"worst component ES gap {np.abs(mc.values - ref['component_ES']).max():.2e}")
+
+    # ---- Reduced scenario sets (horizon P&L, same linear approximation) ----
+    reduced = {}
+    for model_name, sim in paths:
+        scenarios = sim.sum(axis=1)
+        reduced[model_name] = reduce_scenarios(scenarios, w, keep_alpha=keep_alpha, n_body=n_body)
+        err = reduction_error(scenarios, reduced[model_name], w, alphas=[alpha, 0.99])
+        n_red = len(reduced[model_name]["probs"])
+        print(f"\nReduced {model_name}: {n_sims:,} -> {n_red:,} scenarios; worst relative error "
+              f"VaR {err['VaR_rel_err'].max():.1e}, ES {err['ES_rel_err'].max():.1e}, "
+              f"component ES {err['cES_max_err_share'].max():.1e} (of ES)")
+    save_reduced_scenarios(reduced, "mc_reduced_scenarios.npz")
+
     print("\nSaved: mc_stress_es_attribution.csv")
+    print("Saved: mc_es_attribution_by_horizon.csv (smoothed VaR / ES / component ES per horizon)")
+    print("Saved: mc_reduced_scenarios.npz (scenarios / probs / is_tail per model)")
     print("Tip: sort by share_of_ES within each model to see concentration.")
 
+    record_run("run_mc_es_attribution", {
+        "mc_stress_es_attribution": out,
+        "mc_es_attribution_by_horizon": term,
+    }, params={
+        "alpha": alpha, "stress_start": stress_start, "stress_end": stress_end, "horizon": horizon,
+        "n_sims": n_sims, "seed": seed, "df_t": df_t, "n_factors": n_factors, "kernel_method": kernel_method,
+    })
+
+    finish_profile("run_mc_es_attribution")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from risk_engine.history import record_run
+from risk_engine.instrumentation import stage, finish_profile
+from risk_engine.optimization.mean_es import optimize_mean_es
+from risk_engine.run_mc_es_attribution import mc_es_attribution
+from risk_engine.run_mc_stress import simulate_stress_models
+
+
+def main():
+    # ---- Settings (match your MC stress run) ----
+    alpha = 0.95
+    stress_start = "2025-04-01"
+    stress_end = "2025-07-01"
+
+    horizon = 10
+    n_sims = 50_000
+    seed = 42
+    df_t = 6.0
+    n_factors = None
+
+    # Which simulated model to optimize on: 0 Gaussian, 1 Student-t, 2 Bootstrap, 3 t-copula
+    model_index = 1
+
+    # Constraints: long-only, position cap, and at least the equal-weight book's expected return
+    min_weight = 0.0
+    max_weight = 0.40
+    match_equal_weight_return = True
+
+    # ---- Load stress window returns to calibrate ----
+    with stage("load_csv"):
+        asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
+    asset_rets.index.name = "Date"
+
+    stress_assets = asset_rets.loc[stress_start:stress_end].dropna()
+    if stress_assets.empty:
+        raise ValueError("No data in stress window. Check dates or returns.csv range.")
+
+    asset_names = list(stress_assets.columns)
+    n_assets = len(asset_names)
+    w_eq = np.ones(n_assets) / n_assets
+
+    # ---- Simulate, then optimize on the horizon scenarios ----
+    paths = simulate_stress_models(stress_assets, n_sims, horizon, seed, df_t=df_t, n_factors=n_factors)
+    model_name, sim = paths[model_index]
+    scenarios = sim.sum(axis=1)                      # (n_sims, n_assets), same linear P&L as attribution
+
+    target = float(scenarios.mean(axis=0) @ w_eq) if match_equal_weight_return else None
+    res = optimize_mean_es(
+        scenarios, alpha=alpha, target_return=target,
+        min_weight=min_weight, max_weight=max_weight, asset_names=asset_names,
+    )
+    _, es_eq, comp_eq, _ = mc_es_attribution(sim, w_eq, alpha, asset_names)
+
+    table = pd.DataFrame({
+        "weight_equal": pd.Series(w_eq, index=asset_names),
+        "weight_opt": res["weights"],
+        "component_ES_equal": comp_eq,
+        "component_ES_opt": res["component_ES"],
+        "share_of_ES_opt": res["share"],
+    }).rename_axis("asset")
+    table.to_csv("mc_optimal_weights.csv")
+
+    print(f"\n=== Minimum-ES portfolio: {model_name} (alpha={alpha}, horizon={horizon}d) ===")
+    print(f"Scenarios: {n_sims:,} | LP solves: {res['iterations']} | active scenarios: {res['active_scenarios']:,}")
+    print(f"ES equal weight: {es_eq:.6f} -> optimized: {res['ES']:.6f}")
+    if target is not None:
+        print(f"Expected return: {res['expected_return']:.6f} (target {target:.6f})")
+    print()
+    print(table.round(6).to_string())
+    print("\nSaved: mc_optimal_weights.csv")
+
+    record_run("run_mc_optimize", {"mc_optimal_weights": table}, params={
+        "alpha": alpha, "stress_start": stress_start, "stress_end": stress_end, "horizon": horizon,
+        "n_sims": n_sims, "seed": seed, "df_t": df_t, "model_index": model_index,
+        "min_weight": min_weight, "max_weight": max_weight,
+    })
+
+    finish_profile("run_mc_optimize")
+
+
+if __name__ == "__main__":
+    main()
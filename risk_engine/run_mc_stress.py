@@ -1,13 +1,22 @@
 import numpy as np
 import pandas as pd
 
+from risk_engine.history import record_run
+from risk_engine.instrumentation import stage, finish_profile
+from risk_engine.models.factor_model import fit_factor_model
 from risk_engine.sim.monte_carlo import (
     simulate_gaussian_mc,
     simulate_student_t_mc,
     simulate_bootstrap_mc,
+    simulate_factor_gaussian_mc,
+    simulate_factor_student_t_mc,
+    fit_t_copula,
+    marginal_inverse_cdf_tables,
+    simulate_t_copula_mc,
     portfolio_returns_from_assets,
     var_es_from_losses,
 )
+from risk_engine.sim.sketch import loss_sketch, save_sketches, sketch_var_es
 
 
 def compound_returns(r: np.ndarray) -> np.ndarray:
@@ -18,6 +27,81 @@ def compound_returns(r: np.ndarray) -> np.ndarray:
     return np.prod(1.0 + r, axis=1) - 1.0
 
 
+def simulate_stress_models(
+    stress_assets: pd.DataFrame,
+    n_sims: int,
+    horizon: int,
+    seed: int,
+    df_t: float = 6.0,
+    n_factors: int | None = None,
+    copula_marginals: str = "empirical",
+) -> list[tuple[str, np.ndarray]]:
+    """
+    Calibrate to the stress window and simulate Gaussian, Student-t,
+    bootstrap and t-copula paths from one seeded generator (in that order).
+
+    n_factors=None uses the full sample covariance; an integer switches the
+    parametric models to a k-factor PCA + Ledoit-Wolf covariance.
+    The t-copula uses df_t and the window's own marginals (copula_marginals:
+    "empirical", or "gpd" tails for longer windows).
+    Returns [(model_name, paths (n_sims, horizon, n_assets)), ...].
+    """
+    # Stress-calibrated mean/cov (per day)
+    with stage("calibrate"):
+        mu = stress_assets.mean(axis=0).values
+        if n_factors is None:
+            cov = stress_assets.cov().values
+        else:
+            fm = fit_factor_model(stress_assets, n_factors=n_factors)
+            b, d = fm["loadings"], fm["specific_var"]
+        copula = fit_t_copula(stress_assets, df=df_t)
+        tables = marginal_inverse_cdf_tables(stress_assets, marginals=copula_marginals)
+
+    rng = np.random.default_rng(seed)
+
+    if n_factors is None:
+        sim_g = simulate_gaussian_mc(mu, cov, n_sims=n_sims, horizon=horizon, rng=rng)
+        sim_t = simulate_student_t_mc(mu, cov, df=df_t, n_sims=n_sims, horizon=horizon, rng=rng)
+    else:
+        sim_g = simulate_factor_gaussian_mc(mu, b, d, n_sims=n_sims, horizon=horizon, rng=rng)
+        sim_t = simulate_factor_student_t_mc(mu, b, d, df=df_t, n_sims=n_sims, horizon=horizon, rng=rng)
+    sim_b = simulate_bootstrap_mc(stress_assets, n_sims=n_sims, horizon=horizon, rng=rng)
+    sim_c = simulate_t_copula_mc(copula["corr"], copula["df"], tables, n_sims=n_sims, horizon=horizon, rng=rng)
+
+    return [
+        ("Gaussian_MC", sim_g),
+        (f"StudentT_MC_df{df_t:g}", sim_t),
+        ("Bootstrap_MC", sim_b),
+        (f"TCopula_MC_df{df_t:g}", sim_c),
+    ]
+
+
+def mc_stress_summary(
+    paths: list[tuple[str, np.ndarray]],
+    w: np.ndarray,
+    alpha: float,
+) -> tuple[pd.DataFrame, dict]:
+    """
+    Compounded horizon losses per model and their VaR/ES.
+    Returns (summary with one row per model, {model: loss sketch}); the
+    sketches answer VaR/ES at any other alpha without keeping the losses.
+    """
+    rows = []
+    sketches = {}
+    for model_name, sim in paths:
+        with stage("portfolio_losses"):
+            port_daily = portfolio_returns_from_assets(sim, w)       # (n_sims, horizon)
+            port_h = compound_returns(port_daily)                    # (n_sims,)
+            loss = -port_h                                           # positive = loss
+        var, es = var_es_from_losses(loss, alpha)
+
+        rows.append({"model": model_name, "alpha": alpha, "horizon_days": sim.shape[1], "VaR": var, "ES": es})
+        with stage("sketch"):
+            sketches[model_name] = loss_sketch(loss)
+
+    return pd.DataFrame(rows), sketches
+
+
 def main():
     # ---- Settings ----
     alpha = 0.95
@@ -32,8 +116,17 @@ def main():
     # Lower df => fatter tails. 5-10 is typical stress calibration.
     df_t = 6.0
 
+    # Covariance model: None -> full sample covariance (fine for a handful of assets).
+    # Set to k for a k-factor PCA + Ledoit-Wolf model (large universes, short windows).
+    n_factors = None
+
+    # t-copula marginals: "empirical" (the window's own returns, interpolated) or
+    # "gpd" (empirical body + generalized Pareto tails; needs a longer window)
+    copula_marginals = "empirical"
+
     # ---- Load returns ----
-    asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
+    with stage("load_csv"):
+        asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
     asset_rets.index.name = "Date"
 
     stress_assets = asset_rets.loc[stress_start:stress_end].dropna()
@@ -44,41 +137,11 @@ def main():
     n_assets = stress_assets.shape[1]
     w = np.ones(n_assets) / n_assets
 
-    # Stress-calibrated mean/cov (per day)
-    mu = stress_assets.mean(axis=0).values
-    cov = stress_assets.cov().values
-
-    rng = np.random.default_rng(seed)
-
-    # ---- 1) Gaussian MC ----
-    sim_g = simulate_gaussian_mc(mu, cov, n_sims=n_sims, horizon=horizon, rng=rng)
-    port_g_daily = portfolio_returns_from_assets(sim_g, w)           # (n_sims, horizon)
-    port_g_h = compound_returns(port_g_daily)                        # (n_sims,)
-    losses_g = -port_g_h                                             # positive = loss
-    var_g, es_g = var_es_from_losses(losses_g, alpha)
-
-    # ---- 2) Student-t MC ----
-    sim_t = simulate_student_t_mc(mu, cov, df=df_t, n_sims=n_sims, horizon=horizon, rng=rng)
-    port_t_daily = portfolio_returns_from_assets(sim_t, w)
-    port_t_h = compound_returns(port_t_daily)
-    losses_t = -port_t_h
-    var_t, es_t = var_es_from_losses(losses_t, alpha)
-
-    # ---- 3) Bootstrap MC ----
-    sim_b = simulate_bootstrap_mc(stress_assets, n_sims=n_sims, horizon=horizon, rng=rng)
-    port_b_daily = portfolio_returns_from_assets(sim_b, w)
-    port_b_h = compound_returns(port_b_daily)
-    losses_b = -port_b_h
-    var_b, es_b = var_es_from_losses(losses_b, alpha)
-
-    # ---- Summary ----
-    summary = pd.DataFrame(
-        [
-            {"model": "Gaussian_MC", "alpha": alpha, "horizon_days": horizon, "VaR": var_g, "ES": es_g},
-            {"model": f"StudentT_MC_df{df_t:g}", "alpha": alpha, "horizon_days": horizon, "VaR": var_t, "ES": es_t},
-            {"model": "Bootstrap_MC", "alpha": alpha, "horizon_days": horizon, "VaR": var_b, "ES": es_b},
-        ]
+    # ---- Gaussian, Student-t, Bootstrap and t-copula MC ----
+    paths = simulate_stress_models(
+        stress_assets, n_sims, horizon, seed, df_t=df_t, n_factors=n_factors, copula_marginals=copula_marginals,
     )
+    summary, sketches = mc_stress_summary(paths, w, alpha)
 
     summary.to_csv("mc_stress_summary.csv", index=False)
 
@@ -88,10 +151,24 @@ def main():
     print(summary.round(6))
     print("\nSaved: mc_stress_summary.csv")
 
-    # Optional: save losses for later plotting (can be large)
-    out = pd.DataFrame({"loss_gauss": losses_g, "loss_t": losses_t, "loss_boot": losses_b})
-    out.sample(5000, random_state=1).to_csv("mc_stress_losses_sample.csv", index=False)
-    print("Saved: mc_stress_losses_sample.csv (5,000 sampled rows for plotting)")
+    # Loss distributions as mergeable sketches: size does not grow with n_sims
+    with stage("write_outputs"):
+        save_sketches(sketches, "mc_stress_sketches.npz")
+
+    print("\nES by alpha (from the sketches):")
+    tail_alphas = [0.9, 0.95, 0.975, 0.99, 0.995]
+    print(pd.DataFrame(
+        {name: [sketch_var_es(sk, a)[1] for a in tail_alphas] for name, sk in sketches.items()},
+        index=pd.Index(tail_alphas, name="alpha"),
+    ).round(6))
+    print("Saved: mc_stress_sketches.npz (load with risk_engine.sim.sketch.load_sketches)")
+
+    record_run("run_mc_stress", {"mc_stress_summary": summary}, params={
+        "alpha": alpha, "stress_start": stress_start, "stress_end": stress_end, "horizon": horizon,
+        "n_sims": n_sims, "seed": seed, "df_t": df_t, "n_factors": n_factors, "copula_marginals": copula_marginals,
+    })
+
+    finish_profile("run_mc_stress")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from risk_engine.history import record_run
+from risk_engine.instrumentation import stage, finish_profile
+from risk_engine.sim.sweep import crn_sweep
+from risk_engine.stress.window_scan import scan_stress_windows, top_stress_windows
+
+
+def main():
+    # ---- Sweep grid ----
+    dfs = [3.0, 4.0, 6.0, 10.0, 30.0]
+    horizons = [1, 5, 10, 20]
+    alphas = [0.95, 0.975, 0.99]
+
+    n_sims = 50_000
+    seed = 42
+
+    # Stress windows: the hand-picked replay window plus the two worst 63-day windows
+    windows = [("2025-04-01", "2025-07-01")]
+    n_scanned = 2
+
+    with stage("load_csv"):
+        asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
+    asset_rets.index.name = "Date"
+
+    n_assets = asset_rets.shape[1]
+    w = np.ones(n_assets) / n_assets
+
+    port = asset_rets @ w
+    worst = top_stress_windows(scan_stress_windows(port, lengths=[63]), k=n_scanned)
+    windows += [(str(s.date()), str(e.date())) for s, e in zip(worst["start"], worst["end"])]
+    windows = [(s, e) for s, e in windows if not asset_rets.loc[s:e].dropna().empty]
+
+    out = crn_sweep(asset_rets, w, windows, dfs=dfs, horizons=horizons, alphas=alphas, n_sims=n_sims, seed=seed)
+    out.to_csv("mc_sweep.csv", index=False)
+
+    print(f"\n=== MC sensitivity sweep (common random numbers, {n_sims:,} scenarios) ===")
+    print(f"Windows: {', '.join(f'{s}..{e}' for s, e in windows)}")
+
+    # ES vs df and horizon for the first window at the middle alpha
+    a = alphas[len(alphas) // 2]
+    first = out[(out["window"] == f"{windows[0][0]}..{windows[0][1]}") & (out["alpha"] == a)]
+    table = first[first["model"] == "StudentT_MC"].pivot(index="df", columns="horizon_days", values="ES")
+    print(f"\nStudent-t ES by df (rows) and horizon (columns), alpha={a}, window {windows[0][0]}..{windows[0][1]}:")
+    print(table.round(6))
+
+    print("\nSaved: mc_sweep.csv")
+
+    record_run("run_mc_sweep", {"mc_sweep": out}, params={
+        "dfs": dfs, "horizons": horizons, "alphas": alphas, "n_sims": n_sims, "seed": seed, "windows": windows,
+    })
+
+    finish_profile("run_mc_sweep")
+
+
+if __name__ == "__main__":
+    main()
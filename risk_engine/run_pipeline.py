@@ -0,0 +1,61 @@
+import argparse
+import json
+import time
+
+from risk_engine.history import record_run
+from risk_engine.instrumentation import finish_profile
+from risk_engine.pipeline import DEFAULT_CONFIG, STAGES, TARGETS, output_tables, run_pipeline
+
+
+def _parse_override(text: str):
+    key, _, raw = text.partition("=")
+    if key not in DEFAULT_CONFIG:
+        raise argparse.ArgumentTypeError(f"unknown setting {key!r}; known: {list(DEFAULT_CONFIG)}")
+    try:
+        value = json.loads(raw)
+    except json.JSONDecodeError:
+        value = raw
+    return key, value
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Run the risk pipeline as a DAG with cached intermediates."
+    )
+    parser.add_argument("targets", nargs="*", default=[],
+                        help=f"stages to build, from: {', '.join(STAGES)} (default: {' '.join(TARGETS)})")
+    parser.add_argument("--set", dest="overrides", action="append", type=_parse_override, default=[],
+                        metavar="KEY=VALUE", help="override a setting, e.g. --set alpha=0.99")
+    parser.add_argument("--cache-dir", default=".risk_cache")
+    parser.add_argument("--no-cache", action="store_true", help="compute everything, don't read or write the cache")
+    parser.add_argument("--out-dir", default=".")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--processes", action="store_true", help="run stages in processes instead of threads")
+    args = parser.parse_args(argv)
+    unknown = [t for t in args.targets if t not in STAGES]
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(unknown)}; choose from: {', '.join(STAGES)}")
+
+    config = dict(args.overrides)
+    t0 = time.perf_counter()
+    res = run_pipeline(
+        targets=args.targets or None,
+        config=config,
+        cache_dir=None if args.no_cache else args.cache_dir,
+        out_dir=args.out_dir,
+        workers=args.workers,
+        processes=args.processes,
+    )
+
+    print(f"\n=== Pipeline done in {time.perf_counter() - t0:.2f}s ===")
+    print(f"Ran: {len(res['ran'])} stage(s) | From cache: {len(res['cached'])} stage(s)")
+    print(f"Outputs written to: {args.out_dir}")
+
+    settings = {**DEFAULT_CONFIG, **config}
+    record_run("run_pipeline", output_tables(res["values"]), params=settings, inputs=(settings["returns_path"],))
+
+    finish_profile("run_pipeline")
+
+
+if __name__ == "__main__":
+    main()
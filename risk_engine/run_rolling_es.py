@@ -1,34 +1,53 @@
 import numpy as np
 import pandas as pd
+from scipy.stats import norm, t
 
+from risk_engine.history import record_run
+from risk_engine.instrumentation import instrumented, stage, finish_profile
+from risk_engine.kernels import rolling_mean_std, rolling_quantile_tail
 from risk_engine.models.var_es import (
     var_gaussian, es_gaussian,
     var_historical, es_historical,
-    es_student_t
+    es_student_t,
+    fit_student_t,
     )
+from risk_engine.models.bootstrap_ci import rolling_var_es_ci
+from risk_engine.models.fhs import rolling_metrics_fhs
+from risk_engine.parallel import parallel_rolling
 
-from scipy.stats import t
-
-def rolling_metrics_gaussian(r: pd.Series, alpha: float, window: int):
+def _rolling_metrics_loop(r: pd.Series, alpha: float, window: int, var_fn, es_fn):
+    """Window-by-window loop; used for series with missing values (each window drops its own)."""
     dates, var_list, es_list = [], [], []
     for i in range(window, len(r)):
         w = r.iloc[i-window:i]
-        var_list.append(var_gaussian(w, alpha))
-        es_list.append(es_gaussian(w, alpha))
+        var_list.append(var_fn(w, alpha))
+        es_list.append(es_fn(w, alpha))
         dates.append(r.index[i])
     return pd.DataFrame({"VaR": var_list, "ES": es_list}, index=dates)
 
 
+@instrumented()
+def rolling_metrics_gaussian(r: pd.Series, alpha: float, window: int):
+    x = r.to_numpy(dtype=float)
+    if np.isnan(x).any():
+        return _rolling_metrics_loop(r, alpha, window, var_gaussian, es_gaussian)
+    mu, sigma = rolling_mean_std(x, window)
+    z = norm.ppf(1 - alpha)
+    var = -norm.ppf(1 - alpha, loc=mu, scale=sigma)
+    es = -(mu - sigma * norm.pdf(z) / (1 - alpha))
+    return pd.DataFrame({"VaR": var, "ES": es}, index=r.index[window:].rename(None))
+
+
+@instrumented()
 def rolling_metrics_historical(r: pd.Series, alpha: float, window: int):
-    dates, var_list, es_list = [], [], []
-    for i in range(window, len(r)):
-        w = r.iloc[i-window:i]
-        var_list.append(var_historical(w, alpha))
-        es_list.append(es_historical(w, alpha))
-        dates.append(r.index[i])
-    return pd.DataFrame({"VaR": var_list, "ES": es_list}, index=dates)
+    x = r.to_numpy(dtype=float)
+    if np.isnan(x).any():
+        return _rolling_metrics_loop(r, alpha, window, var_historical, es_historical)
+    var, es = rolling_quantile_tail(x, window, alpha)
+    return pd.DataFrame({"VaR": var, "ES": es}, index=r.index[window:].rename(None))
 
 
+@instrumented()
 def rolling_metrics_student_t(r: pd.Series, alpha: float, window: int):
     dates, var_list, es_list = [], [], []
     for i in range(window, len(r)):
@@ -36,7 +55,7 @@ def rolling_metrics_student_t(r: pd.Series, alpha: float, window: int):
         # VaR from fitted Student-t
         x = w.dropna().values
         try:
-            df, loc, scale = t.fit(x)
+            df, loc, scale = fit_student_t(x)
             if df <= 2 or scale <= 0 or not np.isfinite([df, loc, scale]).all():
                 raise ValueError("unstable t-fit")
             q = t.ppf(1 - alpha, df, loc=loc, scale=scale)
@@ -52,26 +71,54 @@ def rolling_metrics_student_t(r: pd.Series, alpha: float, window: int):
 
     return pd.DataFrame({"VaR": var_list, "ES": es_list}, index=dates)
 
+
+def rolling_var_es(r: pd.Series, alpha: float, window: int, workers: int = 1) -> pd.DataFrame:
+    """
+    Rolling Gaussian / historical / Student-t VaR and ES plus EWMA / GARCH
+    filtered historical simulation (burn-in = window), joined on date.
+    workers > 1 spreads the windowed models over a shared-memory process pool.
+    """
+    g = parallel_rolling(rolling_metrics_gaussian, r, window, alpha, workers=workers)
+    h = parallel_rolling(rolling_metrics_historical, r, window, alpha, workers=workers)
+    tt = parallel_rolling(rolling_metrics_student_t, r, window, alpha, workers=workers)
+    g = g.rename(columns={"VaR": "VaR_gauss", "ES": "ES_gauss"})
+    h = h.rename(columns={"VaR": "VaR_hist", "ES": "ES_hist"})
+    tt = tt.rename(columns={"VaR": "VaR_t", "ES": "ES_t"})
+    fe = rolling_metrics_fhs(r, alpha, burn_in=window, model="ewma").rename(
+        columns={"VaR": "VaR_fhs_ewma", "ES": "ES_fhs_ewma"})
+    fg = rolling_metrics_fhs(r, alpha, burn_in=window, model="garch").rename(
+        columns={"VaR": "VaR_fhs_garch", "ES": "ES_fhs_garch"})
+    return g.join(h, how="inner").join(tt, how="inner").join(fe, how="inner").join(fg, how="inner")
+
+
 def main():
-    r = pd.read_csv(
-        "portfolio_returns.csv",
-        parse_dates=["Date"],
-        index_col="Date"
-    )["portfolio_return"]
+    with stage("load_csv"):
+        r = pd.read_csv(
+            "portfolio_returns.csv",
+            parse_dates=["Date"],
+            index_col="Date"
+        )["portfolio_return"]
 
     alpha = 0.95
     window = 60
+    workers = 1   # >1: run the rolling loops on a shared-memory process pool
 
-    g = rolling_metrics_gaussian(r, alpha, window).rename(columns={"VaR": "VaR_gauss", "ES": "ES_gauss"})
-    h = rolling_metrics_historical(r, alpha, window).rename(columns={"VaR": "VaR_hist", "ES": "ES_hist"})
-    tt = rolling_metrics_student_t(r, alpha, window).rename(columns={"VaR": "VaR_t", "ES": "ES_t"})
-
-    out = g.join(h, how="inner").join(tt, how="inner")
+    out = rolling_var_es(r, alpha, window, workers=workers)
     out.to_csv("rolling_var_es.csv")
 
+    # Bootstrap bands for the historical series (3 tail days per window at 95% / 60d)
+    bands = rolling_var_es_ci(r, alpha, window)
+    bands.to_csv("rolling_es_ci.csv")
+
     print("\nSaved: rolling_var_es.csv")
+    print("Saved: rolling_es_ci.csv (historical VaR / ES with 90% bootstrap bands)")
     print(out.tail())
 
+    record_run("run_rolling_es", {"rolling_var_es": out, "rolling_es_ci": bands},
+               params={"alpha": alpha, "window": window}, inputs=("portfolio_returns.csv",))
+
+    finish_profile("run_rolling_es")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,84 @@
+import os
+
+import pandas as pd
+
+from risk_engine.history import record_run
+from risk_engine.instrumentation import stage, finish_profile
+from risk_engine.stress.scenarios import (
+    scenario_library,
+    cached_scenarios_from_csv,
+    load_scenario_library,
+    scenario_pnl,
+    scenario_report,
+)
+
+
+# Used when neither scenarios.csv nor scenarios.npz exists (never saved)
+EXAMPLE_SCENARIOS = {
+    "equity_crash":      {"SPY": -0.20, "EFA": -0.22, "BTC": -0.50, "TLH": 0.05, "AGG": 0.01, "GLD": 0.03},
+    "rates_shock":       {"TLH": -0.12, "AGG": -0.05, "SPY": -0.06, "EFA": -0.05, "GLD": -0.04},
+    "oil_spike":         {"USO": 0.35, "SPY": -0.05, "EFA": -0.07, "GLD": 0.04},
+    "crypto_winter":     {"BTC": -0.70, "SPY": -0.03},
+    "stagflation":       {"SPY": -0.15, "EFA": -0.15, "TLH": -0.10, "AGG": -0.04, "USO": 0.20, "GLD": 0.10},
+}
+
+
+def main():
+    top = 20
+
+    with stage("load_csv"):
+        asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0, nrows=1)
+    assets = list(asset_rets.columns)
+
+    # Equal weights, plus any extra portfolios (rows = portfolios, columns = assets)
+    w = pd.Series(1.0 / len(assets), index=assets, name="equal_weight")
+    portfolios = w.to_frame().T
+    if os.path.exists("portfolios.csv"):
+        extra = pd.read_csv("portfolios.csv", index_col=0).reindex(columns=assets, fill_value=0.0)
+        portfolios = pd.concat([portfolios, extra])
+
+    # ---- Scenario library: scenarios.csv (through its binary copy), else a bare scenarios.npz ----
+    with stage("load_scenarios"):
+        if os.path.exists("scenarios.csv"):
+            source = "scenarios.csv"
+            lib, rebuilt = cached_scenarios_from_csv("scenarios.csv", "scenarios.npz")
+            if rebuilt:
+                print("Saved: scenarios.npz (binary copy of scenarios.csv, rebuilt when the CSV changes)")
+        elif os.path.exists("scenarios.npz"):
+            source = "scenarios.npz"
+            lib = load_scenario_library("scenarios.npz")
+        else:
+            source = None
+            shocks = pd.DataFrame(EXAMPLE_SCENARIOS).T.reindex(columns=assets).fillna(0.0)
+            lib = scenario_library(list(shocks.index), assets, shocks.values)
+            print("No scenarios.csv / scenarios.npz: using the built-in example scenarios")
+
+    with stage("revalue"):
+        pnl = scenario_pnl(lib, portfolios)
+        rep = scenario_report(lib, w, top=top)
+
+    pnl.to_csv("scenario_pnl.csv")
+    rep["pnl"].to_csv("scenario_ranked.csv")
+    rep["top_contributors"].to_csv("scenario_contributions.csv", index=False)
+
+    n_scen, n_days, _ = lib["shocks"].shape
+    print(f"\n=== Scenario Shocks ({n_scen:,} scenarios, up to {n_days} day paths, {len(portfolios)} portfolios) ===")
+    print(f"\nWorst scenarios for {w.name}:")
+    print(rep["pnl"].head(10).round(6))
+    print("\nLargest loss contributors in the worst scenario:")
+    worst = rep["top_contributors"]
+    print(worst.loc[worst["scenario"] == rep["pnl"].index[0]].head(5).round(6).to_string(index=False))
+
+    print("\nSaved: scenario_pnl.csv, scenario_ranked.csv, scenario_contributions.csv")
+
+    inputs = ("returns.csv", "portfolios.csv") + ((source,) if source else ())
+    record_run("run_scenarios", {
+        "scenario_ranked": rep["pnl"],
+        "scenario_contributions": rep["top_contributors"],
+    }, params={"top": top, "scenarios": source or "examples"}, inputs=inputs)
+
+    finish_profile("run_scenarios")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,9 @@ from risk_engine.models.var_es import(
 )
 
 from risk_engine.attribution.es_attribution import es_attribution_historical
+from risk_engine.history import record_run
+from risk_engine.instrumentation import instrumented, stage, finish_profile
+from risk_engine.stress.window_scan import scan_stress_windows, top_stress_windows
 
 
 def cumulative_from_returns(r: pd.Series) -> pd.Series:
@@ -21,6 +24,7 @@ def max_drawdown(equity: pd.Series) -> float:
     return float(dd.min()) #negative
 
 
+@instrumented()
 def summarize_period(label: str, port_ret: pd.Series, alpha: float):
     """Compute core risk metrics for a given return series."""
     v_h = var_historical(port_ret, alpha)
@@ -48,22 +52,24 @@ def summarize_period(label: str, port_ret: pd.Series, alpha: float):
     }
 
 
-def main():
-    # ---- Inputs ----
-    alpha = 0.95
-
-    # Choose the stress window (edit these freely)
-    stress_start = "2025-04-01"
-    stress_end = "2025-07-01"
-
-    # Load asset returns matrix (same file you used for attribution)
-    asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
-    asset_rets.index.name = "Date"
-
-    # Equal weights (for now). Later we can load weights from config.
-    n = asset_rets.shape[1]
-    w = pd.Series(1.0 / n, index=asset_rets.columns)
-
+def stress_replay(
+    asset_rets: pd.DataFrame,
+    w: pd.Series,
+    alpha: float,
+    stress_start: str,
+    stress_end: str,
+) -> dict:
+    """
+    Full-sample vs stress-window risk summary plus historical ES attribution
+    inside the stress window.
+
+    Returns dict with:
+      - summary (DataFrame, one row per period)
+      - attribution (dict from es_attribution_historical)
+      - attribution_table (DataFrame, largest component ES first)
+      - equity (Series, stress-window equity curve)
+      - stress_returns (Series, stress-window portfolio returns)
+    """
     # Portfolio returns (consistent with earlier work)
     port = asset_rets.mul(w, axis=1).sum(axis=1).dropna()
 
@@ -77,20 +83,13 @@ def main():
     # ---- Summaries ----
     full_summary = summarize_period("FULL SAMPLE", port, alpha)
     stress_summary = summarize_period(f"STRESS REPLAY {stress_start}..{stress_end}", stress, alpha)
-
     summary_df = pd.DataFrame([full_summary, stress_summary]).set_index("label")
-    summary_df.to_csv("stress_replay_summary.csv")
-
-    print("\n=== Stress Replay Summary (alpha=0.95) ===")
-    print(summary_df.round(6))
-    print("\nSaved: stress_replay_summary.csv")
 
     # ---- Stress Attribution (Historical ES, in stress window only) ----
     # Attribution should be computed on the same stress window for asset returns.
     stress_assets = asset_rets.loc[stress_start:stress_end].dropna()
 
     attrib = es_attribution_historical(stress_assets, w, alpha=alpha)
-    comp = attrib["component_ES"].sort_values(ascending=False)
 
     out_attrib = pd.DataFrame({
         "weight": w,
@@ -98,7 +97,53 @@ def main():
         "component_ES": attrib["component_ES"],
     }).sort_values("component_ES", ascending=False)
 
-    out_attrib.to_csv("stress_replay_attribution.csv")
+    return {
+        "summary": summary_df,
+        "attribution": attrib,
+        "attribution_table": out_attrib,
+        "equity": cumulative_from_returns(stress),
+        "stress_returns": stress,
+    }
+
+
+def main():
+    # ---- Inputs ----
+    alpha = 0.95
+
+    # Choose the stress window (edit these freely)
+    stress_start = "2025-04-01"
+    stress_end = "2025-07-01"
+
+    # Or let the scanner pick the worst 63-day window by cumulative loss
+    auto_window = False
+
+    # Load asset returns matrix (same file you used for attribution)
+    with stage("load_csv"):
+        asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
+    asset_rets.index.name = "Date"
+
+    # Equal weights (for now). Later we can load weights from config.
+    n = asset_rets.shape[1]
+    w = pd.Series(1.0 / n, index=asset_rets.columns)
+
+    if auto_window:
+        port = asset_rets.mul(w, axis=1).sum(axis=1).dropna()
+        worst = top_stress_windows(scan_stress_windows(port, lengths=[63], alpha=alpha), k=1).iloc[0]
+        stress_start, stress_end = str(worst["start"].date()), str(worst["end"].date())
+        print(f"Auto-selected stress window: {stress_start}..{stress_end}")
+
+    res = stress_replay(asset_rets, w, alpha, stress_start, stress_end)
+
+    summary_df = res["summary"]
+    summary_df.to_csv("stress_replay_summary.csv")
+
+    print("\n=== Stress Replay Summary (alpha=0.95) ===")
+    print(summary_df.round(6))
+    print("\nSaved: stress_replay_summary.csv")
+
+    attrib = res["attribution"]
+    comp = attrib["component_ES"].sort_values(ascending=False)
+    res["attribution_table"].to_csv("stress_replay_attribution.csv")
 
     print("\n=== Stress ES Attribution (Historical, alpha=0.95) ===")
     print("Tail obs:", attrib["tail_count"])
@@ -109,14 +154,21 @@ def main():
     print("\nSaved: stress_replay_attribution.csv")
 
     # ---- Save stress equity curve (for easy plotting later) ----
-    stress_eq = cumulative_from_returns(stress)
-    stress_eq.to_csv("stress_replay_equity_curve.csv", header=["equity"])
+    res["equity"].to_csv("stress_replay_equity_curve.csv", header=["equity"])
     print("\nSaved: stress_replay_equity_curve.csv (equity curve for stress window)")
 
     # Small extra: save the stress portfolio returns too
-    stress.to_csv("stress_replay_portfolio_returns.csv", header=["portfolio_return"])
+    res["stress_returns"].to_csv("stress_replay_portfolio_returns.csv", header=["portfolio_return"])
     print("Saved: stress_replay_portfolio_returns.csv")
 
+    record_run("run_stress_replay", {
+        "stress_replay_summary": summary_df,
+        "stress_replay_attribution": res["attribution_table"],
+        "stress_replay_equity_curve": res["equity"].rename("equity").to_frame(),
+    }, params={"alpha": alpha, "stress_start": stress_start, "stress_end": stress_end})
+
+    finish_profile("run_stress_replay")
+
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
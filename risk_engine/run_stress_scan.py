@@ -0,0 +1,45 @@
+import pandas as pd
+
+from risk_engine.history import record_run
+from risk_engine.instrumentation import stage, finish_profile
+from risk_engine.stress.window_scan import scan_stress_windows, top_stress_windows
+
+
+def main():
+    # ---- Inputs ----
+    alpha = 0.95
+    lengths = [21, 63, 126]     # ~1, 3 and 6 months of trading days
+    top_k = 5
+
+    with stage("load_csv"):
+        asset_rets = pd.read_csv("returns.csv", parse_dates=[0], index_col=0)
+    asset_rets.index.name = "Date"
+
+    # Equal weights (same as the replay)
+    n = asset_rets.shape[1]
+    w = pd.Series(1.0 / n, index=asset_rets.columns)
+    port = asset_rets.mul(w, axis=1).sum(axis=1).dropna()
+
+    with stage("scan"):
+        scan = scan_stress_windows(port, lengths=lengths, alpha=alpha)
+
+    tops = [top_stress_windows(scan, k=top_k, by=by) for by in ["cum_loss", "max_drawdown", "ES_hist"]]
+    out = pd.concat(tops, ignore_index=True)
+    out.to_csv("stress_windows_top.csv", index=False)
+
+    print(f"\n=== Worst stress windows (lengths={lengths}, alpha={alpha}) ===")
+    print(f"Windows scanned: {len(scan):,}")
+    for t in tops:
+        print(f"\nRanked by {t['ranked_by'].iloc[0]}:")
+        print(t.drop(columns="ranked_by").to_string(index=False, float_format=lambda v: f"{v:.6f}"))
+
+    print("\nSaved: stress_windows_top.csv (start/end feed stress_start/stress_end)")
+
+    record_run("run_stress_scan", {"stress_windows_top": out},
+               params={"alpha": alpha, "lengths": lengths, "top_k": top_k})
+
+    finish_profile("run_stress_scan")
+
+
+if __name__ == "__main__":
+    main()
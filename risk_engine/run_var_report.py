@@ -8,17 +8,12 @@ from risk_engine.models.var_es import(
     var_historical,
     es_historical
 )
+from risk_engine.history import record_run
+from risk_engine.instrumentation import stage, finish_profile
 
-def main():
-    returns = pd.read_csv("returns.csv", parse_dates=["Date"], index_col="Date")
-
-    #Equal weights by default
-    n = returns.shape[1]
-    w = np.ones(n)/n
 
-    rp = portfolio_returns(returns, w)
-
-    alphas = [0.95, 0.99]
+def var_es_report(rp: pd.Series, alphas=(0.95, 0.99)) -> pd.DataFrame:
+    """Gaussian and historical VaR/ES of the portfolio series, one row per alpha."""
     rows = []
     for a in alphas:
         rows.append({
@@ -28,8 +23,21 @@ def main():
             "VaR_hist": var_historical(rp, a),
             "ES_hist": es_historical(rp, a),
         })
+    return pd.DataFrame(rows).set_index("alpha")
+
+
+def main():
+    with stage("load_csv"):
+        returns = pd.read_csv("returns.csv", parse_dates=["Date"], index_col="Date")
+
+    #Equal weights by default
+    n = returns.shape[1]
+    w = np.ones(n)/n
 
-    report = pd.DataFrame(rows).set_index("alpha")
+    rp = portfolio_returns(returns, w)
+
+    alphas = [0.95, 0.99]
+    report = var_es_report(rp, alphas)
     print("\n Portfolio VaR/ES Report (daily, equal weight)")
     print(report)
 
@@ -38,5 +46,10 @@ def main():
     rp.to_csv("portfolio_returns.csv")
     print("\nSaved: var_es_report.csv,, portfolio_returns.csv")
 
+    record_run("run_var_report", {"var_es_report": report, "portfolio_returns": rp.to_frame()},
+               params={"alphas": alphas})
+
+    finish_profile("run_var_report")
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
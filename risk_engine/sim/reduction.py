@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+from risk_engine.instrumentation import instrumented
+from risk_engine.sim.monte_carlo import var_es_from_losses, var_es_from_weighted_losses
+
+
+@instrumented()
+def reduce_scenarios(
+    scenarios: np.ndarray,
+    weights: np.ndarray,
+    keep_alpha: float = 0.95,
+    n_body: int = 200,
+    probs: np.ndarray | None = None,
+) -> dict:
+    """
+    Tail-preserving reduction of S scenarios of N asset (horizon) returns.
+
+    Scenarios whose portfolio loss is at or beyond the keep_alpha quantile are
+    kept unchanged with their own probability. The body is sorted by
+    portfolio loss and cut into n_body equal-probability bins; each bin
+    becomes one representative (the probability-weighted mean asset vector)
+    carrying the bin's total probability.
+
+    weights may be one portfolio (N,) or several (P x N): a scenario is kept
+    if it is in any portfolio's tail, and the body is binned on the first
+    portfolio's loss. Pass the candidate books of a what-if run so their
+    tails all survive. Portfolios not passed here (e.g. an optimizer's free
+    weights) can have tails inside the binned body; optimize on the full set.
+
+    P&L is linear in the scenario vector, so every representative's portfolio
+    loss is its bin's mean loss and total probability / expected P&L are
+    preserved exactly. Tail scenarios are untouched, so VaR, ES and component
+    ES at alpha >= keep_alpha differ from the full set only through the
+    quantile convention (weighted inverse CDF vs linear interpolation, at most
+    one order statistic).
+
+    Returns dict with:
+      - scenarios (M x N), probs (M,), sum to 1
+      - is_tail (M,) bool, True for kept scenarios
+      - n_original, keep_alpha
+    """
+    X = np.asarray(scenarios, dtype=float)
+    S = X.shape[0]
+    p = np.full(S, 1.0 / S) if probs is None else np.asarray(probs, dtype=float) / np.sum(probs)
+    W = np.atleast_2d(np.asarray(weights, dtype=float))
+    losses = -(X @ W.T)                                       # (S, P)
+
+    in_tail = np.zeros(S, dtype=bool)
+    for j in range(W.shape[0]):
+        order = np.argsort(losses[:, j], kind="stable")
+        first = int(np.searchsorted(np.cumsum(p[order]), keep_alpha))
+        in_tail[order[first:]] = True
+
+    order = np.argsort(losses[:, 0], kind="stable")
+    body, tail = order[~in_tail[order]], order[in_tail[order]]
+
+    reps, rep_p = np.empty((0, X.shape[1])), np.empty(0)
+    if len(body) > 0:
+        # Equal-probability bins by cumulative probability along the sorted body
+        pb = p[body]
+        cum = np.cumsum(pb)
+        n_bins = min(n_body, len(body))
+        edges = np.searchsorted(cum, np.linspace(0.0, cum[-1], n_bins + 1)[1:-1])
+        starts = np.unique(np.concatenate([[0], edges]))
+        rep_p = np.add.reduceat(pb, starts)
+        reps = np.add.reduceat(X[body] * pb[:, None], starts, axis=0) / rep_p[:, None]
+
+    return {
+        "scenarios": np.vstack([reps, X[tail]]),
+        "probs": np.concatenate([rep_p, p[tail]]),
+        "is_tail": np.concatenate([np.zeros(len(rep_p), dtype=bool), np.ones(len(tail), dtype=bool)]),
+        "n_original": S,
+        "keep_alpha": keep_alpha,
+    }
+
+
+def save_reduced_scenarios(reduced: dict, path: str) -> None:
+    """Store named reduced sets (e.g. one per model) in one .npz."""
+    np.savez(path, **{
+        f"{name}/{key}": red[key] for name, red in reduced.items() for key in ("scenarios", "probs", "is_tail")
+    })
+
+
+def load_reduced_scenarios(path: str) -> dict:
+    out = {}
+    with np.load(path) as f:
+        for full_key in f.files:
+            name, key = full_key.rsplit("/", 1)
+            out.setdefault(name, {})[key] = f[full_key]
+    return out
+
+
+def weighted_component_es(
+    scenarios: np.ndarray,
+    weights: np.ndarray,
+    alpha: float,
+    probs: np.ndarray | None = None,
+) -> tuple[float, float, np.ndarray]:
+    """
+    VaR, ES and per-asset component ES (sums to ES) on probability-weighted
+    scenarios, with the same '>= VaR' tail as mc_es_attribution. probs=None
+    uses var_es_from_losses on equally likely scenarios.
+    """
+    X = np.asarray(scenarios, dtype=float)
+    contrib = X * np.asarray(weights, dtype=float)
+    losses = -contrib.sum(axis=1)
+
+    if probs is None:
+        var, _ = var_es_from_losses(losses, alpha)
+        p = np.full(len(losses), 1.0 / len(losses))
+    else:
+        p = np.asarray(probs, dtype=float)
+        var, _ = var_es_from_weighted_losses(losses, alpha, p)
+
+    tail = losses >= var
+    pt = p[tail] / p[tail].sum()
+    comp = -(pt @ contrib[tail])
+    return float(var), float(comp.sum()), comp
+
+
+def reduction_error(full: np.ndarray, reduced: dict, weights: np.ndarray, alphas=(0.95, 0.975, 0.99)) -> pd.DataFrame:
+    """
+    Full vs reduced VaR / ES / component ES, one row per alpha, with relative
+    errors (component ES: largest absolute error as a fraction of ES).
+    """
+    rows = []
+    for a in alphas:
+        v0, e0, c0 = weighted_component_es(full, weights, a)
+        v1, e1, c1 = weighted_component_es(reduced["scenarios"], weights, a, reduced["probs"])
+        rows.append({
+            "alpha": a,
+            "VaR_full": v0, "VaR_reduced": v1, "VaR_rel_err": abs(v1 - v0) / abs(v0),
+            "ES_full": e0, "ES_reduced": e1, "ES_rel_err": abs(e1 - e0) / abs(e0),
+            "cES_max_err_share": float(np.max(np.abs(c1 - c0)) / abs(e0)),
+        })
+    return pd.DataFrame(rows).set_index("alpha")
@@ -0,0 +1,163 @@
+import numpy as np
+
+
+# A loss sketch is a dict:
+#   - n          total number of losses summarized
+#   - tail_k     capacity of the exact tail buffer
+#   - tail       the tail_k largest losses, descending (exact)
+#   - delta      t-digest compression (~ number of centroids)
+#   - means      t-digest centroid means, ascending
+#   - weights    t-digest centroid counts
+#   - min, max   exact extremes
+#
+# Storage is O(tail_k + delta) whatever n is. Merging is exact for the tail
+# buffer (top-k of a union is inside the union of the parts' top-k) and
+# re-compresses the concatenated centroids for the body.
+
+
+def _compress(means: np.ndarray, weights: np.ndarray, delta: float) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Merging t-digest pass: sort centroids, map their cumulative-weight midpoints
+    through the arcsine scale function k(q) = delta * (asin(2q - 1) / pi + 1/2)
+    and pool neighbours that land on the same integer k. The scale function is
+    steep near q = 0 and q = 1, so centroids stay small in the tails.
+    """
+    order = np.argsort(means, kind="stable")
+    m, w = means[order], weights[order]
+
+    cum = np.cumsum(w)
+    q_mid = (cum - 0.5 * w) / cum[-1]
+    k = np.floor(delta * (np.arcsin(2.0 * q_mid - 1.0) / np.pi + 0.5))
+
+    starts = np.flatnonzero(np.diff(k, prepend=-1.0))
+    w_out = np.add.reduceat(w, starts)
+    m_out = np.add.reduceat(m * w, starts) / w_out
+    return m_out, w_out
+
+
+def loss_sketch(losses: np.ndarray, tail_k: int = 4096, delta: float = 200.0) -> dict:
+    """
+    Summarize a loss vector (positive = loss).
+
+    The default buffer keeps VaR/ES exact for alpha = 0.95 up to ~80k
+    scenarios and alpha = 0.99 up to ~400k; beyond that the digest answers.
+    """
+    x = np.asarray(losses, dtype=float).ravel()
+    if x.size == 0:
+        raise ValueError("losses is empty")
+
+    k = min(tail_k, x.size)
+    tail = np.sort(np.partition(x, x.size - k)[x.size - k:])[::-1]
+    means, weights = _compress(x, np.ones_like(x), delta)
+
+    return {
+        "n": int(x.size),
+        "tail_k": int(tail_k),
+        "tail": tail,
+        "delta": float(delta),
+        "means": means,
+        "weights": weights,
+        "min": float(x.min()),
+        "max": float(x.max()),
+    }
+
+
+def merge_sketches(sketches) -> dict:
+    """Combine sketches of disjoint loss sets (chunks, workers, days) into one."""
+    sketches = list(sketches)
+    if not sketches:
+        raise ValueError("nothing to merge")
+
+    tail_k = min(s["tail_k"] for s in sketches)
+    delta = min(s["delta"] for s in sketches)
+
+    tail = np.concatenate([s["tail"] for s in sketches])
+    k = min(tail_k, tail.size)
+    tail = np.sort(np.partition(tail, tail.size - k)[tail.size - k:])[::-1]
+
+    means, weights = _compress(
+        np.concatenate([s["means"] for s in sketches]),
+        np.concatenate([s["weights"] for s in sketches]),
+        delta,
+    )
+
+    return {
+        "n": int(sum(s["n"] for s in sketches)),
+        "tail_k": int(tail_k),
+        "tail": tail,
+        "delta": float(delta),
+        "means": means,
+        "weights": weights,
+        "min": float(min(s["min"] for s in sketches)),
+        "max": float(max(s["max"] for s in sketches)),
+    }
+
+
+def _digest_knots(sk: dict) -> tuple[np.ndarray, np.ndarray]:
+    """Piecewise-linear quantile function through the centroid midpoints: (p, Q(p))."""
+    w = sk["weights"]
+    p_mid = (np.cumsum(w) - 0.5 * w) / sk["n"]
+    p = np.concatenate([[0.0], p_mid, [1.0]])
+    v = np.concatenate([[sk["min"]], sk["means"], [sk["max"]]])
+    return p, v
+
+
+def _integrate_quantile(p: np.ndarray, v: np.ndarray, a: float, b: float) -> float:
+    """Integral of the piecewise-linear Q over [a, b] (trapezoids on the knot grid)."""
+    if b <= a:
+        return 0.0
+    grid = np.concatenate([[a], p[(p > a) & (p < b)], [b]])
+    vals = np.interp(grid, p, v)
+    return float(np.sum(0.5 * (vals[1:] + vals[:-1]) * np.diff(grid)))
+
+
+def sketch_var_es(sk: dict, alpha: float) -> tuple[float, float]:
+    """
+    VaR/ES from a sketch, as positive numbers.
+
+    When the interpolated alpha-quantile falls inside the tail buffer the
+    result equals var_es_from_losses on the full vector (same linear
+    quantile and '>= VaR' tail). Otherwise VaR is read off the digest and ES
+    integrates the digest quantile function up to the buffer, which covers
+    the top tail_k / n of the distribution exactly.
+    """
+    n = sk["n"]
+    tail = sk["tail"]
+
+    h = (n - 1) * alpha
+    lo = int(np.floor(h))
+    frac = h - lo
+    hi = min(lo + 1, n - 1)
+
+    # Ascending order statistic j sits at tail[n - 1 - j]
+    if n - 1 - lo < len(tail):
+        x_lo = tail[n - 1 - lo]
+        x_hi = tail[n - 1 - hi]
+        q = float(x_lo + frac * (x_hi - x_lo))
+        return q, float(tail[tail >= q].mean())
+
+    p, v = _digest_knots(sk)
+    q = float(np.interp(alpha, p, v))
+
+    p_buf = 1.0 - len(tail) / n
+    es = (_integrate_quantile(p, v, alpha, p_buf) + tail.sum() / n) / (1.0 - alpha)
+    return q, float(es)
+
+
+def save_sketches(sketches: dict, path: str) -> None:
+    """Store named sketches (e.g. one per model) in one .npz."""
+    arrays = {}
+    for name, sk in sketches.items():
+        for key, val in sk.items():
+            arrays[f"{name}/{key}"] = np.asarray(val)
+    np.savez(path, **arrays)
+
+
+def load_sketches(path: str) -> dict:
+    out = {}
+    with np.load(path) as f:
+        for full_key in f.files:
+            name, key = full_key.rsplit("/", 1)
+            val = f[full_key]
+            out.setdefault(name, {})[key] = val if val.ndim else val.item()
+    return out
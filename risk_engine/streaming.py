@@ -0,0 +1,160 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+from risk_engine.validation.backtesting import (
+    christoffersen_from_counts,
+    kupiec_from_counts,
+    transition_counts,
+)
+
+
+# -----------------------
+# Chunked input
+# -----------------------
+# Chunk lengths are rounded up to a multiple of this, so BLAS row blocking in
+# per-chunk products (portfolio returns) lines up with the in-memory product and
+# the results agree bit for bit, not just to rounding.
+ROW_ALIGN = 64
+
+
+def _aligned(chunksize: int) -> int:
+    return -(-int(chunksize) // ROW_ALIGN) * ROW_ALIGN
+
+
+def iter_csv_chunks(path, chunksize: int = 100_000, usecols=None):
+    """
+    Date-indexed chunks of a returns CSV (first column = date), read with
+    pandas' chunked reader so only one chunk is held at a time (chunksize
+    rounded up to a multiple of ROW_ALIGN). Raises if the dates are not
+    strictly increasing across the file.
+    """
+    last = None
+    reader = pd.read_csv(path, parse_dates=[0], index_col=0, chunksize=_aligned(chunksize), usecols=usecols)
+    for chunk in reader:
+        chunk.index.name = "Date"
+        if not chunk.index.is_monotonic_increasing or (last is not None and chunk.index[0] <= last):
+            raise ValueError("Streaming needs rows in increasing date order; sort the file first.")
+        last = chunk.index[-1]
+        yield chunk
+
+
+def iter_frame_chunks(data, chunksize: int):
+    """Chunks of an in-memory Series / DataFrame (tests, or re-chunking another stream)."""
+    chunksize = _aligned(chunksize)
+    for a in range(0, len(data), chunksize):
+        yield data.iloc[a : a + chunksize]
+
+
+def portfolio_chunks(asset_chunks, weights: np.ndarray):
+    """Portfolio return chunks from asset return chunks (same normalization as portfolio_returns)."""
+    from risk_engine.models.var_es import portfolio_returns
+    for chunk in asset_chunks:
+        yield portfolio_returns(chunk, weights)
+
+
+def stream_blocks(chunks, window: int):
+    """
+    Blocks for windowed rolling functions: each chunk prefixed with the
+    last `window` rows seen before it. A function whose output at row t
+    depends only on rows t - window .. t - 1, and which starts its output
+    at row `window` (rolling_metrics_*, rolling_var_*,
+    rolling_es_attribution_historical), returns exactly the rows of the new
+    chunk, so the concatenated outputs equal one in-memory call. At most
+    window + chunk rows are held. Chunks with missing values are rejected,
+    as in parallel_rolling.
+    """
+    carry = None
+    for chunk in chunks:
+        if chunk.isna().to_numpy().any():
+            raise ValueError("Streaming needs data without missing values; drop them first.")
+        block = chunk if carry is None else pd.concat([carry, chunk])
+        if len(block) > window:
+            yield block
+        carry = block.iloc[-window:]
+
+
+def stream_rolling(fn, chunks, window: int, *args, **kwargs):
+    """Yield fn(block, *args, window=window, **kwargs) for every block of stream_blocks."""
+    for block in stream_blocks(chunks, window):
+        yield fn(block, *args, window=window, **kwargs)
+
+
+def write_stream(parts, path) -> int:
+    """Append DataFrame / Series parts to one CSV as they arrive (header once). Returns rows written."""
+    n = 0
+    if os.path.exists(path):
+        os.remove(path)
+    for part in parts:
+        if len(part) == 0:
+            continue
+        part.to_csv(path, mode="a", header=(n == 0))
+        n += len(part)
+    return n
+
+
+# -----------------------
+# Streamed versions of the rolling outputs
+# -----------------------
+def stream_rolling_var_es(chunks, alpha: float, window: int):
+    """
+    Rolling Gaussian / historical / Student-t VaR and ES per block, with the
+    same columns as rolling_var_es. The FHS columns are left out: their
+    residual sample is the whole history so far, which cannot be bounded by
+    a window.
+    """
+    from risk_engine.run_rolling_es import (
+        rolling_metrics_gaussian,
+        rolling_metrics_historical,
+        rolling_metrics_student_t,
+    )
+    for block in stream_blocks(chunks, window):
+        g = rolling_metrics_gaussian(block, alpha, window).rename(columns={"VaR": "VaR_gauss", "ES": "ES_gauss"})
+        h = rolling_metrics_historical(block, alpha, window).rename(columns={"VaR": "VaR_hist", "ES": "ES_hist"})
+        t = rolling_metrics_student_t(block, alpha, window).rename(columns={"VaR": "VaR_t", "ES": "ES_t"})
+        yield g.join(h, how="inner").join(t, how="inner")
+
+
+def stream_backtest(chunks, alpha: float, window: int) -> pd.DataFrame:
+    """
+    backtest_report for the windowed models (Gaussian, historical,
+    Student-t) on a stream of portfolio return chunks. Breach counts and
+    day-to-day transitions are accumulated across chunks (the last breach
+    flag of each chunk is carried), so the Kupiec and Christoffersen
+    statistics equal the in-memory ones.
+    """
+    from risk_engine.run_backtest import rolling_var, rolling_var_historical, rolling_var_student_t
+
+    models = [("Gaussian", rolling_var), ("Historical", rolling_var_historical), ("Student-t", rolling_var_student_t)]
+    counts = {label: {"n": 0, "x": 0, "trans": np.zeros(4, dtype=int), "prev": None} for label, _ in models}
+
+    for block in stream_blocks(chunks, window):
+        for label, fn in models:
+            var_series = fn(block, alpha, window)
+            aligned_r, aligned_v = block.align(var_series, join="inner")
+            breaches = (aligned_r < -aligned_v).to_numpy()
+            if len(breaches) == 0:
+                continue
+            c = counts[label]
+            c["n"] += len(breaches)
+            c["x"] += int(breaches.sum())
+            c["trans"] += transition_counts(breaches, c["prev"])
+            c["prev"] = bool(breaches[-1])
+
+    rows = []
+    for label, _ in models:
+        c = counts[label]
+        kupiec_lr, kupiec_p = kupiec_from_counts(c["x"], c["n"], alpha)
+        christ_lr, christ_p = christoffersen_from_counts(*(int(v) for v in c["trans"]))
+        rows.append({
+            "model": label,
+            "aligned_obs": c["n"],
+            "breaches": c["x"],
+            "expected": (1 - alpha) * c["n"],
+            "kupiec_LR": kupiec_lr,
+            "kupiec_p": kupiec_p,
+            "christoffersen_LR": christ_lr,
+            "christoffersen_p": christ_p,
+        })
+    return pd.DataFrame(rows).set_index("model")
@@ -0,0 +1,174 @@
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+
+# A scenario library is a dict:
+#   - names  (list[str], S)
+#   - assets (list[str], N)
+#   - shocks (ndarray, S x D x N): simple returns per day of the shock path;
+#     a one-day shock has D = 1, padding days are 0.
+
+
+def scenario_library(names, assets, shocks) -> dict:
+    """Validate and assemble a scenario library (2-D shocks are treated as one-day paths)."""
+    shocks = np.asarray(shocks, dtype=float)
+    if shocks.ndim == 2:
+        shocks = shocks[:, None, :]
+    if shocks.ndim != 3:
+        raise ValueError("shocks must have shape (S, N) or (S, D, N)")
+    if shocks.shape[0] != len(names) or shocks.shape[2] != len(assets):
+        raise ValueError("shocks shape does not match names / assets")
+    if np.any(shocks <= -1.0):
+        raise ValueError("shocks are simple returns and must be > -100%")
+    return {"names": list(names), "assets": list(assets), "shocks": shocks}
+
+
+def scenarios_from_csv(path: str) -> dict:
+    """
+    Build a library from a long-format CSV with columns scenario, asset, shock
+    and an optional day (1-based) for multi-day paths, e.g.
+
+        scenario,day,asset,shock
+        equity_crash,1,SPY,-0.20
+        equity_crash,1,BTC,-0.50
+        equity_crash,1,TLH,0.05
+
+    Assets a scenario does not mention get a 0 shock.
+    """
+    df = pd.read_csv(path)
+    if "day" not in df.columns:
+        df["day"] = 1
+
+    names = list(dict.fromkeys(df["scenario"]))
+    assets = list(dict.fromkeys(df["asset"]))
+    n_days = int(df["day"].max())
+
+    shocks = np.zeros((len(names), n_days, len(assets)))
+    s_idx = df["scenario"].map({n: i for i, n in enumerate(names)}).values
+    a_idx = df["asset"].map({a: i for i, a in enumerate(assets)}).values
+    shocks[s_idx, df["day"].values - 1, a_idx] = df["shock"].values
+
+    return scenario_library(names, assets, shocks)
+
+
+def save_scenario_library(lib: dict, path: str, dtype=np.float32, source_hash: str = "") -> None:
+    """
+    Store as an uncompressed .npz: one contiguous shock array (float32 by
+    default, half the size of CSV-parsed float64) plus name arrays, so loading
+    is a single read with no text parsing. source_hash records the sha256 of
+    the CSV the library was built from.
+    """
+    np.savez(
+        path,
+        names=np.array(lib["names"], dtype=str),
+        assets=np.array(lib["assets"], dtype=str),
+        shocks=lib["shocks"].astype(dtype),
+        source_hash=np.array(source_hash),
+    )
+
+
+def load_scenario_library(path: str) -> dict:
+    with np.load(path) as f:
+        return {
+            "names": f["names"].tolist(),
+            "assets": f["assets"].tolist(),
+            "shocks": f["shocks"].astype(float),
+        }
+
+
+def _file_hash(path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def cached_scenarios_from_csv(csv_path: str, npz_path: str) -> tuple[dict, bool]:
+    """
+    scenarios_from_csv through a binary cache: npz_path is loaded while it
+    records the sha256 of csv_path's current content, and rebuilt from the
+    CSV (and rewritten) otherwise, so edits to the CSV are never masked.
+    Returns (library, rebuilt).
+    """
+    digest = _file_hash(csv_path)
+    if os.path.exists(npz_path):
+        with np.load(npz_path) as f:
+            cached = str(f["source_hash"]) if "source_hash" in f.files else ""
+        if cached == digest:
+            return load_scenario_library(npz_path), False
+    lib = scenarios_from_csv(csv_path)
+    save_scenario_library(lib, npz_path, source_hash=digest)
+    return lib, True
+
+
+def _path_returns(lib: dict, assets) -> np.ndarray:
+    """
+    Full-revaluation horizon return per scenario and asset, aligned to `assets`:
+    prod_d (1 + shock_d) - 1. Assets missing from the library are unshocked.
+    """
+    g = np.prod(1.0 + lib["shocks"], axis=1) - 1.0            # (S, N_lib)
+    pos = {a: i for i, a in enumerate(lib["assets"])}
+    out = np.zeros((g.shape[0], len(assets)))
+    cols = [i for i, a in enumerate(assets) if a in pos]
+    out[:, cols] = g[:, [pos[assets[i]] for i in cols]]
+    return out
+
+
+def scenario_pnl(lib: dict, weights) -> pd.DataFrame:
+    """
+    P&L of many portfolios under every scenario with one matrix product.
+
+    weights: Series (one portfolio) or DataFrame (portfolios x assets) of value
+    weights. Positions are revalued at the end of each shock path (buy and
+    hold), so P&L is a return on current portfolio value.
+    Returns DataFrame (scenarios x portfolios).
+    """
+    w = weights.to_frame().T if isinstance(weights, pd.Series) else weights
+    g = _path_returns(lib, list(w.columns))                   # (S, N)
+    pnl = g @ w.values.T                                      # (S, P)
+    return pd.DataFrame(pnl, index=pd.Index(lib["names"], name="scenario"), columns=w.index)
+
+
+def scenario_report(lib: dict, weights: pd.Series, top: int | None = 20) -> dict:
+    """
+    Rank scenarios for one portfolio, worst P&L first, with per-asset
+    contributions w_i * g_i (they sum to the scenario P&L).
+
+    Returns dict with:
+      - pnl (Series, all scenarios, worst first)
+      - contributions (DataFrame, top scenarios x assets)
+      - top_contributors (DataFrame: per top scenario, assets ranked by loss contribution)
+    """
+    assets = list(weights.index)
+    g = _path_returns(lib, assets)
+    pnl = pd.Series(g @ weights.values, index=pd.Index(lib["names"], name="scenario"), name="pnl")
+
+    order = np.argsort(pnl.values, kind="stable")
+    if top is not None:
+        order = order[:top]
+
+    contrib = pd.DataFrame(
+        g[order] * weights.values,
+        index=pnl.index[order],
+        columns=assets,
+    )
+
+    # Long table: scenarios stay worst-first, assets ranked by loss contribution within each
+    vals = contrib.values
+    rank = np.argsort(vals, axis=1, kind="stable")
+    tidy = pd.DataFrame({
+        "scenario": np.repeat(contrib.index.values, len(assets)),
+        "asset": np.array(assets)[rank].ravel(),
+        "contribution": np.take_along_axis(vals, rank, axis=1).ravel(),
+        "rank_in_scenario": np.tile(np.arange(1, len(assets) + 1), len(contrib)),
+    })
+
+    return {
+        "pnl": pnl.iloc[np.argsort(pnl.values, kind="stable")],
+        "contributions": contrib,
+        "top_contributors": tidy,
+    }
@@ -0,0 +1,153 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def _sliding_max_drop(y: np.ndarray, L: int) -> np.ndarray:
+    """
+    Largest fall max_{j <= m} (y_j - y_m) inside every window y[i : i + L].
+
+    (max, min, drop) summaries merge associatively, so windows are split at
+    multiples of L into a block suffix + next-block prefix, each computed with
+    ufunc accumulates. O(T) per window length, no per-window loop.
+    """
+    n = len(y)
+    n_blocks = -(-n // L)
+    pad = np.full(n_blocks * L, np.nan)
+    pad[:n] = y
+    blocks = pad.reshape(n_blocks, L)
+
+    # Padding sits at the end of the last block; treat it as neutral
+    lo = np.where(np.isnan(blocks), np.inf, blocks)
+    hi = np.where(np.isnan(blocks), -np.inf, blocks)
+
+    # Prefix summaries (block start .. p)
+    pre_max = np.maximum.accumulate(hi, axis=1)
+    pre_min = np.minimum.accumulate(lo, axis=1)
+    pre_drop = np.maximum.accumulate(np.where(np.isnan(blocks), -np.inf, pre_max - blocks), axis=1)
+
+    # Suffix summaries (p .. block end)
+    suf_max = np.maximum.accumulate(hi[:, ::-1], axis=1)[:, ::-1]
+    suf_min = np.minimum.accumulate(lo[:, ::-1], axis=1)[:, ::-1]
+    suf_drop = np.maximum.accumulate(np.where(np.isnan(blocks), -np.inf, blocks - suf_min)[:, ::-1], axis=1)[:, ::-1]
+
+    pre_max, pre_min, pre_drop = (a.ravel() for a in (pre_max, pre_min, pre_drop))
+    suf_max, suf_drop = suf_max.ravel(), suf_drop.ravel()
+
+    starts = np.arange(n - L + 1)
+    off = starts % L
+    ends = starts + L - 1                          # last index of each window
+
+    drop = suf_drop[starts].copy()
+    split = off != 0                               # window straddles two blocks
+    e = ends[split]
+    s = starts[split]
+    drop[split] = np.maximum.reduce([suf_drop[s], pre_drop[e], suf_max[s] - pre_min[e]])
+    return np.maximum(drop, 0.0)
+
+
+def _sliding_es_hist(r: np.ndarray, L: int, alpha: float, chunk: int) -> np.ndarray:
+    """
+    es_historical on every window r[i : i + L]: same linear-interpolated
+    quantile and '<= q' tail, computed with np.partition on chunks of windows.
+    """
+    windows = sliding_window_view(r, L)
+    h = (L - 1) * (1 - alpha)
+    k = int(np.floor(h))
+    frac = h - k
+    k1 = min(k + 1, L - 1)
+
+    out = np.empty(len(windows))
+    for a in range(0, len(windows), chunk):
+        w = windows[a : a + chunk]
+        part = np.partition(w, [k, k1], axis=1)
+        q = part[:, k] + frac * (part[:, k1] - part[:, k])
+        mask = w <= q[:, None]
+        out[a : a + chunk] = -(w * mask).sum(axis=1) / mask.sum(axis=1)
+    return out
+
+
+def scan_stress_windows(
+    port_ret: pd.Series,
+    lengths=(21, 63, 126),
+    alpha: float = 0.95,
+    chunk: int = 4096,
+) -> pd.DataFrame:
+    """
+    Evaluate every start date for each window length.
+
+    Cumulative returns come from prefix sums of log(1 + r); max drawdown from a
+    sliding (max, min, drop) aggregate over the same prefix sums, matching
+    run_stress_replay.max_drawdown on the equity curve of each slice.
+
+    Returns one row per window with:
+      - start, end (dates, inclusive; usable as stress_start / stress_end)
+      - length
+      - cum_return (compounded over the window)
+      - max_drawdown (negative)
+      - ES_hist (positive, at alpha)
+    """
+    r = port_ret.dropna()
+    x = r.values.astype(float)
+    idx = r.index
+
+    s = np.concatenate([[0.0], np.cumsum(np.log1p(x))])    # prefix sums, S[0] = 0
+
+    frames = []
+    for L in lengths:
+        L = int(L)
+        if L < 2 or L > len(x):
+            continue
+        starts = np.arange(len(x) - L + 1)
+
+        cum_ret = np.expm1(s[starts + L] - s[starts])
+        mdd = np.expm1(-_sliding_max_drop(s[1:], L))
+        es = _sliding_es_hist(x, L, alpha, chunk)
+
+        frames.append(pd.DataFrame({
+            "start": idx[starts],
+            "end": idx[starts + L - 1],
+            "length": L,
+            "cum_return": cum_ret,
+            "max_drawdown": mdd,
+            "ES_hist": es,
+        }))
+
+    if not frames:
+        raise ValueError("No window length fits the return history.")
+    return pd.concat(frames, ignore_index=True)
+
+
+# metric -> (column, ascending): "worst first" ordering
+RANK_BY = {
+    "cum_loss": ("cum_return", True),
+    "max_drawdown": ("max_drawdown", True),
+    "ES_hist": ("ES_hist", False),
+}
+
+
+def top_stress_windows(scan: pd.DataFrame, k: int = 5, by: str = "cum_loss") -> pd.DataFrame:
+    """
+    Greedy top-k non-overlapping windows from scan_stress_windows, worst first.
+    Windows of different lengths compete on the same metric.
+    """
+    if by not in RANK_BY:
+        raise ValueError(f"Unknown ranking: {by}. Use one of {list(RANK_BY)}")
+    col, ascending = RANK_BY[by]
+
+    ranked = scan.sort_values(col, ascending=ascending, kind="stable")
+    picked = []
+    taken = []                                     # (start, end) of chosen windows
+
+    for row in ranked.itertuples():
+        if any(row.start <= e and s <= row.end for s, e in taken):
+            continue
+        picked.append(row.Index)
+        taken.append((row.start, row.end))
+        if len(picked) == k:
+            break
+
+    out = scan.loc[picked].reset_index(drop=True)
+    out.insert(0, "rank", np.arange(1, len(out) + 1))
+    out["ranked_by"] = by
+    return out
@@ -2,6 +2,10 @@ import numpy as np
 import pandas as pd
 from scipy.stats import chi2
 
+from risk_engine.instrumentation import instrumented
+from risk_engine.kernels import breach_transitions
+
+@instrumented()
 def kupiec_test(returns: pd.Series, var_series: pd.Series, alpha: float):
     """
     Kupiec unconditional coverage test.
@@ -14,23 +18,30 @@ def kupiec_test(returns: pd.Series, var_series: pd.Series, alpha: float):
     breaches = aligned_r < -aligned_v
     
     breaches = returns < -var_series
-    x = breaches.sum()
-    n = len(breaches)
+    return kupiec_from_counts(int(breaches.sum()), len(breaches), alpha)
+
 
+def kupiec_from_counts(x: int, n: int, alpha: float):
+    """
+    Kupiec LR from the breach count x over n days, so it can be accumulated
+    chunk by chunk. Log-likelihoods are summed in log space: the product
+    form underflows to 0 for long histories.
+    """
     p = 1 - alpha
     phat = x/n if n > 0 else 0
 
     if x == 0 or x == n:
         return np.nan, np.nan
-    
+
     lr = -2 * (
-        np.log(((1 - p) ** (n - x)) * (p ** x))
-        - np.log(((1 - phat) ** (n - x)) * (phat ** x))
+        (n - x) * np.log(1 - p) + x * np.log(p)
+        - ((n - x) * np.log(1 - phat) + x * np.log(phat))
     )
 
     p_value = 1 - chi2.cdf(lr, df=1)
     return lr, p_value
 
+@instrumented()
 def christoffersen_test(returns: pd.Series, var_series: pd.Series):
     """
     Christoffersen independence test.
@@ -42,16 +53,21 @@ def christoffersen_test(returns: pd.Series, var_series: pd.Series):
     aligned_r, aligned_v = returns.align(var_series, join="inner")
     breaches = aligned_r < -aligned_v
 
-    breaches = (returns < -var_series).astype(int)
+    breaches = (returns < -var_series).to_numpy()
+    return christoffersen_from_counts(*transition_counts(breaches))
 
-    n00 = n01 = n10 = n11 = 0
-    for t in range (1, len(breaches)):
-        prev, curr = breaches.iloc[t - 1], breaches.iloc[t]
-        if prev == 0 and curr == 0: n00 += 1
-        if prev == 0 and curr == 1: n01 += 1
-        if prev == 1 and curr == 0: n10 += 1
-        if prev == 1 and curr == 1: n11 += 1
-    
+
+def transition_counts(breaches: np.ndarray, prev: bool | None = None) -> tuple[int, int, int, int]:
+    """
+    (n00, n01, n10, n11) day-to-day breach transitions. prev is the last
+    breach flag of the preceding chunk (None: this is the first chunk).
+    """
+    n00, n01, n10, n11 = breach_transitions(breaches, prev)
+    return int(n00), int(n01), int(n10), int(n11)
+
+
+def christoffersen_from_counts(n00: int, n01: int, n10: int, n11: int):
+    """Christoffersen independence LR from the transition counts."""
     pi0 = n01 / (n00 + n01) if (n00 + n01) > 0 else 0
     pi1 = n11 / (n10 + n11) if (n10 + n11) > 0 else 0
     pi = (n01 + n11) / (n00 + n01 + n10 + n11)
@@ -2,9 +2,14 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 
+from risk_engine.plotting import load_frame, render
 
-def main():
-    df = pd.read_csv("mc_stress_es_attribution.csv")
+
+INPUTS = ["mc_stress_es_attribution.csv"]
+
+
+def draw():
+    df = load_frame("mc_stress_es_attribution.csv")
 
     # Pivot: rows = asset, columns = model, values = share_of_ES
     pivot = (
@@ -24,7 +29,7 @@ def main():
     x = np.arange(len(assets))
     width = 0.25
 
-    plt.figure(figsize=(14, 6))
+    fig = plt.figure(figsize=(14, 6))
 
     for i, model in enumerate(models):
         plt.bar(
@@ -40,10 +45,17 @@ def main():
     plt.legend()
     plt.grid(True, axis="y", alpha=0.4)
     plt.tight_layout()
+    return fig
 
-    plt.savefig("docs/mc_es_share.png", dpi=200, bbox_inches="tight")
 
-    plt.show()
+def main(force: bool = False, show: bool = True):
+    fig = render("mc_es_share", INPUTS, draw, force=force)
+    if fig is None:
+        return
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
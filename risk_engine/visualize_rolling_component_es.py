@@ -1,17 +1,17 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
+from risk_engine.plotting import decimate, load_frame, render
+
+
+INPUTS = ["es_attribution_rolling.csv"]
 
-def main():
-    df = pd.read_csv(
-        "es_attribution_rolling.csv",
-        parse_dates=[0],
-        index_col=0
-    )
+
+def draw():
+    df = load_frame("es_attribution_rolling.csv", parse_dates=[0], index_col=0)
 
     # Keep only component ES columns
     comp_cols = [c for c in df.columns if c.startswith("cES_")]
-    comp = df[comp_cols]
+    comp = decimate(df[comp_cols])
 
     # Rename for cleaner legend
     comp.columns = [c.replace("cES_", "") for c in comp.columns]
@@ -20,7 +20,7 @@ def main():
     pos = comp.clip(lower=0)
     neg = comp.clip(upper=0)
 
-    plt.figure(figsize=(13, 6))
+    fig = plt.figure(figsize=(13, 6))
 
     # Positive contributions (stacked above zero)
     plt.stackplot(
@@ -44,11 +44,17 @@ def main():
     plt.legend(loc="upper left", ncol=2)
     plt.grid(True, axis="y")
     plt.tight_layout()
+    return fig
 
-    plt.savefig("docs/rolling_component_es.png", dpi=200, bbox_inches="tight")
-
-    plt.show()
 
+def main(force: bool = False, show: bool = True):
+    fig = render("rolling_component_es", INPUTS, draw, force=force)
+    if fig is None:
+        return
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -1,29 +1,50 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 
+from risk_engine.plotting import decimate, load_frame, render
 
-def main():
-    df = pd.read_csv(
-    "rolling_var_es.csv",
-    parse_dates=[0],
-    index_col=0
-    )
 
-    plt.figure(figsize=(12, 6))
+INPUTS = ["rolling_var_es.csv"]
+OPTIONAL = ["rolling_es_ci.csv"]   # ES band, drawn when run_rolling_es has written it
+
+
+def draw():
+    df = load_frame("rolling_var_es.csv", parse_dates=[0], index_col=0)
+    cols = ["ES_gauss", "ES_hist", "ES_t"]
+
+    # Bootstrap band around the historical ES, when run_rolling_es has written it
+    try:
+        ci = load_frame("rolling_es_ci.csv", parse_dates=[0], index_col=0).reindex(df.index)
+        df = df[cols].join(ci[["ES_lo", "ES_hi"]])
+    except FileNotFoundError:
+        df = df[cols]
+    df = decimate(df)
+
+    fig = plt.figure(figsize=(12, 6))
     plt.plot(df.index, df["ES_gauss"], label="Gaussian ES")
     plt.plot(df.index, df["ES_hist"], label="Historical ES")
     plt.plot(df.index, df["ES_t"], label="Student-t ES")
 
+    if "ES_lo" in df.columns:
+        plt.fill_between(df.index, df["ES_lo"], df["ES_hi"], color="tab:orange", alpha=0.2,
+                         label="Historical ES 90% bootstrap band")
+
     plt.title("Rolling Expected Shortfall (95%, window=60)")
     plt.ylabel("Loss (positive)")
     plt.xlabel("Date")
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
+    return fig
 
-    plt.savefig("docs/rolling_es.png", dpi=200, bbox_inches="tight")
 
-    plt.show()
+def main(force: bool = False, show: bool = True):
+    fig = render("rolling_es", INPUTS + OPTIONAL, draw, force=force)
+    if fig is None:
+        return
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -1,10 +1,15 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 
+from risk_engine.plotting import decimate, load_frame, render
 
-def main():
+
+INPUTS = ["stress_replay_equity_curve.csv", "rolling_var_es.csv"]
+
+
+def draw():
     # ---- Load stress equity curve ----
-    equity = pd.read_csv(
+    equity = load_frame(
         "stress_replay_equity_curve.csv",
         parse_dates=[0],
         index_col=0
@@ -16,7 +21,7 @@ def main():
     drawdown = equity["equity"] / peak - 1.0
 
     # ---- Load rolling ES ----
-    es = pd.read_csv(
+    es = load_frame(
         "rolling_var_es.csv",
         parse_dates=[0],
         index_col=0
@@ -27,6 +32,8 @@ def main():
 
     # Align dates
     dd, es_series = drawdown.align(es_series, join="inner")
+    both = decimate(pd.DataFrame({"dd": dd, "es": es_series}))
+    dd, es_series = both["dd"], both["es"]
 
     # ---- Plot ----
     fig, ax1 = plt.subplots(figsize=(14, 6))
@@ -61,10 +68,17 @@ def main():
     fig.legend(loc="upper right")
     plt.grid(True, axis="x", alpha=0.4)
     plt.tight_layout()
+    return fig
 
-    plt.savefig("docs/stress_equity_vs_es.png", dpi=200, bbox_inches="tight")
 
-    plt.show()
+def main(force: bool = False, show: bool = True):
+    fig = render("stress_equity_vs_es", INPUTS, draw, force=force)
+    if fig is None:
+        return
+    if show:
+        plt.show()
+    else:
+        plt.close(fig)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,35 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+# Same budget as `python -m risk_engine bench startup`
+STARTUP_BUDGET_S = 0.25
+HEAVY_MODULES = ["numpy", "pandas", "scipy", "matplotlib"]
+
+
+def _run(*args, **kwargs):
+    env = {**os.environ, "PYTHONPATH": str(ROOT)}
+    return subprocess.run([sys.executable, *args], cwd=ROOT, env=env, capture_output=True, text=True, **kwargs)
+
+
+def test_help_within_budget():
+    times = []
+    for _ in range(3):
+        t0 = time.perf_counter()
+        out = _run("-m", "risk_engine", "--help")
+        times.append(time.perf_counter() - t0)
+        assert out.returncode == 0, out.stderr
+    assert "mc-stress" in out.stdout
+    assert min(times) < STARTUP_BUDGET_S, f"`risk_engine --help` took {min(times) * 1e3:.0f} ms (best of 3)"
+
+
+def test_cli_import_is_light():
+    probe = f"import sys, risk_engine.cli; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    out = _run("-c", probe, check=True)
+    heavy = [m for m in out.stdout.strip().split(",") if m]
+    assert heavy == [], f"imported by risk_engine.cli: {heavy}"
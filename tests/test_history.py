@@ -0,0 +1,91 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_engine import history
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(history, "_ENABLED", True)
+    monkeypatch.setattr(history, "COMPACT_EVERY", 4)
+    return tmp_path
+
+
+def _table(i: int) -> pd.DataFrame:
+    idx = pd.date_range("2026-01-01", periods=3 + i % 3)
+    return pd.DataFrame({"VaR": np.arange(len(idx)) + i / 10, "model": f"m{i % 2}"}, index=idx)
+
+
+def _record(store, n, start=0):
+    return [history.record_run("bench", {"t": _table(i)}, params={"i": i}, inputs=(), root=store)
+            for i in range(start, start + n)]
+
+
+def _expected(run_ids, start=0):
+    frames = [_table(start + k).rename_axis("Date").reset_index().assign(run_id=rid)
+              for k, rid in enumerate(run_ids)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def _partition(store):
+    (part,) = (store / "t").iterdir()
+    return part
+
+
+def _same(out, run_ids, start=0):
+    exp = _expected(run_ids, start)
+    assert list(out.columns) == ["run_id", "timestamp", "Date", "VaR", "model"]
+    pd.testing.assert_frame_equal(out.drop(columns="timestamp"), exp[["run_id", "Date", "VaR", "model"]],
+                                  check_dtype=False)
+
+
+def test_record_and_load(store):
+    ids = _record(store, 3)
+    _same(history.load_history("t", root=store), ids)
+    sub = history.load_history("t", columns=["VaR"], params={"i": 1}, root=store)
+    assert list(sub.columns) == ["run_id", "timestamp", "VaR"]
+    assert set(sub["run_id"]) == {ids[1]}
+
+
+def test_record_run_merges_every_compact_every_runs(store):
+    ids = _record(store, 10)
+    part = _partition(store)
+    loose = history._loose(part)
+    assert len(loose) == 2                                   # runs 9, 10: below COMPACT_EVERY
+    manifest = json.loads((part / "manifest.json").read_text())
+    assert sorted(r for rids in manifest.values() for r in rids) == ids[:8]
+    _same(history.load_history("t", root=store), ids)
+
+
+def test_compact_folds_parts(store):
+    ids = _record(store, 10)
+    assert history.compact(root=store) == 2
+    part = _partition(store)
+    assert history._loose(part) == [] and len(list(part.glob("part-*.npz"))) == 1
+    _same(history.load_history("t", root=store), ids)
+    ids += _record(store, 2, start=10)
+    _same(history.load_history("t", root=store), ids)
+
+
+def test_merge_leaves_files_being_written(store):
+    ids = _record(store, 3)
+    part = _partition(store)
+    tmp = part / "20990101T000000000000-abcdef-123456.tmp.npz"
+    tmp.write_bytes(b"partial")
+    ids += _record(store, 1, start=3)                        # reaches COMPACT_EVERY: merges
+    assert tmp.exists() and len(history._loose(part)) == 0
+    _same(history.load_history("t", root=store), ids)
+
+
+def test_merge_skipped_while_partition_locked(store):
+    ids = _record(store, 3)
+    part = _partition(store)
+    (part / ".lock").touch()
+    ids += _record(store, 2, start=3)
+    assert len(history._loose(part)) == 5 and not (part / "manifest.json").exists()
+    (part / ".lock").unlink()
+    assert history.compact(root=store) == 5
+    _same(history.load_history("t", root=store), ids)
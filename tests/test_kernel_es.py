@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_engine.attribution.es_attribution import es_attribution_historical
+from risk_engine.attribution.kernel_es import kernel_es_attribution
+from risk_engine.attribution.parametric import parametric_es_attribution
+
+
+N, S, REPS = 4, 2000, 100
+ASSETS = [f"a{i}" for i in range(N)]
+W = pd.Series([0.4, 0.3, 0.2, 0.1], index=ASSETS)
+
+
+def _gaussian_book():
+    rng = np.random.default_rng(123)
+    A = rng.normal(size=(N, N))
+    return np.zeros(N), (A @ A.T + N * np.eye(N)) * 1e-4
+
+
+@pytest.fixture(scope="module", params=[0.95, 0.99])
+def share_errors(request):
+    """ES-share errors against the closed form, per estimator, over REPS Gaussian samples of S scenarios."""
+    alpha = request.param
+    mu, cov = _gaussian_book()
+    ref = parametric_es_attribution(mu, cov, W.to_numpy(), alpha)
+    ref_share = ref["component_ES"] / ref["ES"]
+
+    rng = np.random.default_rng(0)
+    errors = {"hard": [], "kernel": [], "tail": []}
+    for _ in range(REPS):
+        X = pd.DataFrame(rng.multivariate_normal(mu, cov, size=S), columns=ASSETS)
+        hard = es_attribution_historical(X, W, alpha)
+        errors["hard"].append(hard["component_ES"].to_numpy() / hard["ES"] - ref_share)
+        for method in ("kernel", "tail"):
+            res = kernel_es_attribution(X, W, alpha, method=method)
+            assert res["component_ES"].sum() == pytest.approx(res["ES"], rel=1e-12)
+            errors[method].append(res["component_ES"].to_numpy() / res["ES"] - ref_share)
+    return {k: np.array(v) for k, v in errors.items()}
+
+
+def test_kernel_es_agrees_with_parametric(share_errors):
+    for method in ("kernel", "tail"):
+        bias = np.abs(share_errors[method].mean(axis=0)).max()
+        assert bias < 0.01, f"{method}: mean share error {bias:.4f}"
+
+
+def test_kernel_es_reduces_variance(share_errors):
+    rmse = {k: np.sqrt((v ** 2).mean()) for k, v in share_errors.items()}
+    assert rmse["kernel"] < rmse["hard"]
+    assert rmse["tail"] < 0.92 * rmse["hard"]          # ~25-30% fewer scenarios for the same RMSE
@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from risk_engine import kernels
+from risk_engine.attribution.es_attribution import _rolling_es_attribution_loop, rolling_es_attribution_historical
+from risk_engine.benchmarks.synthetic import synthetic_asset_returns, synthetic_portfolio_returns
+from risk_engine.models.var_es import es_gaussian, es_historical, var_gaussian, var_historical
+from risk_engine.run_backtest import _rolling_var_loop, rolling_var, rolling_var_historical
+from risk_engine.run_rolling_es import _rolling_metrics_loop, rolling_metrics_gaussian, rolling_metrics_historical
+from risk_engine.validation.backtesting import transition_counts
+
+
+T, N, WINDOW = 400, 5, 60
+
+# Every kernel test runs on each available backend against the per-window loops it replaced
+BACKENDS = [
+    "numpy",
+    pytest.param("numba", marks=pytest.mark.skipif(kernels.numba is None, reason="numba is not installed")),
+]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    current = kernels.backend()
+    kernels.use_backend(request.param)
+    yield request.param
+    kernels.use_backend(current)
+
+
+@pytest.fixture(params=["continuous", "ties"])
+def returns(request):
+    r = synthetic_portfolio_returns(T, seed=1)
+    return r.round(3) if request.param == "ties" else r
+
+
+def _same(a: pd.DataFrame, b: pd.DataFrame, exact=()):
+    assert list(a.index) == list(b.index)
+    for col in a.columns:
+        if col in exact:
+            np.testing.assert_array_equal(a[col].to_numpy(), b[col].to_numpy(), err_msg=col)
+        else:
+            np.testing.assert_allclose(a[col].to_numpy(), b[col].to_numpy(), rtol=1e-12, atol=1e-15, err_msg=col)
+
+
+@pytest.mark.parametrize("alpha", [0.95, 0.99])
+def test_rolling_metrics_match_loop(backend, returns, alpha):
+    _same(rolling_metrics_gaussian(returns, alpha, WINDOW),
+          _rolling_metrics_loop(returns, alpha, WINDOW, var_gaussian, es_gaussian))
+    _same(rolling_metrics_historical(returns, alpha, WINDOW),
+          _rolling_metrics_loop(returns, alpha, WINDOW, var_historical, es_historical), exact=("VaR",))
+
+
+@pytest.mark.parametrize("alpha", [0.95, 0.99])
+def test_rolling_var_match_loop(backend, returns, alpha):
+    _same(rolling_var(returns, alpha, WINDOW).to_frame(),
+          _rolling_var_loop(returns, alpha, WINDOW, var_gaussian).to_frame())
+    _same(rolling_var_historical(returns, alpha, WINDOW).to_frame(),
+          _rolling_var_loop(returns, alpha, WINDOW, var_historical).to_frame(), exact=(0,))
+
+
+def test_rolling_mean_std_matches_numpy(backend, returns):
+    x = returns.to_numpy()
+    mu, sd = kernels.rolling_mean_std(x, WINDOW)
+    windows = [x[t - WINDOW:t] for t in range(WINDOW, len(x))]
+    np.testing.assert_allclose(mu, [np.mean(w) for w in windows], rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(sd, [np.std(w, ddof=1) for w in windows], rtol=1e-12)
+
+
+@pytest.mark.parametrize("prev", [None, False, True])
+def test_transition_counts_match_loop(backend, prev):
+    b = np.random.default_rng(0).random(500) < 0.1
+    full = b if prev is None else np.concatenate([[prev], b])
+    expected = [0, 0, 0, 0]
+    for before, after in zip(full[:-1], full[1:]):
+        expected[2 * int(before) + int(after)] += 1
+    assert transition_counts(b, prev) == tuple(expected)
+
+
+@pytest.mark.parametrize("alpha, window", [(0.95, WINDOW), (0.99, 250)])    # at least two tail points
+def test_rolling_es_attribution_matches_loop(backend, alpha, window):
+    R = synthetic_asset_returns(T, N, seed=2)
+    w = pd.Series(np.linspace(0.1, 0.3, N), index=R.columns)
+    out = rolling_es_attribution_historical(R, w, alpha, window)
+    assert len(out) == T - window
+    _same(out, _rolling_es_attribution_loop(R, w, alpha, window))
+
+
+def test_rolling_es_attribution_missing_weight(backend):
+    R = synthetic_asset_returns(T, N, seed=2)
+    w = pd.Series(0.25, index=R.columns[1:])              # first asset not held
+    out = rolling_es_attribution_historical(R, w, 0.95, WINDOW)
+    assert len(out) == T - WINDOW
+    held = rolling_es_attribution_historical(R[R.columns[1:]], w, 0.95, WINDOW)
+    np.testing.assert_allclose(out["ES"].to_numpy(), held["ES"].to_numpy(), rtol=1e-12)
+
+
+@pytest.mark.parametrize("sign", [1.0, -1.0])
+def test_chol_rank1_matches_cholesky(backend, sign):
+    R = synthetic_asset_returns(T, N, seed=3).to_numpy()
+    A = np.cov(R.T)
+    u = R[-1] / np.linalg.norm(R[-1])
+    x = np.linalg.cholesky(A) @ (0.5 * u)               # A - x x' stays positive definite
+    L = kernels.chol_rank1(np.linalg.cholesky(A), x.copy(), sign)
+    np.testing.assert_allclose(L, np.linalg.cholesky(A + sign * np.outer(x, x)), rtol=1e-10, atol=1e-14)
+
+
+def test_chol_rank1_downdate_not_positive_definite(backend):
+    L = np.eye(3)
+    with pytest.raises(ValueError):
+        kernels.chol_rank1(L, np.array([2.0, 0.0, 0.0]), -1.0)
+
+
+def test_backends_identical():
+    pytest.importorskip("numba")
+    assert all(kernels.compare_backends(T=T, window=WINDOW).values())